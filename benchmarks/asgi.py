@@ -0,0 +1,376 @@
+"""Benchmark the HTTP and WebSocket hot paths of `TartifletteApp`.
+
+The app is driven in-process through ASGI, with no network or HTTP client
+involved, using the schema and resolvers from `tests/`.
+
+Usage: python -m benchmarks.asgi [--output results.json] [--compare baseline.json]
+
+Results are printed, and optionally written as JSON so that they can be
+compared across releases: `--compare` exits with a non-zero status if the
+throughput of a scenario regressed by more than `--tolerance`.
+
+NOTE: the `dogAdded` subscription source polls for events every 10ms, which
+dominates the latency of subscription fan-out scenarios.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import typing
+
+from tartiflette import Engine
+
+import tartiflette_asgi
+from tartiflette_asgi import SharedSubscriptions, Subscriptions, TartifletteApp
+from tests._utils import Dog, PubSub
+
+SDL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "sdl"
+)
+
+Message = typing.Dict[str, typing.Any]
+
+
+class Result(typing.NamedTuple):
+    name: str
+    operations: int
+    duration: float
+    latencies: typing.List[float]
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "name": self.name,
+            "operations": self.operations,
+            "duration": round(self.duration, 6),
+            "ops_per_second": round(self.operations / self.duration, 2),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        }
+
+
+def _percentile(latencies: typing.List[float], percent: float) -> float:
+    if not latencies:
+        return 0.0
+    index = min(len(latencies) - 1, int(len(latencies) * percent / 100))
+    return latencies[index]
+
+
+# In-process ASGI drivers.
+
+
+async def http_request(app: typing.Any, body: bytes) -> typing.Tuple[int, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status = 0
+    chunks: typing.List[bytes] = []
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+class WebSocket:
+    # A simulated `graphql-transport-ws` client connection.
+
+    def __init__(
+        self, app: typing.Any, on_message: typing.Callable[[dict], None]
+    ) -> None:
+        self.app = app
+        self.on_message = on_message
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.acknowledged = asyncio.Event()
+        self.task: typing.Optional[asyncio.Future] = None
+
+    async def connect(self) -> None:
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": "/subscriptions",
+            "raw_path": b"/subscriptions",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "subprotocols": ["graphql-transport-ws"],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        await self.inbox.put({"type": "websocket.connect"})
+        self.task = asyncio.ensure_future(self.app(scope, self.inbox.get, self._send))
+        await self.send_json({"type": "connection_init"})
+        await self.acknowledged.wait()
+
+    async def send_json(self, message: dict) -> None:
+        await self.inbox.put({"type": "websocket.receive", "text": json.dumps(message)})
+
+    async def _send(self, message: Message) -> None:
+        if message["type"] != "websocket.send":
+            return
+        data = json.loads(message["text"])
+        if data["type"] == "connection_ack":
+            self.acknowledged.set()
+        else:
+            self.on_message(data)
+
+    async def disconnect(self) -> None:
+        await self.inbox.put({"type": "websocket.disconnect", "code": 1000})
+        assert self.task is not None
+        await self.task
+
+
+# Scenarios.
+
+
+async def bench_http(
+    name: str,
+    app: TartifletteApp,
+    payload: typing.Any,
+    *,
+    requests: int,
+    concurrency: int,
+) -> Result:
+    body = json.dumps(payload).encode()
+    # NOTE: responses with errors have a 400 status code.
+    status, _ = await http_request(app, body)
+    assert status in (200, 400), status
+
+    latencies: typing.List[float] = []
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await http_request(app, body)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(name, requests, time.perf_counter() - started, latencies)
+
+
+async def bench_fanout(
+    name: str, app: TartifletteApp, pubsub: PubSub, *, sockets: int, events: int
+) -> Result:
+    emitted_at: typing.Dict[int, float] = {}
+    received: typing.Dict[int, int] = {}
+    delivered: typing.Dict[int, asyncio.Event] = {}
+    latencies: typing.List[float] = []
+
+    def on_message(message: dict) -> None:
+        if message["type"] != "next":
+            return
+        dog_id = message["payload"]["data"]["dogAdded"]["id"]
+        if dog_id in emitted_at:
+            latencies.append(time.perf_counter() - emitted_at[dog_id])
+        received[dog_id] = received.get(dog_id, 0) + 1
+        if received[dog_id] == sockets and dog_id in delivered:
+            delivered[dog_id].set()
+
+    connections = [WebSocket(app, on_message) for _ in range(sockets)]
+    await asyncio.gather(*(ws.connect() for ws in connections))
+    subscribe = {
+        "type": "subscribe",
+        "payload": {"query": "subscription { dogAdded { id name } }"},
+    }
+    for index, ws in enumerate(connections):
+        await ws.send_json({**subscribe, "id": str(index)})
+
+    # Warm up until every subscription has started listening to events.
+    warmup = 0
+    while True:
+        warmup -= 1
+        delivered[warmup] = asyncio.Event()
+        pubsub.emit("dog_added", Dog(id=warmup, name="Warmup"))
+        try:
+            await asyncio.wait_for(delivered[warmup].wait(), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        break
+
+    started = time.perf_counter()
+    for dog_id in range(1, events + 1):
+        delivered[dog_id] = asyncio.Event()
+        emitted_at[dog_id] = time.perf_counter()
+        pubsub.emit("dog_added", Dog(id=dog_id, name="Rex"))
+        await delivered[dog_id].wait()
+    duration = time.perf_counter() - started
+
+    pubsub.emit("dog_added", None)
+    await asyncio.gather(*(ws.disconnect() for ws in connections))
+    pubsub.remove_all_listeners("dog_added")
+    return Result(name, sockets * events, duration, latencies)
+
+
+def get_http_payloads() -> typing.Dict[str, typing.Any]:
+    # Fields of an error response, as resolving `whoami` fails without a user.
+    errors = " ".join(f"f{index}: whoami" for index in range(100))
+    dog = "query ($id: Int!) { dog(id: $id) { name } }"
+    return {
+        "small_query": {"query": "{ hello }"},
+        "large_list": {"query": "{ dogs { id name nickname } }"},
+        "error_heavy": {"query": f"{{ {errors} }}"},
+        "batch": [{"query": dog, "variables": {"id": index}} for index in range(10)],
+    }
+
+
+FANOUT_SCENARIOS = {"subscription_fanout": False, "shared_subscription_fanout": True}
+
+
+async def run(args: argparse.Namespace) -> typing.List[Result]:
+    engine = Engine(SDL, modules=["tests.resolvers"])
+    dogs = {index: Dog(id=index, name=f"Dog {index}") for index in range(100)}
+    pubsub = PubSub()
+    context = {"dogs": dogs, "pubsub": pubsub}
+    results = []
+
+    def report(result: Result) -> None:
+        results.append(result)
+        print(_format_result(result.to_dict()))
+
+    app = TartifletteApp(engine=engine, context=context, batching=True)
+    await app.startup()
+    for name, payload in get_http_payloads().items():
+        if args.only and name not in args.only:
+            continue
+        report(
+            await bench_http(
+                name,
+                app,
+                payload,
+                requests=args.requests,
+                concurrency=args.concurrency,
+            )
+        )
+
+    for name, shared in FANOUT_SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        subscriptions = Subscriptions(
+            path="/subscriptions", shared=SharedSubscriptions() if shared else None
+        )
+        app = TartifletteApp(
+            engine=engine, context=context, subscriptions=subscriptions
+        )
+        await app.startup()
+        report(
+            await bench_fanout(
+                name, app, pubsub, sockets=args.sockets, events=args.events
+            )
+        )
+
+    return results
+
+
+def _format_result(result: dict) -> str:
+    return (
+        f"{result['name']:<28} {result['ops_per_second']:>10.1f} ops/s"
+        f"  p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms"
+    )
+
+
+def get_report(results: typing.List[Result], args: argparse.Namespace) -> dict:
+    return {
+        "version": tartiflette_asgi.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.utcnow().isoformat() + "Z",
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "sockets": args.sockets,
+            "events": args.events,
+        },
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    # Return whether no scenario regressed compared to the baseline.
+    previous = {result["name"]: result for result in baseline["results"]}
+    ok = True
+    print(f"\nCompared to {baseline['version']} ({baseline['date']}):")
+    for result in report["results"]:
+        if result["name"] not in previous:
+            continue
+        ratio = result["ops_per_second"] / previous[result["name"]]["ops_per_second"]
+        regressed = ratio < 1 - tolerance
+        ok = ok and not regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{result['name']:<28} {ratio:>8.2f}x{flag}")
+    return ok
+
+
+def main(argv: typing.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--only", nargs="*", help="names of scenarios to run")
+    parser.add_argument("--output", help="path of the JSON results file")
+    parser.add_argument("--compare", help="path of a JSON results file to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(run(args))
+    finally:
+        loop.close()
+
+    report = get_report(results, args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Compare structured error formatting with the former `ast.literal_eval` approach.
+
+Usage: python -m benchmarks.errors
+"""
+import ast
+import timeit
+import typing
+
+from tartiflette_asgi._errors import ErrorFormatter, format_error, format_errors
+
+NUM_ERRORS = 1000
+NUMBER = 20
+
+
+def _literal_eval_format_error(error: typing.Any) -> dict:
+    try:
+        return ast.literal_eval(str(error))
+    except ValueError:
+        return {"message": "Internal Server Error"}
+
+
+def _get_errors() -> typing.List[dict]:
+    # Mimics a partial failure across a list field, as coerced by the engine.
+    return [
+        {
+            "message": f"Could not resolve field 'price' of item {index}",
+            "path": ["products", index, "price"],
+            "locations": [{"line": 3, "column": 7}],
+            "extensions": {"code": "UPSTREAM_ERROR"},
+        }
+        for index in range(NUM_ERRORS)
+    ]
+
+
+def _bench(errors: typing.List[dict], formatter: ErrorFormatter) -> float:
+    timer = timeit.Timer(lambda: format_errors(errors, formatter))
+    return min(timer.repeat(repeat=5, number=NUMBER)) / NUMBER
+
+
+def main() -> None:
+    errors = _get_errors()
+    assert format_errors(errors) == format_errors(errors, _literal_eval_format_error)
+
+    for name, formatter in (
+        ("ast.literal_eval", _literal_eval_format_error),
+        ("structured", format_error),
+    ):
+        best = _bench(errors, formatter)
+        print(f"{name:<20} {best * 1000:8.3f} ms per {NUM_ERRORS} errors")
+
+
+if __name__ == "__main__":
+    main()
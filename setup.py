@@ -39,6 +39,10 @@ setup(
         "tartiflette>=1.0,<1.5",
         "typing-extensions; python_version<'3.8'",
     ],
+    extras_require={
+        "msgpack": ["msgpack"],
+        "uploads": ["python-multipart", "starlette>=0.25"],
+    },
     python_requires=">=3.6",
     # https://pypi.org/pypi?%3Aaction=list_classifiers
     license="MIT",
@@ -1,5 +1,54 @@
+from ._admission import AdmissionControl
 from ._app import TartifletteApp
-from ._datastructures import GraphiQL, Subscriptions
+from ._backpressure import Backpressure
+from ._cache import DocumentCache
+from ._coalescing import Coalescing
+from ._cost import CostAnalysis
+from ._datastructures import Batching, GraphiQL, Subscriptions, WriteBatching
+from ._errors import format_error
+from ._fanout import SharedSubscriptions
+from ._http_caching import CacheControl
+from ._instrumentation import Instrumentation
+from ._json import JSONCodec
+from ._limits import Limits
+from ._metrics import Metrics
+from ._msgpack import MessagePackCodec
+from ._persisted import InMemoryPersistedQueryStore, PersistedQueryStore
+from ._response_cache import (
+    InMemoryResponseCacheBackend,
+    ResponseCache,
+    ResponseCacheBackend,
+)
+from ._slow_log import InMemorySlowOperationSink, SlowOperationLog, SlowOperationSink
+from ._uploads import Uploads
 
 __version__ = "0.12.0"
-__all__ = ["GraphiQL", "Subscriptions", "TartifletteApp"]
+__all__ = [
+    "AdmissionControl",
+    "Backpressure",
+    "Batching",
+    "CacheControl",
+    "Coalescing",
+    "CostAnalysis",
+    "DocumentCache",
+    "GraphiQL",
+    "InMemoryPersistedQueryStore",
+    "InMemoryResponseCacheBackend",
+    "InMemorySlowOperationSink",
+    "Instrumentation",
+    "JSONCodec",
+    "Limits",
+    "MessagePackCodec",
+    "Metrics",
+    "PersistedQueryStore",
+    "ResponseCache",
+    "ResponseCacheBackend",
+    "SharedSubscriptions",
+    "SlowOperationLog",
+    "SlowOperationSink",
+    "Subscriptions",
+    "TartifletteApp",
+    "Uploads",
+    "WriteBatching",
+    "format_error",
+]
@@ -0,0 +1,188 @@
+import asyncio
+import collections
+import typing
+
+from tartiflette import Engine
+
+from ._document import get_document_operation
+
+
+class Overloaded(Exception):
+    def __init__(self, message: str, reason: str, retry_after: int) -> None:
+        super().__init__(message, reason, retry_after)
+        self.message = message
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_dict(self) -> dict:
+        return {"message": self.message, "extensions": {"code": "OVERLOADED"}}
+
+
+class _Slots:
+    # A counter of concurrent executions, with a bounded FIFO queue of
+    # executions waiting for a slot.
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: typing.Deque[asyncio.Future] = collections.deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def try_acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        return False
+
+    def can_wait(self) -> bool:
+        return len(self._waiters) < self.max_queue
+
+    async def wait(self, timeout: typing.Optional[float]) -> bool:
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as the waiter went away.
+                self.release()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+        return True
+
+    def release(self) -> None:
+        # Hand the slot over to the first waiter, if any.
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionControl:
+    QUERY = "query"
+    MUTATION = "mutation"
+    SUBSCRIPTION = "subscription"
+
+    QUEUE_FULL = "queue_full"
+    QUEUE_TIMEOUT = "queue_timeout"
+    EVENT_LOOP_LAG = "event_loop_lag"
+
+    def __init__(
+        self,
+        *,
+        max_queries: int = 100,
+        max_mutations: int = None,
+        max_subscriptions: int = None,
+        max_queue: int = 100,
+        queue_timeout: typing.Optional[float] = 1.0,
+        max_event_loop_lag: float = None,
+        lag_interval: float = 0.1,
+        retry_after: int = 1,
+    ) -> None:
+        assert max_queries > 0, "`max_queries` must be a positive integer"
+        assert max_queue >= 0, "`max_queue` must be a positive integer"
+        assert lag_interval > 0, "`lag_interval` must be positive"
+        self.max_queries = max_queries
+        self.max_mutations = max_mutations
+        self.max_subscriptions = max_subscriptions
+        self.queue_timeout = queue_timeout
+        self.max_event_loop_lag = max_event_loop_lag
+        self.lag_interval = lag_interval
+        self.retry_after = retry_after
+        self.rejected = 0
+        self.rejections: typing.Dict[str, int] = {}
+        # Last measured event loop lag, in seconds.
+        self.lag = 0.0
+        self._slots: typing.Dict[str, _Slots] = {}
+        queries = _Slots(max_queries, max_queue)
+        self._slots[self.QUERY] = queries
+        # NOTE: unless limited separately, mutations share the query slots.
+        self._slots[self.MUTATION] = (
+            _Slots(max_mutations, max_queue) if max_mutations is not None else queries
+        )
+        if max_subscriptions is not None:
+            # NOTE: subscriptions are long-lived, so they are never queued.
+            self._slots[self.SUBSCRIPTION] = _Slots(max_subscriptions, 0)
+        self._monitor: typing.Optional[asyncio.Future] = None
+
+    @property
+    def inflight(self) -> int:
+        return sum(slots.active for slots in set(self._slots.values()))
+
+    @property
+    def queued(self) -> int:
+        return sum(slots.queued for slots in set(self._slots.values()))
+
+    def get_operation_type(
+        self,
+        engine: Engine,
+        query: typing.Union[str, bytes],
+        operation_name: typing.Optional[str],
+    ) -> str:
+        if self.max_mutations is None:
+            # Queries and mutations share slots, no need to look further.
+            return self.QUERY
+        operation = get_document_operation(engine, query, operation_name)
+        if operation is None:
+            return self.QUERY
+        return operation.operation_type
+
+    async def acquire(self, operation_type: str) -> None:
+        slots = self._slots.get(operation_type)
+        if slots is None:
+            return
+
+        if self.max_event_loop_lag is not None:
+            self._start_monitor()
+            if self.lag > self.max_event_loop_lag:
+                raise self._reject(
+                    self.EVENT_LOOP_LAG,
+                    f"Server is overloaded (event loop lag: {self.lag:.3f}s).",
+                )
+
+        if slots.try_acquire():
+            return
+        if not slots.can_wait():
+            raise self._reject(self.QUEUE_FULL, "Server is overloaded.")
+        if not await slots.wait(self.queue_timeout):
+            raise self._reject(
+                self.QUEUE_TIMEOUT, "Server is overloaded (timed out in queue)."
+            )
+
+    def release(self, operation_type: str) -> None:
+        slots = self._slots.get(operation_type)
+        if slots is not None:
+            slots.release()
+
+    def _reject(self, reason: str, message: str) -> Overloaded:
+        self.rejected += 1
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        return Overloaded(message, reason, self.retry_after)
+
+    # Event loop lag.
+
+    def _start_monitor(self) -> None:
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.ensure_future(self._measure_lag())
+
+    async def _measure_lag(self) -> None:
+        # NOTE: the task stops once there are no executions left, and is
+        # started again by the next call to `acquire()`.
+        loop = asyncio.get_event_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self.lag = max(0.0, loop.time() - started - self.lag_interval)
+            if not self.inflight:
+                self.lag = 0.0
+                return
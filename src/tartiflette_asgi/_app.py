@@ -4,9 +4,29 @@ from starlette.routing import BaseRoute, Route, Router, WebSocketRoute
 from starlette.types import Receive, Scope, Send
 from tartiflette import Engine
 
-from ._datastructures import GraphiQL, GraphQLConfig, Subscriptions
-from ._endpoints import GraphiQLEndpoint, GraphQLEndpoint, SubscriptionEndpoint
+from ._admission import AdmissionControl
+from ._cache import DocumentCache
+from ._coalescing import Coalescing
+from ._cost import CostAnalysis
+from ._datastructures import Batching, GraphiQL, GraphQLConfig, Subscriptions
+from ._endpoints import (
+    GraphiQLEndpoint,
+    GraphQLEndpoint,
+    MetricsEndpoint,
+    SSEEndpoint,
+    SubscriptionEndpoint,
+)
+from ._errors import ErrorFormatter, format_error
+from ._http_caching import CacheControl
+from ._instrumentation import Instrumentation
+from ._json import JSONCodec
+from ._limits import Limits
+from ._metrics import Metrics
 from ._middleware import GraphQLMiddleware
+from ._persisted import InMemoryPersistedQueryStore, PersistedQueryStore
+from ._response_cache import ResponseCache
+from ._slow_log import SlowOperationLog
+from ._uploads import Uploads
 
 
 class TartifletteApp:
@@ -20,6 +40,21 @@ class TartifletteApp:
         subscriptions: typing.Union[bool, Subscriptions] = None,
         context: dict = None,
         schema_name: str = "default",
+        document_cache: typing.Union[None, bool, DocumentCache] = None,
+        persisted_queries: typing.Union[None, bool, PersistedQueryStore] = None,
+        error_formatter: ErrorFormatter = format_error,
+        json_codec: JSONCodec = None,
+        batching: typing.Union[None, bool, Batching] = None,
+        coalescing: typing.Union[None, bool, Coalescing] = None,
+        response_cache: typing.Union[None, bool, ResponseCache] = None,
+        cache_control: typing.Union[None, bool, CacheControl] = None,
+        uploads: typing.Union[None, bool, Uploads] = None,
+        limits: typing.Union[None, bool, Limits] = None,
+        cost_analysis: typing.Union[None, bool, CostAnalysis] = None,
+        instrumentation: Instrumentation = None,
+        metrics: typing.Union[None, bool, Metrics] = None,
+        slow_log: typing.Union[None, bool, SlowOperationLog] = None,
+        admission: typing.Union[None, bool, AdmissionControl] = None,
     ) -> None:
         if engine is None:
             assert sdl, "`sdl` expected if `engine` not given"
@@ -46,15 +81,121 @@ class TartifletteApp:
 
         assert subscriptions is None or isinstance(subscriptions, Subscriptions)
 
+        if document_cache is True:
+            document_cache = DocumentCache()
+        elif not document_cache:
+            document_cache = None
+
+        assert document_cache is None or isinstance(document_cache, DocumentCache)
+
+        self.document_cache = document_cache
+
+        if persisted_queries is True:
+            persisted_queries = InMemoryPersistedQueryStore()
+        elif not persisted_queries:
+            persisted_queries = None
+
+        assert persisted_queries is None or isinstance(
+            persisted_queries, PersistedQueryStore
+        )
+
+        if json_codec is None:
+            json_codec = JSONCodec()
+
+        assert isinstance(json_codec, JSONCodec)
+
+        if batching is True:
+            batching = Batching()
+        elif not batching:
+            batching = None
+
+        assert batching is None or isinstance(batching, Batching)
+
+        if coalescing is True:
+            coalescing = Coalescing()
+        elif not coalescing:
+            coalescing = None
+
+        assert coalescing is None or isinstance(coalescing, Coalescing)
+
+        if response_cache is True:
+            response_cache = ResponseCache()
+        elif not response_cache:
+            response_cache = None
+
+        assert response_cache is None or isinstance(response_cache, ResponseCache)
+
+        self.response_cache = response_cache
+
+        if cache_control is True:
+            cache_control = CacheControl()
+        elif not cache_control:
+            cache_control = None
+
+        assert cache_control is None or isinstance(cache_control, CacheControl)
+
+        if uploads is True:
+            uploads = Uploads()
+        elif not uploads:
+            uploads = None
+
+        assert uploads is None or isinstance(uploads, Uploads)
+
+        if limits is True:
+            limits = Limits()
+        elif not limits:
+            limits = None
+
+        assert limits is None or isinstance(limits, Limits)
+
+        if cost_analysis is True:
+            cost_analysis = CostAnalysis()
+        elif not cost_analysis:
+            cost_analysis = None
+
+        assert cost_analysis is None or isinstance(cost_analysis, CostAnalysis)
+
+        assert instrumentation is None or isinstance(instrumentation, Instrumentation)
+
+        if metrics is True:
+            metrics = Metrics()
+        elif not metrics:
+            metrics = None
+
+        assert metrics is None or isinstance(metrics, Metrics)
+
+        self.metrics = metrics
+
+        if slow_log is True:
+            slow_log = SlowOperationLog()
+        elif not slow_log:
+            slow_log = None
+
+        assert slow_log is None or isinstance(slow_log, SlowOperationLog)
+
+        self.slow_log = slow_log
+
+        if admission is True:
+            admission = AdmissionControl()
+        elif not admission:
+            admission = None
+
+        assert admission is None or isinstance(admission, AdmissionControl)
+
         routes: typing.List[BaseRoute] = []
 
         if graphiql and graphiql.path is not None:
             routes.append(Route(graphiql.path, GraphiQLEndpoint))
 
+        if metrics is not None and metrics.path is not None:
+            routes.append(Route(metrics.path, MetricsEndpoint))
+
         routes.append(Route(path, GraphQLEndpoint))
 
         if subscriptions is not None:
             routes.append(WebSocketRoute(subscriptions.path, SubscriptionEndpoint))
+            if subscriptions.sse_path is not None:
+                routes.append(Route(subscriptions.sse_path, SSEEndpoint))
 
         self.router = Router(routes=routes, on_startup=[self.startup])
 
@@ -64,6 +205,20 @@ class TartifletteApp:
             graphiql=graphiql,
             path=path,
             subscriptions=subscriptions,
+            persisted_queries=persisted_queries,
+            error_formatter=error_formatter,
+            json_codec=json_codec,
+            batching=batching,
+            coalescing=coalescing,
+            response_cache=response_cache,
+            cache_control=cache_control,
+            uploads=uploads,
+            limits=limits,
+            cost_analysis=cost_analysis,
+            instrumentation=instrumentation,
+            metrics=metrics,
+            slow_log=slow_log,
+            admission=admission,
         )
 
         self.app = GraphQLMiddleware(self.router, config=config)
@@ -71,7 +226,16 @@ class TartifletteApp:
         self._started_up = False
 
     async def startup(self) -> None:
-        await self.engine.cook()
+        document_cache = self.document_cache
+        if document_cache is not None and self.engine._cooked:  # type: ignore
+            # NOTE: the query cache decorator only applies when cooking.
+            document_cache.install(self.engine)
+        elif document_cache is not None:
+            await self.engine.cook(query_cache_decorator=document_cache)
+        else:
+            await self.engine.cook()
+        if self.slow_log is not None:
+            self.slow_log.install(self.engine)
         self._started_up = True
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
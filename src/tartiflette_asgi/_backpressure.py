@@ -0,0 +1,115 @@
+import asyncio
+import collections
+import typing
+
+_END = object()
+
+
+class _Error(typing.NamedTuple):
+    exc: BaseException
+
+
+class _OutboundQueue:
+    def __init__(self) -> None:
+        self.items: typing.Deque[typing.Any] = collections.deque()
+        self.ready = asyncio.Event()
+        self.end: typing.Any = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def finish(self, end: typing.Any) -> None:
+        self.end = end
+        self.ready.set()
+
+    async def get(self) -> typing.Any:
+        while not self.items:
+            if self.end is not None:
+                return self.end
+            self.ready.clear()
+            await self.ready.wait()
+        return self.items.popleft()
+
+
+class Backpressure:
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+    DISCONNECT = "disconnect"
+
+    def __init__(self, *, max_size: int = 100, overflow: str = DROP_OLDEST) -> None:
+        assert max_size > 0, "`max_size` must be a positive integer"
+        assert overflow in {
+            self.DROP_OLDEST,
+            self.CONFLATE,
+            self.DISCONNECT,
+        }, f"Unknown overflow policy: {overflow!r}"
+        self.max_size = max_size
+        self.overflow = overflow
+        self.dropped = 0
+        self.disconnects = 0
+        self._queues: typing.Set[_OutboundQueue] = set()
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    async def buffer(
+        self,
+        agen: typing.AsyncGenerator[typing.Any, None],
+        on_overflow: typing.Callable[[], None],
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        # NOTE: the source is consumed in a separate task, so that a slow
+        # subscriber does not stall it. Pending items are kept in a bounded
+        # queue, which overflows according to the configured policy.
+        queue = _OutboundQueue()
+        self._queues.add(queue)
+        task = asyncio.ensure_future(self._produce(agen, queue, on_overflow))
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Error):
+                    raise item.exc
+                yield item
+        finally:
+            self._queues.discard(queue)
+            task.cancel()
+
+    async def _produce(
+        self,
+        agen: typing.AsyncGenerator[typing.Any, None],
+        queue: _OutboundQueue,
+        on_overflow: typing.Callable[[], None],
+    ) -> None:
+        try:
+            async for item in agen:
+                if not self._put(queue, item):
+                    self.disconnects += 1
+                    on_overflow()
+                    return
+        except Exception as exc:
+            queue.finish(_Error(exc))
+        else:
+            queue.finish(_END)
+        finally:
+            await agen.aclose()
+
+    def _put(self, queue: _OutboundQueue, item: typing.Any) -> bool:
+        if len(queue) >= self.max_size:
+            if self.overflow == self.DISCONNECT:
+                self.dropped += len(queue) + 1
+                queue.items.clear()
+                return False
+            if self.overflow == self.CONFLATE:
+                # Only the latest item is relevant to the subscriber.
+                self.dropped += len(queue)
+                queue.items.clear()
+            else:
+                self.dropped += 1
+                queue.items.popleft()
+
+        queue.items.append(item)
+        queue.ready.set()
+        return True
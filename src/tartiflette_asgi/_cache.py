@@ -0,0 +1,110 @@
+import collections
+import typing
+
+from tartiflette import Engine
+from tartiflette.execution.collect import parse_and_validate_query
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+ParseAndValidate = typing.Callable[
+    [typing.Union[str, bytes], typing.Any], typing.Tuple[typing.Any, typing.Any]
+]
+
+
+class LRUCache(typing.Generic[K, V]):
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        on_evict: typing.Callable[[K, V], None] = None,
+    ) -> None:
+        assert max_size > 0, "`max_size` must be a positive integer"
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: "collections.OrderedDict[K, V]" = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+    def get(self, key: K, default: typing.Optional[V] = None) -> typing.Optional[V]:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            evicted_key, evicted_value = self._items.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: K, default: typing.Optional[V] = None) -> typing.Optional[V]:
+        return self._items.pop(key, default)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class DocumentCache:
+    def __init__(self, *, max_size: int = 512) -> None:
+        self._cache: LRUCache[str, typing.Tuple[typing.Any, typing.Any]] = LRUCache(
+            max_size=max_size
+        )
+
+    @property
+    def max_size(self) -> int:
+        return self._cache.max_size
+
+    @property
+    def size(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    @property
+    def evictions(self) -> int:
+        return self._cache.evictions
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def install(self, engine: Engine) -> None:
+        # Install the cache on an engine which has already been cooked.
+        engine._cached_parse_and_validate_query = self(  # type: ignore
+            parse_and_validate_query
+        )
+
+    def __call__(self, func: ParseAndValidate) -> ParseAndValidate:
+        # Used as the engine's `query_cache_decorator`, so that both
+        # `engine.execute()` and `engine.subscribe()` go through the cache.
+        def cached(
+            query: typing.Union[str, bytes], schema: typing.Any
+        ) -> typing.Tuple[typing.Any, typing.Any]:
+            key = query.decode() if isinstance(query, bytes) else query
+            result = self._cache.get(key)
+            if result is None:
+                result = func(query, schema)
+                self._cache.set(key, result)
+            return result
+
+        return cached
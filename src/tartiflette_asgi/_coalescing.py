@@ -0,0 +1,80 @@
+import asyncio
+import json
+import typing
+
+from starlette.requests import Request
+
+from ._document import get_document_hash
+
+T = typing.TypeVar("T")
+
+ContextKey = typing.Callable[[Request], typing.Hashable]
+
+
+def _no_context_key(request: Request) -> None:
+    return None
+
+
+# Requests carrying these headers may get per-user results.
+_CREDENTIALS_HEADERS = ("authorization", "cookie")
+
+
+class Coalescing:
+    def __init__(self, *, context_key: ContextKey = None) -> None:
+        self.context_key = context_key if context_key is not None else _no_context_key
+        self.executions = 0
+        self.saved = 0
+        self._inflight: typing.Dict[typing.Hashable, asyncio.Future] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def get_key(
+        self,
+        request: Request,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[dict],
+        operation_name: typing.Optional[str],
+    ) -> typing.Optional[typing.Hashable]:
+        # Return `None` if the request must not be coalesced.
+        if self.context_key is _no_context_key and any(
+            name in request.headers for name in _CREDENTIALS_HEADERS
+        ):
+            # Without a `context_key`, results would leak across users.
+            return None
+        try:
+            serialized_variables = json.dumps(variables, sort_keys=True)
+        except (TypeError, ValueError):
+            # E.g. variables holding uploaded files.
+            return None
+        return (
+            get_document_hash(query),
+            serialized_variables,
+            operation_name,
+            self.context_key(request),
+        )
+
+    async def run(
+        self, key: typing.Hashable, func: typing.Callable[[], typing.Awaitable[T]]
+    ) -> T:
+        future = self._inflight.get(key)
+
+        if future is None:
+            self.executions += 1
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._done(key, future))
+        else:
+            self.saved += 1
+
+        # NOTE: shield the shared execution, so that a client going away
+        # does not cancel it for the other clients awaiting its result.
+        return await asyncio.shield(future)
+
+    def _done(self, key: typing.Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved, in case all awaiters went away.
+            future.exception()
@@ -0,0 +1,246 @@
+"""Static analysis of the depth and cost of GraphQL operations."""
+import typing
+
+from tartiflette import Engine
+from tartiflette.language.ast import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    VariableNode,
+)
+
+from ._cache import LRUCache
+from ._document import get_document_hash, get_operation, parse_document
+
+# The multiplier of a field: a literal list size, the name of a variable
+# holding it, or `None` for fields which do not return lists.
+Multiplier = typing.Union[None, int, str]
+
+
+class CostLimitExceeded(Exception):
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message, code)
+        self.message = message
+        self.code = code
+
+    def to_dict(self) -> dict:
+        return {"message": self.message, "extensions": {"code": self.code}}
+
+
+class QueryCost(typing.NamedTuple):
+    depth: int
+    cost: int
+
+
+class _Node(typing.NamedTuple):
+    cost: int
+    multiplier: Multiplier
+    children: typing.Tuple["_Node", ...]
+
+
+class _Plan(typing.NamedTuple):
+    # What is known about an operation without its variables.
+    depth: int
+    nodes: typing.Tuple[_Node, ...]
+    # Integer default values of the operation's variables.
+    defaults: typing.Dict[str, int]
+
+
+def _unwrap(graphql_type: typing.Any) -> typing.Tuple[typing.Any, bool]:
+    is_list = False
+    while graphql_type is not None and graphql_type.is_wrapping_type:
+        is_list = is_list or graphql_type.is_list_type
+        graphql_type = graphql_type.wrapped_type
+    return graphql_type, is_list
+
+
+def _evaluate(nodes: typing.Iterable[_Node], variables: typing.Optional[dict]) -> int:
+    total = 0
+    for node in nodes:
+        multiplier = node.multiplier
+        if isinstance(multiplier, str):
+            multiplier = (variables or {}).get(multiplier)
+        if not isinstance(multiplier, int) or multiplier < 0:
+            multiplier = 1
+        total += node.cost + multiplier * _evaluate(node.children, variables)
+    return total
+
+
+class CostAnalysis:
+    DEPTH_LIMIT_EXCEEDED = "DEPTH_LIMIT_EXCEEDED"
+    COST_LIMIT_EXCEEDED = "COST_LIMIT_EXCEEDED"
+
+    def __init__(
+        self,
+        *,
+        max_depth: int = None,
+        max_cost: int = None,
+        default_cost: int = 1,
+        field_costs: typing.Dict[str, int] = None,
+        list_arguments: typing.Sequence[str] = ("first", "last", "limit"),
+        default_list_size: int = 1,
+        max_size: int = 512,
+    ) -> None:
+        assert max_depth is None or max_depth > 0, "`max_depth` must be positive"
+        assert max_cost is None or max_cost > 0, "`max_cost` must be positive"
+        self.max_depth = max_depth
+        self.max_cost = max_cost
+        self.default_cost = default_cost
+        self.field_costs = field_costs if field_costs is not None else {}
+        self.list_arguments = tuple(list_arguments)
+        self.default_list_size = default_list_size
+        self.rejected = 0
+        self._plans: LRUCache[
+            typing.Tuple[str, typing.Optional[str]], _Plan
+        ] = LRUCache(max_size=max_size)
+
+    def analyze(
+        self,
+        engine: Engine,
+        query: typing.Union[str, bytes],
+        operation_name: typing.Optional[str],
+        variables: typing.Optional[dict],
+    ) -> typing.Optional[QueryCost]:
+        # Returns `None` for invalid documents, for which the engine reports
+        # errors on execution.
+        key = (get_document_hash(query), operation_name)
+        plan = self._plans.get(key)
+
+        if plan is None:
+            document = parse_document(engine, query)
+            if document is None:
+                return None
+            operation = get_operation(document, operation_name)
+            if operation is None:
+                return None
+            plan = self._compile(engine, document, operation)
+            self._plans.set(key, plan)
+
+        # NOTE: variables which are provided (even as `null`) override defaults.
+        variables = {**plan.defaults, **(variables or {})}
+        return QueryCost(depth=plan.depth, cost=_evaluate(plan.nodes, variables))
+
+    def check(self, cost: QueryCost) -> None:
+        if self.max_depth is not None and cost.depth > self.max_depth:
+            self.rejected += 1
+            raise CostLimitExceeded(
+                f"Query depth {cost.depth} exceeds the maximum of {self.max_depth}.",
+                self.DEPTH_LIMIT_EXCEEDED,
+            )
+        if self.max_cost is not None and cost.cost > self.max_cost:
+            self.rejected += 1
+            raise CostLimitExceeded(
+                f"Query cost {cost.cost} exceeds the maximum of {self.max_cost}.",
+                self.COST_LIMIT_EXCEEDED,
+            )
+
+    def _compile(
+        self,
+        engine: Engine,
+        document: DocumentNode,
+        operation: OperationDefinitionNode,
+    ) -> _Plan:
+        schema: typing.Any = engine._schema  # type: ignore
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        root_type = schema.find_type(
+            {
+                "query": schema.query_operation_name,
+                "mutation": schema.mutation_operation_name,
+                "subscription": schema.subscription_operation_name,
+            }[operation.operation_type]
+        )
+
+        def find_type(name: str) -> typing.Any:
+            return schema.find_type(name) if schema.has_type(name) else None
+
+        def visit(
+            selection_set: typing.Any, parent_type: typing.Any
+        ) -> typing.Tuple[int, typing.List[_Node]]:
+            # Returns the depth and the nodes of a selection set.
+            depth = 0
+            nodes: typing.List[_Node] = []
+
+            for selection in selection_set.selections if selection_set else ():
+                if isinstance(selection, FieldNode):
+                    node, field_depth = visit_field(selection, parent_type)
+                    nodes.append(node)
+                    depth = max(depth, field_depth)
+                    continue
+
+                if isinstance(selection, FragmentSpreadNode):
+                    fragment: typing.Any = fragments.get(selection.name.value)
+                    if fragment is None:
+                        continue
+                elif isinstance(selection, InlineFragmentNode):
+                    fragment = selection
+                else:  # pragma: no cover
+                    continue
+
+                # NOTE: fragments on distinct types of an abstract type are
+                # mutually exclusive, but summing them keeps an upper bound.
+                fragment_type = parent_type
+                if fragment.type_condition is not None:
+                    fragment_type = find_type(fragment.type_condition.name.value)
+                fragment_depth, fragment_nodes = visit(
+                    fragment.selection_set, fragment_type
+                )
+                nodes.extend(fragment_nodes)
+                depth = max(depth, fragment_depth)
+
+            return depth, nodes
+
+        def visit_field(
+            node: FieldNode, parent_type: typing.Any
+        ) -> typing.Tuple[_Node, int]:
+            name = node.name.value
+            if name.startswith("__"):
+                return _Node(cost=0, multiplier=None, children=()), 1
+
+            field_type = None
+            is_list = False
+            if parent_type is not None and hasattr(parent_type, "find_field"):
+                try:
+                    field = parent_type.find_field(name)
+                except KeyError:
+                    field = None
+                if field is not None:
+                    field_type, is_list = _unwrap(field.graphql_type)
+
+            cost = self.default_cost
+            if parent_type is not None:
+                cost = self.field_costs.get(f"{parent_type.name}.{name}", cost)
+
+            multiplier: Multiplier = None
+            for argument in node.arguments or ():
+                if argument.name.value not in self.list_arguments:
+                    continue
+                if isinstance(argument.value, IntValueNode):
+                    multiplier = int(argument.value.value)
+                elif isinstance(argument.value, VariableNode):
+                    multiplier = argument.value.name.value
+                break
+            else:
+                if is_list:
+                    multiplier = self.default_list_size
+
+            depth, children = visit(node.selection_set, field_type)
+            field_node = _Node(
+                cost=cost, multiplier=multiplier, children=tuple(children)
+            )
+            return field_node, depth + 1
+
+        defaults = {
+            definition.variable.name.value: int(definition.default_value.value)
+            for definition in operation.variable_definitions or ()
+            if isinstance(definition.default_value, IntValueNode)
+        }
+        depth, nodes = visit(operation.selection_set, root_type)
+        return _Plan(depth=depth, nodes=tuple(nodes), defaults=defaults)
@@ -6,6 +6,24 @@ import typing
 
 from tartiflette import Engine
 
+from ._admission import AdmissionControl
+from ._backpressure import Backpressure
+from ._coalescing import Coalescing
+from ._cost import CostAnalysis
+from ._errors import ErrorFormatter
+from ._fanout import SharedSubscriptions
+from ._http_caching import CacheControl
+from ._instrumentation import Instrumentation
+from ._json import JSONCodec
+from ._limits import Limits
+from ._metrics import Metrics
+from ._msgpack import MessagePackCodec
+from ._persisted import PersistedQueryStore
+from ._response_cache import ResponseCache
+from ._slow_log import SlowOperationLog
+from ._timers import TimerWheel
+from ._uploads import Uploads
+
 _GRAPHIQL_TEMPLATE = os.path.join(os.path.dirname(__file__), "graphiql.html")
 
 
@@ -13,9 +31,117 @@ def _optional(value: typing.Optional[str]) -> str:
     return value if value is not None else ""
 
 
+class WriteBatching:
+    def __init__(self, *, window: float = 0.005, max_size: int = 64) -> None:
+        assert window >= 0, "`window` must be a positive number"
+        assert max_size > 0, "`max_size` must be a positive integer"
+        self.window = window
+        self.max_size = max_size
+        self.flushes = 0
+        self.messages = 0
+
+
 class Subscriptions:
-    def __init__(self, *, path: str) -> None:
+    def __init__(
+        self,
+        *,
+        path: str,
+        sse_path: str = None,
+        max_operations: int = None,
+        shared: typing.Union[bool, SharedSubscriptions] = None,
+        backpressure: typing.Union[bool, Backpressure] = None,
+        keep_alive_interval: float = None,
+        idle_timeout: float = None,
+        write_batching: typing.Union[bool, WriteBatching] = None,
+        msgpack: typing.Union[bool, MessagePackCodec] = None,
+    ) -> None:
+        assert (
+            max_operations is None or max_operations > 0
+        ), "`max_operations` must be a positive integer"
+        assert (
+            keep_alive_interval is None or keep_alive_interval > 0
+        ), "`keep_alive_interval` must be positive"
+        assert (
+            idle_timeout is None or idle_timeout > 0
+        ), "`idle_timeout` must be positive"
+
+        if shared is True:
+            shared = SharedSubscriptions()
+        elif not shared:
+            shared = None
+
+        assert shared is None or isinstance(shared, SharedSubscriptions)
+
+        if backpressure is True:
+            backpressure = Backpressure()
+        elif not backpressure:
+            backpressure = None
+
+        assert backpressure is None or isinstance(backpressure, Backpressure)
+
+        if write_batching is True:
+            write_batching = WriteBatching()
+        elif not write_batching:
+            write_batching = None
+
+        assert write_batching is None or isinstance(write_batching, WriteBatching)
+
+        if msgpack is True:
+            msgpack = MessagePackCodec()
+        elif not msgpack:
+            msgpack = None
+
+        assert msgpack is None or isinstance(msgpack, MessagePackCodec)
+
         self.path = path
+        self.sse_path = sse_path
+        self.max_operations = max_operations
+        self.shared = shared
+        self.backpressure = backpressure
+        self.keep_alive_interval = keep_alive_interval
+        self.idle_timeout = idle_timeout
+        self.write_batching = write_batching
+        self.msgpack = msgpack
+        self.task_errors = 0
+        self.idle_closed = 0
+        self.messages_sent = 0
+
+        # Connection timers are all served by a single timer wheel, which
+        # ticks at a fraction of the shortest interval.
+        intervals = [
+            interval
+            for interval in (keep_alive_interval, idle_timeout)
+            if interval is not None
+        ]
+        self.timers: typing.Optional[TimerWheel] = None
+        if intervals:
+            self.timers = TimerWheel(resolution=min(1.0, min(intervals) / 10))
+        self._connections: typing.Set[typing.Any] = set()
+        self._streams: typing.Set[typing.Any] = set()
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    @property
+    def streams(self) -> int:
+        return len(self._streams)
+
+    @property
+    def tasks(self) -> int:
+        return sum(
+            len(connection.tasks) for connection in (*self._connections, *self._streams)
+        )
+
+    @property
+    def operations(self) -> int:
+        return sum(connection.operations for connection in self._connections)
+
+
+class Batching:
+    def __init__(self, *, max_size: int = 10) -> None:
+        assert max_size > 0, "`max_size` must be a positive integer"
+        self.max_size = max_size
 
 
 class GraphiQL:
@@ -55,3 +181,17 @@ class GraphQLConfig(typing.NamedTuple):
     graphiql: typing.Optional[GraphiQL]
     path: str
     subscriptions: typing.Optional[Subscriptions]
+    persisted_queries: typing.Optional[PersistedQueryStore]
+    error_formatter: ErrorFormatter
+    json_codec: JSONCodec
+    batching: typing.Optional[Batching]
+    coalescing: typing.Optional[Coalescing]
+    response_cache: typing.Optional[ResponseCache]
+    cache_control: typing.Optional[CacheControl]
+    uploads: typing.Optional[Uploads]
+    limits: typing.Optional[Limits]
+    cost_analysis: typing.Optional[CostAnalysis]
+    instrumentation: typing.Optional[Instrumentation]
+    metrics: typing.Optional[Metrics]
+    slow_log: typing.Optional[SlowOperationLog]
+    admission: typing.Optional[AdmissionControl]
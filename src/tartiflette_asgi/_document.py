@@ -0,0 +1,113 @@
+"""Helpers for inspecting GraphQL documents ahead of their execution."""
+import hashlib
+import re
+import typing
+
+from tartiflette import Engine, TartifletteError
+from tartiflette.language.ast import DocumentNode, OperationDefinitionNode
+
+# Matches string literals (which are kept as-is), as well as runs of ignored
+# tokens: whitespace, commas and comments.
+_TOKENS_RE = re.compile(
+    r'(?P<string>"""(?:\\"""|[^"]|"(?!""))*"""|"(?:\\.|[^"\\\n])*")'
+    r"|(?P<ignored>(?:[\s,\ufeff]|#[^\n\r]*)+)"
+)
+_NAME_CHARS = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_"'
+)
+
+
+def _normalize_token(match: typing.Match) -> str:
+    if match.group("string") is not None:
+        return match.group("string")
+    # Ignored tokens are only significant when separating two names or values.
+    start, end = match.span()
+    text = match.string
+    if 0 < start and end < len(text):
+        if text[start - 1] in _NAME_CHARS and text[end] in _NAME_CHARS:
+            return " "
+    return ""
+
+
+def normalize_query(query: typing.Union[str, bytes]) -> str:
+    if isinstance(query, bytes):
+        query = query.decode()
+    return _TOKENS_RE.sub(_normalize_token, query)
+
+
+def get_document_hash(query: typing.Union[str, bytes]) -> str:
+    if isinstance(query, str):
+        query = query.encode()
+    return hashlib.sha256(query).hexdigest()
+
+
+def parse_document(
+    engine: Engine, query: typing.Union[str, bytes]
+) -> typing.Optional[DocumentNode]:
+    # NOTE: go through the engine's own cached parsing function (which is the
+    # `DocumentCache`, if any), so that inspecting a document does not parse it
+    # a second time on execution.
+    parse_and_validate = engine._cached_parse_and_validate_query  # type: ignore
+    document, _ = parse_and_validate(query, engine._schema)  # type: ignore
+    return document
+
+
+def get_operation(
+    document: DocumentNode, operation_name: typing.Optional[str]
+) -> typing.Optional[OperationDefinitionNode]:
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+
+    for operation in operations:
+        if operation.name is not None and operation.name.value == operation_name:
+            return operation
+
+    return None
+
+
+def get_document_operation(
+    engine: Engine,
+    query: typing.Union[str, bytes],
+    operation_name: typing.Optional[str],
+) -> typing.Optional[OperationDefinitionNode]:
+    document = parse_document(engine, query)
+    if document is None:
+        return None
+    return get_operation(document, operation_name)
+
+
+async def execute_document(
+    engine: Engine,
+    document: DocumentNode,
+    operation_name: typing.Optional[str],
+    context: typing.Any,
+    variables: typing.Optional[typing.Dict[str, typing.Any]],
+) -> typing.Dict[str, typing.Any]:
+    # NOTE: same as `engine.execute()`, but for an already parsed and validated
+    # document, e.g. one which was split for incremental delivery.
+    schema: typing.Any = engine._schema  # type: ignore
+    try:
+        return await engine._query_executor(  # type: ignore
+            schema,
+            document,
+            None,
+            operation_name,
+            context,
+            variables,
+            None,
+            context_coercer=context,
+        )
+    except Exception as exc:
+        if not isinstance(exc, TartifletteError):
+            exc = TartifletteError(
+                message=str(exc),
+                path=[schema.query_operation_name],
+                original_error=exc,
+            )
+        return await engine._build_response(errors=[exc])  # type: ignore
@@ -1,18 +1,59 @@
-import json
+import asyncio
+import time
 import typing
 
-from starlette.background import BackgroundTasks
+from starlette import status
+from starlette.background import BackgroundTask, BackgroundTasks
 from starlette.datastructures import QueryParams
 from starlette.endpoints import HTTPEndpoint, WebSocketEndpoint
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.responses import (
+    HTMLResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.websockets import WebSocket
 from tartiflette import Engine
+from tartiflette.language.ast import DocumentNode
 
+from ._admission import Overloaded
+from ._cost import CostLimitExceeded
+from ._datastructures import GraphQLConfig
+from ._document import (
+    execute_document,
+    get_document_operation,
+    get_operation,
+    parse_document,
+)
 from ._errors import format_errors
+from ._http_caching import compute_etag, etag_matches
+from ._incremental import (
+    MEDIA_TYPE,
+    PART_HEADER,
+    TERMINATOR,
+    DeferredDocument,
+    accepts_multipart,
+    split_deferred,
+)
+from ._instrumentation import NULL_TRACER, Instrumentation, Tracer, get_tracer
+from ._json import JSONResponse
+from ._limits import LimitExceeded, read_body
+from ._metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from ._metrics import WebSocketStats
 from ._middleware import get_graphql_config
-from ._subscriptions import GraphQLWSProtocol
+from ._msgpack import SUBPROTOCOL_SUFFIX as MSGPACK_SUBPROTOCOL_SUFFIX
+from ._msgpack import MessagePackCodec
+from ._persisted import PersistedQueryError, get_persisted_query
+from ._response_cache import ResponseCacheContext
+from ._subscriptions import (
+    GraphQLSSEProtocol,
+    GraphQLTransportWSProtocol,
+    GraphQLWSProtocol,
+)
+from ._subscriptions.protocol import Payload
+from ._uploads import UploadError
 
 
 class GraphiQLEndpoint(HTTPEndpoint):
@@ -32,78 +73,547 @@ class GraphiQLEndpoint(HTTPEndpoint):
 
 
 class GraphQLEndpoint(HTTPEndpoint):
+    tracer: Tracer = NULL_TRACER
+    # Whether metrics have been recorded for the current request, and the
+    # operation name to record them under otherwise.
+    _observed = False
+    _operation_name: typing.Optional[str] = None
+    # The type of the operation holding an admission slot for the whole
+    # response, if any.
+    _admitted: typing.Optional[str] = None
+
     async def get(self, request: Request) -> Response:
+        config = get_graphql_config(request)
+        codec = config.json_codec
+
         variables = None
         if "variables" in request.query_params:
+            if config.limits is not None:
+                config.limits.check_variables(request.query_params["variables"], codec)
             try:
-                variables = json.loads(request.query_params["variables"])
-            except json.JSONDecodeError:
+                variables = codec.decode(request.query_params["variables"])
+            except ValueError:
                 return JSONResponse(
-                    {"error": "Unable to decode variables: Invalid JSON."}, 400
+                    {"error": "Unable to decode variables: Invalid JSON."},
+                    400,
+                    codec=codec,
+                )
+        extensions = None
+        if "extensions" in request.query_params:
+            try:
+                extensions = codec.decode(request.query_params["extensions"])
+            except ValueError:
+                return JSONResponse(
+                    {"error": "Unable to decode extensions: Invalid JSON."},
+                    400,
+                    codec=codec,
                 )
         return await self._get_response(
-            request, data=request.query_params, variables=variables
+            request,
+            data=request.query_params,
+            variables=variables,
+            extensions=extensions,
         )
 
     async def post(self, request: Request) -> Response:
         content_type = request.headers.get("Content-Type", "")
+        config = get_graphql_config(request)
+        codec = config.json_codec
+        limits = config.limits
 
         variables = None
         if "variables" in request.query_params:
+            if limits is not None:
+                limits.check_variables(request.query_params["variables"], codec)
             try:
-                variables = json.loads(request.query_params["variables"])
-            except json.JSONDecodeError:
+                variables = codec.decode(request.query_params["variables"])
+            except ValueError:
                 return JSONResponse(
-                    {"error": "Unable to decode variables: Invalid JSON."}, 400
+                    {"error": "Unable to decode variables: Invalid JSON."},
+                    400,
+                    codec=codec,
                 )
 
+        extensions = None
+
         if "application/json" in content_type:
             try:
-                data = await request.json()
-            except json.JSONDecodeError:
-                return JSONResponse({"error": "Invalid JSON."}, 400)
+                with self.tracer.phase(Instrumentation.PARSING):
+                    data = codec.decode(await read_body(request, limits))
+            except ValueError:
+                return JSONResponse({"error": "Invalid JSON."}, 400, codec=codec)
+            if isinstance(data, list):
+                if limits is not None:
+                    limits.check_operations(data)
+                    for operation in data:
+                        if isinstance(operation, dict):
+                            limits.check_variables(operation.get("variables"), codec)
+                return await self._get_batch_response(request, operations=data)
+            if not isinstance(data, dict):
+                return JSONResponse({"error": "Invalid JSON."}, 400, codec=codec)
             variables = data.get("variables", variables)
+            extensions = data.get("extensions")
+            if limits is not None:
+                limits.check_variables(variables, codec)
         elif "application/graphql" in content_type:
-            body = await request.body()
-            data = {"query": body.decode()}
+            with self.tracer.phase(Instrumentation.PARSING):
+                body = await read_body(request, limits)
+                data = {"query": body.decode()}
+        elif "multipart/form-data" in content_type:
+            return await self._get_upload_response(request)
         elif "query" in request.query_params:
             data = request.query_params
         else:
             return PlainTextResponse("Unsupported Media Type", 415)
 
-        return await self._get_response(request, data=data, variables=variables)
+        return await self._get_response(
+            request, data=data, variables=variables, extensions=extensions
+        )
+
+    async def _get_upload_response(self, request: Request) -> Response:
+        config = get_graphql_config(request)
+        uploads = config.uploads
+
+        if uploads is None:
+            return PlainTextResponse("Unsupported Media Type", 415)
+
+        try:
+            with self.tracer.phase(Instrumentation.PARSING):
+                data, files = await uploads.parse(request, config.json_codec)
+        except UploadError as exc:
+            return JSONResponse(
+                {"error": exc.message}, exc.status_code, codec=config.json_codec
+            )
+
+        try:
+            if isinstance(data, list):
+                if config.limits is not None:
+                    config.limits.check_operations(data)
+                response = await self._get_batch_response(request, operations=data)
+            else:
+                response = await self._get_response(
+                    request,
+                    data=data,
+                    variables=data.get("variables"),
+                    extensions=data.get("extensions"),
+                )
+        except BaseException:
+            for file in files:
+                await file.close()
+            raise
+
+        async def close_files() -> None:
+            for file in files:
+                await file.close()
+
+        # NOTE: close files once the response has been sent, as resolvers
+        # may still be reading them while streaming incremental results.
+        if isinstance(response.background, BackgroundTasks):
+            response.background.add_task(close_files)
+        else:
+            assert response.background is None
+            response.background = BackgroundTask(close_files)
+
+        return response
 
     async def _get_response(
-        self, request: Request, data: QueryParams, variables: typing.Optional[dict]
+        self,
+        request: Request,
+        data: QueryParams,
+        variables: typing.Optional[dict],
+        extensions: typing.Optional[dict] = None,
     ) -> Response:
+        config = get_graphql_config(request)
+        self._operation_name = data.get("operationName")
+
+        if config.limits is not None:
+            config.limits.check_query(data.get("query"))
+
         try:
-            query = data["query"]
-        except KeyError:
+            query = await get_persisted_query(
+                config.persisted_queries, data.get("query"), extensions
+            )
+        except PersistedQueryError as exc:
+            return JSONResponse(
+                {"errors": [exc.to_dict()]}, 400, codec=config.json_codec
+            )
+
+        if query is None:
             return PlainTextResponse("No GraphQL query found in the request", 400)
 
+        operation_name = data.get("operationName")
+
+        try:
+            self._analyze_cost(config, request, query, operation_name, variables)
+        except CostLimitExceeded as exc:
+            return JSONResponse(
+                {"data": None, "errors": [exc.to_dict()]},
+                400,
+                codec=config.json_codec,
+            )
+
+        background = BackgroundTasks()
+        context = {"req": request, "background": background, **config.context}
+
+        if accepts_multipart(request):
+            with self.tracer.phase(Instrumentation.VALIDATION):
+                document = parse_document(config.engine, query)
+            operation = None
+            if document is not None:
+                operation = get_operation(document, operation_name)
+            if operation is not None:
+                assert document is not None
+                deferred = split_deferred(document, operation, variables)
+                if deferred is not None:
+                    return await self._get_incremental_response(
+                        config,
+                        query,
+                        deferred,
+                        context=context,
+                        variables=variables,
+                        operation_name=operation_name,
+                        background=background,
+                    )
+
+        coalescing = config.coalescing
+        response_cache = config.response_cache
+        cache_control = config.cache_control
+        operation = None
+        if any(
+            option is not None for option in (coalescing, response_cache, cache_control)
+        ):
+            operation = get_document_operation(config.engine, query, operation_name)
+        is_query = operation is not None and operation.operation_type == "query"
+
+        body: typing.Optional[bytes] = None
+        status = 200
+        cache_key: typing.Optional[str] = None
+        if response_cache is not None:
+            cache_context = ResponseCacheContext(response_cache)
+            context["response_cache"] = cache_context
+            if is_query:
+                cache_key = response_cache.get_key(
+                    request, query, variables, operation_name
+                )
+                if cache_key is not None:
+                    body = await response_cache.get(cache_key)
+
+        async def render() -> typing.Tuple[bytes, int]:
+            content = await self._execute(
+                config,
+                query,
+                context=context,
+                variables=variables,
+                operation_name=operation_name,
+            )
+            status = 400 if "errors" in content else 200
+            with self.tracer.phase(Instrumentation.ENCODING):
+                body = config.json_codec.encode(content)
+            if cache_key is not None and status == 200:
+                assert response_cache is not None
+                await response_cache.set(cache_key, body, tags=cache_context.tags)
+            return body, status
+
+        if body is None:
+            key = None
+            if coalescing is not None and is_query:
+                key = coalescing.get_key(request, query, variables, operation_name)
+            if key is not None:
+                assert coalescing is not None
+                body, status = await coalescing.run(key, render)
+            else:
+                body, status = await render()
+
+        assert body is not None
+        self._observe(config, operation_name, len(body), error=status != 200)
+
+        headers: typing.Dict[str, str] = {}
+        server_timing = self.tracer.get_server_timing()
+        if server_timing is not None:
+            headers["Server-Timing"] = server_timing
+        if (
+            cache_control is not None
+            and is_query
+            and status == 200
+            and request.method in ("GET", "HEAD")
+        ):
+            assert operation is not None and body is not None
+            name = operation.name.value if operation.name is not None else None
+            header = cache_control.get_header(request, name)
+            if header is not None:
+                headers["Cache-Control"] = header
+            if cache_control.etag:
+                etag = compute_etag(body)
+                headers["ETag"] = etag
+                if_none_match = request.headers.get("If-None-Match")
+                if if_none_match is not None and etag_matches(if_none_match, etag):
+                    return Response(
+                        status_code=304, headers=headers, background=background
+                    )
+
+        return Response(
+            body,
+            status,
+            headers=headers,
+            media_type="application/json",
+            background=background,
+        )
+
+    async def _get_incremental_response(
+        self,
+        config: GraphQLConfig,
+        query: str,
+        deferred: DeferredDocument,
+        context: dict,
+        variables: typing.Optional[dict],
+        operation_name: typing.Optional[str],
+        background: BackgroundTasks,
+    ) -> Response:
+        admission = config.admission
+        if admission is not None:
+            operation_type = admission.get_operation_type(
+                config.engine, query, operation_name
+            )
+            await admission.acquire(operation_type)
+            # NOTE: the slot is held until the response has been sent, and
+            # released by `dispatch()`, as the stream may never be started.
+            self._admitted = operation_type
+
+        async def execute(document: DocumentNode) -> dict:
+            with self.tracer.phase(Instrumentation.EXECUTION):
+                result = await execute_document(
+                    config.engine, document, operation_name, context, variables
+                )
+            return self._format_result(config, result)
+
+        def encode_part(payload: dict) -> bytes:
+            with self.tracer.phase(Instrumentation.ENCODING):
+                return PART_HEADER + config.json_codec.encode(payload)
+
+        async def stream() -> typing.AsyncIterator[bytes]:
+            # NOTE: the whole operation is timed, and the slow log is started
+            # first so that deferred fragments are traced too.
+            slow_log = config.slow_log
+            timer = slow_log.start() if slow_log is not None else None
+            # Deferred fragments start executing right away, concurrently
+            # with the initial payload.
+            tasks = [
+                asyncio.ensure_future(execute(fragment.document))
+                for fragment in deferred.fragments
+            ]
+            labels = {
+                task: fragment.label
+                for task, fragment in zip(tasks, deferred.fragments)
+            }
+            pending = set(tasks)
+            try:
+                initial = await execute(deferred.initial)
+                yield encode_part({**initial, "hasNext": True})
+
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    incremental = []
+                    for task in tasks:
+                        if task not in done:
+                            continue
+                        patch = {**task.result(), "path": []}
+                        if labels[task] is not None:
+                            patch["label"] = labels[task]
+                        incremental.append(patch)
+                    yield encode_part(
+                        {"incremental": incremental, "hasNext": bool(pending)}
+                    )
+
+                yield TERMINATOR
+                self._observe(config, operation_name, None, error="errors" in initial)
+            finally:
+                for task in pending:
+                    task.cancel()
+                if slow_log is not None:
+                    assert timer is not None
+                    await slow_log.finish(timer, query, operation_name, variables)
+
+        return StreamingResponse(stream(), media_type=MEDIA_TYPE, background=background)
+
+    async def _get_batch_response(
+        self, request: Request, operations: typing.List[typing.Any]
+    ) -> Response:
         config = get_graphql_config(request)
+        batching = config.batching
+
+        if batching is None:
+            return JSONResponse(
+                {"error": "Batching is not enabled."}, 400, codec=config.json_codec
+            )
+
+        if not operations or len(operations) > batching.max_size:
+            return JSONResponse(
+                {
+                    "error": (
+                        "Batches must contain between 1 and "
+                        f"{batching.max_size} operations."
+                    )
+                },
+                400,
+                codec=config.json_codec,
+            )
+
+        # NOTE: the context is shared by all operations of the batch,
+        # so that e.g. dataloaders stored in it can dedupe across operations.
         background = BackgroundTasks()
         context = {"req": request, "background": background, **config.context}
+        if config.response_cache is not None:
+            context["response_cache"] = ResponseCacheContext(config.response_cache)
 
-        engine: Engine = config.engine
-        result: dict = await engine.execute(
-            query,
-            context=context,
-            variables=variables,
-            operation_name=data.get("operationName"),
+        contents = await asyncio.gather(
+            *(
+                self._execute_batch_operation(config, operation, context=context)
+                for operation in operations
+            )
         )
 
-        content = {"data": result["data"]}
-        has_errors = "errors" in result
-        if has_errors:
-            content["errors"] = format_errors(result["errors"])
-        status = 400 if has_errors else 200
+        with self.tracer.phase(Instrumentation.ENCODING):
+            response = JSONResponse(
+                contents, 200, codec=config.json_codec, background=background
+            )
+        server_timing = self.tracer.get_server_timing()
+        if server_timing is not None:
+            response.headers["Server-Timing"] = server_timing
+        return response
+
+    async def _execute_batch_operation(
+        self, config: GraphQLConfig, operation: typing.Any, context: dict
+    ) -> dict:
+        # Errors are reported per-operation, and never fail the whole batch.
+        if not isinstance(operation, dict):
+            return {"data": None, "errors": [{"message": "Invalid operation."}]}
+
+        try:
+            query = await get_persisted_query(
+                config.persisted_queries,
+                operation.get("query"),
+                operation.get("extensions"),
+            )
+        except PersistedQueryError as exc:
+            return {"data": None, "errors": [exc.to_dict()]}
+
+        if query is None:
+            return {
+                "data": None,
+                "errors": [{"message": "No GraphQL query found in the request"}],
+            }
 
-        return JSONResponse(content=content, status_code=status, background=background)
+        try:
+            self._analyze_cost(
+                config,
+                context["req"],
+                query,
+                operation.get("operationName"),
+                operation.get("variables"),
+            )
+        except CostLimitExceeded as exc:
+            return {"data": None, "errors": [exc.to_dict()]}
+
+        try:
+            content = await self._execute(
+                config,
+                query,
+                context=context,
+                variables=operation.get("variables"),
+                operation_name=operation.get("operationName"),
+            )
+        except Overloaded as exc:
+            content = {"data": None, "errors": [exc.to_dict()]}
+        except Exception:
+            content = {"data": None, "errors": [{"message": "Internal Server Error"}]}
+        # NOTE: response sizes are not known per operation of a batch.
+        self._observe(
+            config, operation.get("operationName"), None, error="errors" in content
+        )
+        return content
+
+    def _observe(
+        self,
+        config: GraphQLConfig,
+        operation_name: typing.Optional[str],
+        size: typing.Optional[int],
+        error: bool,
+    ) -> None:
+        self._observed = True
+        metrics = config.metrics
+        if metrics is not None:
+            duration = time.perf_counter() - self._started
+            metrics.observe(operation_name, duration, size, error)
+
+    def _analyze_cost(
+        self,
+        config: GraphQLConfig,
+        request: Request,
+        query: str,
+        operation_name: typing.Optional[str],
+        variables: typing.Optional[dict],
+    ) -> None:
+        cost_analysis = config.cost_analysis
+        if cost_analysis is None:
+            return
+        cost = cost_analysis.analyze(config.engine, query, operation_name, variables)
+        if cost is None:
+            return
+        # NOTE: exposed e.g. to rate limiting middleware, and summed over
+        # the operations of a batch.
+        request.state.query_cost = getattr(request.state, "query_cost", 0) + cost.cost
+        cost_analysis.check(cost)
+
+    async def _execute(
+        self,
+        config: GraphQLConfig,
+        query: str,
+        context: dict,
+        variables: typing.Optional[dict],
+        operation_name: typing.Optional[str],
+    ) -> dict:
+        engine: Engine = config.engine
+        if self.tracer.enabled:
+            # NOTE: the engine caches parsed documents, so parsing ahead of
+            # execution allows timing it separately at no extra cost.
+            with self.tracer.phase(Instrumentation.VALIDATION):
+                parse_document(engine, query)
+        admission = config.admission
+        operation_type = ""
+        if admission is not None:
+            operation_type = admission.get_operation_type(engine, query, operation_name)
+            await admission.acquire(operation_type)
+        slow_log = config.slow_log
+        timer = slow_log.start() if slow_log is not None else None
+        try:
+            with self.tracer.phase(Instrumentation.EXECUTION):
+                result: dict = await engine.execute(
+                    query,
+                    context=context,
+                    variables=variables,
+                    operation_name=operation_name,
+                )
+        finally:
+            if admission is not None:
+                admission.release(operation_type)
+            if slow_log is not None:
+                assert timer is not None
+                await slow_log.finish(timer, query, operation_name, variables)
+        return self._format_result(config, result)
+
+    def _format_result(self, config: GraphQLConfig, result: dict) -> dict:
+        content = {"data": result["data"]}
+        if "errors" in result:
+            content["errors"] = format_errors(result["errors"], config.error_formatter)
+        return content
 
     async def dispatch(self) -> None:
+        self._started = time.perf_counter()
         request = Request(self.scope, self.receive)
-        graphiql = get_graphql_config(request).graphiql
+        config = get_graphql_config(request)
+        graphiql = config.graphiql
         if "text/html" in request.headers.get("Accept", ""):
             app: ASGIApp
             if graphiql and graphiql.path is None:
@@ -112,7 +622,33 @@ class GraphQLEndpoint(HTTPEndpoint):
                 app = PlainTextResponse("Not Found", 404)
             await app(self.scope, self.receive, self.send)
         else:
-            await super().dispatch()
+            self.tracer = get_tracer(config.instrumentation, request)
+            try:
+                await super().dispatch()
+            except LimitExceeded as exc:
+                # NOTE: limits are checked before any response is started.
+                response = JSONResponse(
+                    {"error": exc.message},
+                    413,
+                    codec=config.json_codec,
+                )
+                await response(self.scope, self.receive, self.send)
+            except Overloaded as exc:
+                response = JSONResponse(
+                    {"error": exc.message},
+                    503,
+                    headers={"Retry-After": str(exc.retry_after)},
+                    codec=config.json_codec,
+                )
+                await response(self.scope, self.receive, self.send)
+            finally:
+                if self._admitted is not None:
+                    assert config.admission is not None
+                    config.admission.release(self._admitted)
+                if not self._observed:
+                    # The request was rejected (e.g. by limits, admission
+                    # control or cost analysis) or failed.
+                    self._observe(config, self._operation_name, None, error=True)
 
 
 class SubscriptionEndpoint(WebSocketEndpoint):
@@ -120,13 +656,73 @@ class SubscriptionEndpoint(WebSocketEndpoint):
 
     def __init__(self, scope: Scope, receive: Receive, send: Send) -> None:
         super().__init__(scope, receive, send)
-        self.protocol: typing.Optional[GraphQLWSProtocol] = None
+        self.protocol: typing.Optional[
+            typing.Union[GraphQLWSProtocol, GraphQLTransportWSProtocol]
+        ] = None
+        self.msgpack_codec: typing.Optional[MessagePackCodec] = None
+
+    async def decode(self, websocket: WebSocket, message: Message) -> typing.Any:
+        # Same as `encoding = "json"`, but using the configured JSON codec, or
+        # MessagePack if it was negotiated.
+        if self.msgpack_codec is not None:
+            data = message.get("bytes")
+            try:
+                if data is None:
+                    raise ValueError("Expected a binary frame")
+                return self.msgpack_codec.decode(data)
+            except ValueError:
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+                raise RuntimeError("Malformed MessagePack data received.")
+
+        data = message.get("text")
+        if data is None:
+            data = message["bytes"]
+        try:
+            return get_graphql_config(websocket).json_codec.decode(data)
+        except ValueError:
+            await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+            raise RuntimeError("Malformed JSON data received.")
+
+    def get_subprotocol(self, websocket: WebSocket) -> str:
+        # Pick the first supported subprotocol requested by the client, if any.
+        # Otherwise, fall back to the legacy `graphql-ws` protocol.
+        config = get_graphql_config(websocket)
+        assert config.subscriptions is not None
+        names = [GraphQLWSProtocol.name, GraphQLTransportWSProtocol.name]
+        if config.subscriptions.msgpack is not None:
+            names += [name + MSGPACK_SUBPROTOCOL_SUFFIX for name in names]
+        for subprotocol in websocket.scope.get("subprotocols", ()):
+            if subprotocol in names:
+                return subprotocol
+        return GraphQLWSProtocol.name
 
     async def on_connect(self, websocket: WebSocket) -> None:
-        await websocket.accept(subprotocol=GraphQLWSProtocol.name)
+        subprotocol = self.get_subprotocol(websocket)
+        await websocket.accept(subprotocol=subprotocol)
         config = get_graphql_config(websocket)
-        self.protocol = GraphQLWSProtocol(
-            websocket=websocket, engine=config.engine, context=dict(config.context)
+        assert config.subscriptions is not None
+
+        if subprotocol.endswith(MSGPACK_SUBPROTOCOL_SUFFIX):
+            subprotocol = subprotocol[: -len(MSGPACK_SUBPROTOCOL_SUFFIX)]
+            self.msgpack_codec = config.subscriptions.msgpack
+
+        protocol_class: typing.Type[
+            typing.Union[GraphQLWSProtocol, GraphQLTransportWSProtocol]
+        ] = GraphQLWSProtocol
+        if subprotocol == GraphQLTransportWSProtocol.name:
+            protocol_class = GraphQLTransportWSProtocol
+
+        self.protocol = protocol_class(
+            websocket=websocket,
+            engine=config.engine,
+            context=dict(config.context),
+            json_codec=config.json_codec,
+            subscriptions=config.subscriptions,
+            msgpack_codec=self.msgpack_codec,
+            instrumentation=config.instrumentation,
+            slow_log=config.slow_log,
+            admission=config.admission,
+            cost_analysis=config.cost_analysis,
         )
 
     async def on_receive(self, websocket: WebSocket, data: typing.Any) -> None:
@@ -136,3 +732,127 @@ class SubscriptionEndpoint(WebSocketEndpoint):
     async def on_disconnect(self, websocket: WebSocket, close_code: int) -> None:
         assert self.protocol is not None
         await self.protocol.on_disconnect(close_code)
+
+
+class MetricsEndpoint(HTTPEndpoint):
+    async def get(self, request: Request) -> Response:
+        config = get_graphql_config(request)
+        metrics = config.metrics
+        assert metrics is not None
+
+        websocket = None
+        subscriptions = config.subscriptions
+        if subscriptions is not None:
+            websocket = WebSocketStats(
+                connections=subscriptions.connections,
+                subscriptions=subscriptions.operations,
+                messages_sent=subscriptions.messages_sent,
+                sse_streams=subscriptions.streams,
+            )
+
+        return Response(metrics.render(websocket), media_type=METRICS_CONTENT_TYPE)
+
+
+class SSEEndpoint(HTTPEndpoint):
+    # Runs a single operation per request, and streams its results as
+    # server-sent events. Over HTTP/2, many such streams can be multiplexed
+    # over a single connection.
+
+    async def get(self, request: Request) -> Response:
+        config = get_graphql_config(request)
+        codec = config.json_codec
+        variables = None
+        if "variables" in request.query_params:
+            if config.limits is not None:
+                try:
+                    config.limits.check_variables(
+                        request.query_params["variables"], codec
+                    )
+                except LimitExceeded as exc:
+                    return JSONResponse({"error": exc.message}, 413, codec=codec)
+            try:
+                variables = codec.decode(request.query_params["variables"])
+            except ValueError:
+                return JSONResponse(
+                    {"error": "Unable to decode variables: Invalid JSON."},
+                    400,
+                    codec=codec,
+                )
+        return self._get_response(
+            request, data=request.query_params, variables=variables
+        )
+
+    async def post(self, request: Request) -> Response:
+        content_type = request.headers.get("Content-Type", "")
+        config = get_graphql_config(request)
+        codec = config.json_codec
+
+        if "application/json" not in content_type:
+            return PlainTextResponse("Unsupported Media Type", 415)
+
+        try:
+            body = await read_body(request, config.limits)
+        except LimitExceeded as exc:
+            return JSONResponse({"error": exc.message}, 413, codec=codec)
+        try:
+            data = codec.decode(body)
+        except ValueError:
+            return JSONResponse({"error": "Invalid JSON."}, 400, codec=codec)
+        if not isinstance(data, dict):
+            return JSONResponse({"error": "Invalid JSON."}, 400, codec=codec)
+
+        variables = data.get("variables")
+        if config.limits is not None:
+            try:
+                config.limits.check_variables(variables, codec)
+            except LimitExceeded as exc:
+                return JSONResponse({"error": exc.message}, 413, codec=codec)
+
+        return self._get_response(request, data=data, variables=variables)
+
+    def _get_response(
+        self,
+        request: Request,
+        data: typing.Mapping[str, typing.Any],
+        variables: typing.Optional[dict],
+    ) -> Response:
+        config = get_graphql_config(request)
+        query = data.get("query")
+        if not isinstance(query, str) or not query:
+            return PlainTextResponse("No GraphQL query found in the request", 400)
+
+        if config.limits is not None:
+            try:
+                config.limits.check_query(query)
+            except LimitExceeded as exc:
+                return JSONResponse(
+                    {"error": exc.message}, 413, codec=config.json_codec
+                )
+
+        payload: Payload = {
+            "context": {},
+            "query": query,
+            "variables": variables,
+            "operationName": data.get("operationName"),
+        }
+
+        async def stream() -> typing.AsyncIterator[bytes]:
+            protocol = GraphQLSSEProtocol(
+                request=request,
+                engine=config.engine,
+                context={"req": request, **config.context},
+                json_codec=config.json_codec,
+                subscriptions=config.subscriptions,
+                instrumentation=config.instrumentation,
+                slow_log=config.slow_log,
+                admission=config.admission,
+                cost_analysis=config.cost_analysis,
+            )
+            async for event in protocol.stream(payload):
+                yield event
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
@@ -1,13 +1,26 @@
-import ast
 import typing
 
+ErrorFormatter = typing.Callable[[typing.Any], dict]
 
-def _format_error(error: typing.Any) -> dict:
-    try:
-        return ast.literal_eval(str(error))
-    except ValueError:
+
+def format_error(error: typing.Any) -> dict:
+    # Errors returned by the engine have already been coerced to dicts by its
+    # `error_coercer`, but raw `TartifletteError` instances are supported too.
+    if not isinstance(error, typing.Mapping):
+        coerce_value = getattr(error, "coerce_value", None)
+        if coerce_value is None:
+            return {"message": "Internal Server Error"}
+        error = coerce_value()
+
+    message = error.get("message")
+    if message is None:
         return {"message": "Internal Server Error"}
 
+    # Keep `locations`, `path`, `extensions` and any custom keys as-is.
+    return {**error, "message": str(message)}
+
 
-def format_errors(errors: typing.Sequence[typing.Any]) -> typing.List[dict]:
-    return [_format_error(error) for error in errors]
+def format_errors(
+    errors: typing.Sequence[typing.Any], formatter: ErrorFormatter = format_error
+) -> typing.List[dict]:
+    return [formatter(error) for error in errors]
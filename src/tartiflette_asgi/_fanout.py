@@ -0,0 +1,157 @@
+import asyncio
+import json
+import typing
+
+from starlette.requests import HTTPConnection
+
+from ._backpressure import _END, Backpressure, _Error, _OutboundQueue
+from ._document import get_document_hash
+
+ScopeKey = typing.Callable[[HTTPConnection], typing.Hashable]
+Source = typing.Callable[[], typing.AsyncGenerator[typing.Any, None]]
+OnOverflow = typing.Callable[[], None]
+
+
+def _no_scope_key(websocket: HTTPConnection) -> None:
+    return None
+
+
+def _ignore_overflow() -> None:
+    pass
+
+
+# Connections with these headers may get per-user events.
+_CREDENTIALS_HEADERS = ("authorization", "cookie")
+
+
+class _Stream:
+    def __init__(
+        self,
+        agen: typing.AsyncGenerator[typing.Any, None],
+        encode: typing.Callable[[typing.Any], typing.Any],
+    ) -> None:
+        self.agen = agen
+        self.encode = encode
+        # The queue of each subscriber, and what to do when it overflows.
+        self.queues: typing.Dict[_OutboundQueue, OnOverflow] = {}
+        self.task: typing.Optional[asyncio.Future] = None
+
+
+class SharedSubscriptions:
+    def __init__(
+        self,
+        *,
+        scope_key: ScopeKey = None,
+        max_size: int = 100,
+        overflow: str = Backpressure.DROP_OLDEST,
+    ) -> None:
+        self.scope_key = scope_key if scope_key is not None else _no_scope_key
+        # NOTE: events pending for each subscriber are kept in a bounded
+        # queue, so that slow subscribers don't make memory grow without
+        # bounds while the shared source keeps producing.
+        self.backpressure = Backpressure(max_size=max_size, overflow=overflow)
+        self.executions = 0
+        self.saved = 0
+        self._streams: typing.Dict[typing.Hashable, _Stream] = {}
+
+    @property
+    def streams(self) -> int:
+        return len(self._streams)
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(stream.queues) for stream in self._streams.values())
+
+    def get_key(
+        self,
+        websocket: HTTPConnection,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[dict],
+        operation_name: typing.Optional[str],
+    ) -> typing.Optional[typing.Hashable]:
+        # Return `None` if the subscription must not be shared.
+        if self.scope_key is _no_scope_key and any(
+            name in websocket.headers for name in _CREDENTIALS_HEADERS
+        ):
+            # Without a `scope_key`, events would leak across users.
+            return None
+        try:
+            serialized_variables = json.dumps(variables, sort_keys=True)
+        except (TypeError, ValueError):
+            # E.g. binary variables sent over MessagePack.
+            return None
+        return (
+            get_document_hash(query),
+            serialized_variables,
+            operation_name,
+            self.scope_key(websocket),
+        )
+
+    async def subscribe(
+        self,
+        key: typing.Hashable,
+        source: Source,
+        encode: typing.Callable[[typing.Any], typing.Any],
+        on_overflow: OnOverflow = None,
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        stream = self._streams.get(key)
+
+        if stream is None:
+            self.executions += 1
+            stream = _Stream(source(), encode)
+            self._streams[key] = stream
+            stream.task = asyncio.ensure_future(self._run(key, stream))
+        else:
+            self.saved += 1
+
+        queue = _OutboundQueue()
+        stream.queues[queue] = (
+            on_overflow if on_overflow is not None else _ignore_overflow
+        )
+        self.backpressure._queues.add(queue)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Error):
+                    raise item.exc
+                yield item
+        finally:
+            self.backpressure._queues.discard(queue)
+            stream.queues.pop(queue, None)
+            if not stream.queues:
+                self._stop(key, stream)
+
+    async def _run(self, key: typing.Hashable, stream: _Stream) -> None:
+        end: typing.Any = _END
+
+        try:
+            async for item in stream.agen:
+                # NOTE: events are encoded once, then sent as-is to all
+                # subscribers.
+                payload = stream.encode(item)
+                for queue, on_overflow in list(stream.queues.items()):
+                    if not self.backpressure._put(queue, payload):
+                        # Disconnect the subscriber.
+                        self.backpressure.disconnects += 1
+                        del stream.queues[queue]
+                        queue.finish(_END)
+                        on_overflow()
+        except Exception as exc:
+            end = _Error(exc)
+        finally:
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+            await stream.agen.aclose()
+
+        for queue in stream.queues:
+            queue.finish(end)
+
+    def _stop(self, key: typing.Hashable, stream: _Stream) -> None:
+        # The last subscriber left: stop the upstream generator.
+        if self._streams.get(key) is stream:
+            del self._streams[key]
+        if stream.task is not None:
+            stream.task.cancel()
@@ -0,0 +1,48 @@
+import hashlib
+import typing
+
+from starlette.requests import Request
+
+CacheControlPolicy = typing.Callable[
+    [Request, typing.Optional[str]], typing.Optional[str]
+]
+
+
+class CacheControl:
+    def __init__(
+        self,
+        *,
+        default: str = None,
+        policy: CacheControlPolicy = None,
+        etag: bool = True,
+    ) -> None:
+        self.default = default
+        self.policy = policy
+        self.etag = etag
+
+    def get_header(
+        self, request: Request, operation_name: typing.Optional[str]
+    ) -> typing.Optional[str]:
+        if self.policy is not None:
+            value = self.policy(request, operation_name)
+            if value is not None:
+                return value
+        return self.default
+
+
+def compute_etag(body: bytes) -> str:
+    return '"{}"'.format(hashlib.sha256(body).hexdigest())
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # NOTE: `If-None-Match` uses the weak comparison function.
+    # See: https://httpwg.org/specs/rfc9110.html#field.if-none-match
+    if if_none_match.strip() == "*":
+        return True
+    for value in if_none_match.split(","):
+        value = value.strip()
+        if value.startswith("W/"):
+            value = value[2:]
+        if value == etag:
+            return True
+    return False
@@ -0,0 +1,127 @@
+"""Incremental delivery of `@defer`red fragments over `multipart/mixed` responses.
+
+See: https://github.com/graphql/graphql-over-http/blob/main/rfcs/IncrementalDelivery.md
+"""
+import typing
+
+from starlette.requests import Request
+from tartiflette.language.ast import (
+    BooleanValueNode,
+    DirectiveNode,
+    DocumentNode,
+    FragmentDefinitionNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    StringValueNode,
+    VariableNode,
+)
+
+MEDIA_TYPE = 'multipart/mixed; boundary="-"'
+PART_HEADER = b"\r\n---\r\nContent-Type: application/json; charset=utf-8\r\n\r\n"
+TERMINATOR = b"\r\n-----\r\n"
+
+# SDL declaration of the directive, which must be part of the schema.
+DEFER_DIRECTIVE = (
+    "directive @defer(label: String, if: Boolean = true) "
+    "on FRAGMENT_SPREAD | INLINE_FRAGMENT"
+)
+
+
+class DeferredFragment(typing.NamedTuple):
+    label: typing.Optional[str]
+    document: DocumentNode
+
+
+class DeferredDocument(typing.NamedTuple):
+    initial: DocumentNode
+    fragments: typing.List[DeferredFragment]
+
+
+def accepts_multipart(request: Request) -> bool:
+    return "multipart/mixed" in request.headers.get("Accept", "")
+
+
+def _get_argument(
+    directive: DirectiveNode, name: str, variables: typing.Optional[dict]
+) -> typing.Any:
+    for argument in directive.arguments or ():
+        if argument.name.value != name:
+            continue
+        value = argument.value
+        if isinstance(value, VariableNode):
+            return (variables or {}).get(value.name.value)
+        if isinstance(value, (BooleanValueNode, StringValueNode)):
+            return value.value
+    return None
+
+
+def _get_defer_directive(
+    selection: typing.Any, variables: typing.Optional[dict]
+) -> typing.Optional[DirectiveNode]:
+    for directive in getattr(selection, "directives", None) or ():
+        if directive.name.value != "defer":
+            continue
+        if _get_argument(directive, "if", variables) is False:
+            return None
+        return directive
+    return None
+
+
+def _build_document(
+    document: DocumentNode,
+    operation: OperationDefinitionNode,
+    selections: typing.List[typing.Any],
+) -> DocumentNode:
+    fragments = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    ]
+    operation = OperationDefinitionNode(
+        operation_type=operation.operation_type,
+        selection_set=SelectionSetNode(
+            selections=selections, location=operation.selection_set.location
+        ),
+        name=operation.name,
+        variable_definitions=operation.variable_definitions,
+        directives=operation.directives,
+        location=operation.location,
+    )
+    return DocumentNode(
+        definitions=[operation, *fragments],
+        validators=document.validators,
+        location=document.location,
+    )
+
+
+def split_deferred(
+    document: DocumentNode,
+    operation: OperationDefinitionNode,
+    variables: typing.Optional[dict],
+) -> typing.Optional[DeferredDocument]:
+    # NOTE: only fragments selected at the root of query operations are
+    # deferred. Nested `@defer` directives are ignored, i.e. their fragments
+    # are delivered along with their parent.
+    if operation.operation_type != "query":
+        return None
+
+    initial: typing.List[typing.Any] = []
+    fragments: typing.List[DeferredFragment] = []
+
+    for selection in operation.selection_set.selections:
+        directive = _get_defer_directive(selection, variables)
+        if directive is None:
+            initial.append(selection)
+            continue
+        fragment = DeferredFragment(
+            label=_get_argument(directive, "label", variables),
+            document=_build_document(document, operation, [selection]),
+        )
+        fragments.append(fragment)
+
+    if not fragments:
+        return None
+
+    return DeferredDocument(
+        initial=_build_document(document, operation, initial), fragments=fragments
+    )
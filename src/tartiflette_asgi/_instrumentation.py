@@ -0,0 +1,109 @@
+import time
+import typing
+
+from starlette.requests import HTTPConnection
+
+OnStart = typing.Callable[[str, HTTPConnection], None]
+OnEnd = typing.Callable[[str, float, HTTPConnection], None]
+
+
+class _NullPhase:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args: typing.Any) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Tracer:
+    # Times the phases of an HTTP request, or of a WebSocket operation.
+    # The base class records nothing, so that code paths can be instrumented
+    # unconditionally at near-zero cost.
+
+    enabled = False
+
+    def phase(self, name: str) -> typing.Any:
+        return _NULL_PHASE
+
+    def get_server_timing(self) -> typing.Optional[str]:
+        return None
+
+
+NULL_TRACER = Tracer()
+
+
+class _Phase:
+    __slots__ = ("tracer", "name", "started")
+
+    def __init__(self, tracer: "_Tracer", name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        instrumentation = self.tracer.instrumentation
+        if instrumentation.on_start is not None:
+            instrumentation.on_start(self.name, self.tracer.conn)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *args: typing.Any) -> None:
+        duration = time.perf_counter() - self.started
+        tracer = self.tracer
+        tracer.timings[self.name] = tracer.timings.get(self.name, 0.0) + duration
+        if tracer.instrumentation.on_end is not None:
+            tracer.instrumentation.on_end(self.name, duration, tracer.conn)
+
+
+class _Tracer(Tracer):
+    enabled = True
+
+    def __init__(self, instrumentation: "Instrumentation", conn: HTTPConnection):
+        self.instrumentation = instrumentation
+        self.conn = conn
+        # Total duration of each phase, in seconds.
+        self.timings: typing.Dict[str, float] = {}
+
+    def phase(self, name: str) -> typing.Any:
+        return _Phase(self, name)
+
+    def get_server_timing(self) -> typing.Optional[str]:
+        if not self.instrumentation.server_timing:
+            return None
+        return ", ".join(
+            f"{name};dur={duration * 1000:.3f}"
+            for name, duration in self.timings.items()
+        )
+
+
+class Instrumentation:
+    PARSING = "parsing"
+    VALIDATION = "validation"
+    EXECUTION = "execution"
+    ENCODING = "encoding"
+
+    def __init__(
+        self,
+        *,
+        on_start: OnStart = None,
+        on_end: OnEnd = None,
+        server_timing: bool = False,
+    ) -> None:
+        self.on_start = on_start
+        self.on_end = on_end
+        self.server_timing = server_timing
+
+    def trace(self, conn: HTTPConnection) -> Tracer:
+        if self.on_start is None and self.on_end is None and not self.server_timing:
+            return NULL_TRACER
+        return _Tracer(self, conn)
+
+
+def get_tracer(
+    instrumentation: typing.Optional[Instrumentation], conn: HTTPConnection
+) -> Tracer:
+    if instrumentation is None:
+        return NULL_TRACER
+    return instrumentation.trace(conn)
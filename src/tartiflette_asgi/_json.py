@@ -0,0 +1,65 @@
+import json
+import typing
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+Dumps = typing.Callable[[typing.Any], typing.Union[str, bytes]]
+Loads = typing.Callable[[typing.Union[str, bytes]], typing.Any]
+
+
+def _dumps(obj: typing.Any) -> bytes:
+    # Same output as Starlette's `JSONResponse`.
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class EncodedJSON(str):
+    # A payload which was already encoded to JSON, and can be inserted as-is
+    # into outgoing messages.
+    pass
+
+
+class JSONCodec:
+    def __init__(self, *, dumps: Dumps = None, loads: Loads = None) -> None:
+        self._dumps = dumps if dumps is not None else _dumps
+        self._loads = loads if loads is not None else json.loads
+
+    def encode(self, obj: typing.Any) -> bytes:
+        # NOTE: `dumps` functions such as `orjson.dumps()` return bytes
+        # directly, so we only need to encode `str` results.
+        content = self._dumps(obj)
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return content
+
+    def encode_text(self, obj: typing.Any) -> str:
+        content = self._dumps(obj)
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return content
+
+    def decode(self, data: typing.Union[str, bytes]) -> typing.Any:
+        # Should raise a `ValueError` (e.g. `json.JSONDecodeError`) on invalid JSON.
+        return self._loads(data)
+
+
+class JSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: typing.Any,
+        status_code: int = 200,
+        *,
+        codec: JSONCodec,
+        headers: typing.Mapping[str, str] = None,
+        background: BackgroundTask = None,
+    ) -> None:
+        super().__init__(
+            codec.encode(content),
+            status_code=status_code,
+            headers=headers,
+            background=background,
+        )
@@ -0,0 +1,92 @@
+import typing
+
+from starlette.requests import Request
+
+from ._json import JSONCodec
+
+
+class LimitExceeded(Exception):
+    def __init__(self, message: str, limit: str) -> None:
+        super().__init__(message, limit)
+        self.message = message
+        self.limit = limit
+
+
+class Limits:
+    BODY_SIZE = "body_size"
+    QUERY_LENGTH = "query_length"
+    VARIABLES_SIZE = "variables_size"
+    OPERATIONS = "operations"
+
+    def __init__(
+        self,
+        *,
+        max_body_size: int = 1024 * 1024,
+        max_query_length: int = None,
+        max_variables_size: int = None,
+        max_operations: int = None,
+    ) -> None:
+        for name, value in (
+            ("max_body_size", max_body_size),
+            ("max_query_length", max_query_length),
+            ("max_variables_size", max_variables_size),
+            ("max_operations", max_operations),
+        ):
+            assert value is None or value > 0, f"`{name}` must be a positive integer"
+        self.max_body_size = max_body_size
+        self.max_query_length = max_query_length
+        self.max_variables_size = max_variables_size
+        self.max_operations = max_operations
+        self.rejected = 0
+        self.rejections: typing.Dict[str, int] = {}
+
+    async def read_body(self, request: Request) -> bytes:
+        # NOTE: reject oversized bodies while they are being received, instead
+        # of buffering them whole (as `request.body()` does) and checking after.
+        content_length = request.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            raise self._reject(self.BODY_SIZE, "Request body is too large.")
+
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > self.max_body_size:
+                raise self._reject(self.BODY_SIZE, "Request body is too large.")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def check_query(self, query: typing.Any) -> None:
+        limit = self.max_query_length
+        if limit is not None and isinstance(query, str) and len(query) > limit:
+            raise self._reject(self.QUERY_LENGTH, "Query is too long.")
+
+    def check_variables(self, variables: typing.Any, codec: JSONCodec) -> None:
+        # Raw variables (e.g. from query parameters) are measured as-is,
+        # and decoded ones by their encoded size.
+        limit = self.max_variables_size
+        if limit is None or variables is None:
+            return
+        if not isinstance(variables, (str, bytes)):
+            variables = codec.encode(variables)
+        if len(variables) > limit:
+            raise self._reject(self.VARIABLES_SIZE, "Variables are too large.")
+
+    def check_operations(self, operations: typing.List[typing.Any]) -> None:
+        limit = self.max_operations
+        if limit is not None and len(operations) > limit:
+            raise self._reject(self.OPERATIONS, "Too many operations.")
+        for operation in operations:
+            if isinstance(operation, dict):
+                self.check_query(operation.get("query"))
+
+    def _reject(self, limit: str, message: str) -> LimitExceeded:
+        self.rejected += 1
+        self.rejections[limit] = self.rejections.get(limit, 0) + 1
+        return LimitExceeded(message, limit)
+
+
+async def read_body(request: Request, limits: typing.Optional[Limits]) -> bytes:
+    if limits is None:
+        return await request.body()
+    return await limits.read_body(request)
@@ -0,0 +1,155 @@
+"""A minimal metrics registry, exported in the Prometheus text format.
+
+See: https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+import bisect
+import typing
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Label value used once `max_operation_names` distinct names have been seen.
+OTHER_OPERATIONS = "__other__"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, buckets: typing.Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> typing.Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{_format_number(bound)}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {_format_number(self.sum)}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class WebSocketStats(typing.NamedTuple):
+    connections: int
+    subscriptions: int
+    messages_sent: int
+    sse_streams: int = 0
+
+
+class Metrics:
+    def __init__(
+        self,
+        *,
+        path: typing.Optional[str] = "/metrics",
+        namespace: str = "graphql",
+        duration_buckets: typing.Sequence[float] = DURATION_BUCKETS,
+        size_buckets: typing.Sequence[float] = SIZE_BUCKETS,
+        max_operation_names: int = 100,
+    ) -> None:
+        assert max_operation_names > 0, "`max_operation_names` must be positive"
+        self.path = path
+        self.namespace = namespace
+        self.duration_buckets = tuple(sorted(duration_buckets))
+        self.size_buckets = tuple(sorted(size_buckets))
+        self.max_operation_names = max_operation_names
+        self.requests: typing.Dict[str, int] = {}
+        self.errors: typing.Dict[str, int] = {}
+        self.durations: typing.Dict[str, Histogram] = {}
+        self.sizes: typing.Dict[str, Histogram] = {}
+
+    def _get_label(self, operation_name: typing.Optional[str]) -> str:
+        # NOTE: operation names are chosen by clients, so bound the number of
+        # distinct label values to keep the number of time series bounded.
+        name = operation_name or ""
+        if name in self.requests or len(self.requests) < self.max_operation_names:
+            return name
+        return OTHER_OPERATIONS
+
+    def observe(
+        self,
+        operation_name: typing.Optional[str],
+        duration: float,
+        size: typing.Optional[int],
+        error: bool,
+    ) -> None:
+        label = self._get_label(operation_name)
+        self.requests[label] = self.requests.get(label, 0) + 1
+        if error:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+        durations = self.durations.get(label)
+        if durations is None:
+            durations = self.durations[label] = Histogram(self.duration_buckets)
+        durations.observe(duration)
+
+        if size is not None:
+            sizes = self.sizes.get(label)
+            if sizes is None:
+                sizes = self.sizes[label] = Histogram(self.size_buckets)
+            sizes.observe(size)
+
+    def render(self, websocket: WebSocketStats = None) -> str:
+        prefix = self.namespace
+        lines: typing.List[str] = []
+
+        def header(name: str, kind: str, description: str) -> None:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        name = f"{prefix}_requests_total"
+        header(name, "counter", "Number of executed GraphQL operations.")
+        for label, count in sorted(self.requests.items()):
+            lines.append(f'{name}{{operation_name="{_escape(label)}"}} {count}')
+
+        name = f"{prefix}_errors_total"
+        header(name, "counter", "Number of GraphQL operations with errors.")
+        for label, count in sorted(self.errors.items()):
+            lines.append(f'{name}{{operation_name="{_escape(label)}"}} {count}')
+
+        name = f"{prefix}_request_duration_seconds"
+        header(name, "histogram", "Duration of GraphQL HTTP requests.")
+        for label, histogram in sorted(self.durations.items()):
+            lines.extend(histogram.render(name, f'operation_name="{_escape(label)}"'))
+
+        name = f"{prefix}_response_size_bytes"
+        header(name, "histogram", "Size of GraphQL HTTP response bodies.")
+        for label, histogram in sorted(self.sizes.items()):
+            lines.extend(histogram.render(name, f'operation_name="{_escape(label)}"'))
+
+        if websocket is not None:
+            name = f"{prefix}_websocket_connections"
+            header(name, "gauge", "Number of open WebSocket connections.")
+            lines.append(f"{name} {websocket.connections}")
+
+            name = f"{prefix}_websocket_subscriptions"
+            header(name, "gauge", "Number of running WebSocket operations.")
+            lines.append(f"{name} {websocket.subscriptions}")
+
+            name = f"{prefix}_websocket_messages_sent_total"
+            header(name, "counter", "Number of WebSocket messages sent.")
+            lines.append(f"{name} {websocket.messages_sent}")
+
+            name = f"{prefix}_sse_streams"
+            header(name, "gauge", "Number of open server-sent events streams.")
+            lines.append(f"{name} {websocket.sse_streams}")
+
+        return "\n".join(lines) + "\n"
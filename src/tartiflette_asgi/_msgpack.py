@@ -0,0 +1,47 @@
+import typing
+
+Packb = typing.Callable[[typing.Any], bytes]
+Unpackb = typing.Callable[[bytes], typing.Any]
+
+# Suffix of the WebSocket subprotocols which use MessagePack, e.g.
+# `graphql-transport-ws+msgpack`.
+SUBPROTOCOL_SUFFIX = "+msgpack"
+
+
+class EncodedMessagePack(bytes):
+    # A payload which was already encoded to MessagePack, and can be inserted
+    # as-is into outgoing messages.
+    pass
+
+
+class MessagePackCodec:
+    def __init__(self, *, packb: Packb = None, unpackb: Unpackb = None) -> None:
+        if packb is None or unpackb is None:
+            try:
+                import msgpack
+            except ImportError:  # pragma: no cover
+                raise ImportError(
+                    "MessagePack support requires `msgpack` to be installed. "
+                    "Hint: run `pip install tartiflette-asgi[msgpack]`."
+                )
+            if packb is None:
+                packb = msgpack.packb
+            if unpackb is None:
+                unpackb = msgpack.unpackb
+        self._packb = packb
+        self._unpackb = unpackb
+
+    def encode(self, obj: typing.Any) -> bytes:
+        return self._packb(obj)
+
+    def decode(self, data: bytes) -> typing.Any:
+        # Should raise a `ValueError` on invalid data.
+        return self._unpackb(data)
+
+    def encode_message(self, message: dict, payload: EncodedMessagePack) -> bytes:
+        # Encode `message` with its already encoded `payload`, by bumping the
+        # size of the map header (messages have less than 15 keys, so it is
+        # a "fixmap" which holds its size in a single byte).
+        head = self.encode(message)
+        assert head[0] & 0xF0 == 0x80 and len(message) < 15
+        return bytes([head[0] + 1]) + head[1:] + self.encode("payload") + payload
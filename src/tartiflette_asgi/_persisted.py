@@ -0,0 +1,81 @@
+"""Automatic Persisted Queries (APQ).
+
+See: https://www.apollographql.com/docs/apollo-server/performance/apq/
+"""
+import typing
+
+from ._cache import LRUCache
+from ._document import get_document_hash
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message, code)
+        self.message = message
+        self.code = code
+
+    def to_dict(self) -> dict:
+        return {"message": self.message, "extensions": {"code": self.code}}
+
+
+class PersistedQueryStore:
+    # Methods whose implementation is left to the implementer.
+
+    async def get(self, sha256_hash: str) -> typing.Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, sha256_hash: str, query: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryPersistedQueryStore(PersistedQueryStore):
+    def __init__(self, *, max_size: int = 1024) -> None:
+        self._cache: LRUCache[str, str] = LRUCache(max_size=max_size)
+
+    async def get(self, sha256_hash: str) -> typing.Optional[str]:
+        return self._cache.get(sha256_hash)
+
+    async def set(self, sha256_hash: str, query: str) -> None:
+        self._cache.set(sha256_hash, query)
+
+
+async def get_persisted_query(
+    store: typing.Optional[PersistedQueryStore],
+    query: typing.Optional[str],
+    extensions: typing.Any,
+) -> typing.Optional[str]:
+    if not isinstance(extensions, dict) or "persistedQuery" not in extensions:
+        return query
+
+    if store is None:
+        if query is not None:
+            return query
+        raise PersistedQueryError(
+            "PersistedQueryNotSupported", code="PERSISTED_QUERY_NOT_SUPPORTED"
+        )
+
+    persisted_query = extensions["persistedQuery"]
+    if not isinstance(persisted_query, dict) or persisted_query.get("version") != 1:
+        raise PersistedQueryError(
+            "Unsupported persisted query version", code="BAD_REQUEST"
+        )
+
+    sha256_hash = persisted_query.get("sha256Hash")
+    if not isinstance(sha256_hash, str):
+        raise PersistedQueryError("Invalid persisted query hash", code="BAD_REQUEST")
+
+    if query is None:
+        query = await store.get(sha256_hash)
+        if query is None:
+            raise PersistedQueryError(
+                "PersistedQueryNotFound", code="PERSISTED_QUERY_NOT_FOUND"
+            )
+        return query
+
+    if get_document_hash(query) != sha256_hash:
+        raise PersistedQueryError(
+            "provided sha does not match query", code="BAD_REQUEST"
+        )
+
+    await store.set(sha256_hash, query)
+    return query
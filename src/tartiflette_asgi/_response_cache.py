@@ -0,0 +1,164 @@
+import json
+import time
+import typing
+
+from starlette.requests import Request
+
+from ._cache import LRUCache
+from ._document import get_document_hash, normalize_query
+
+ScopeKey = typing.Callable[[Request], typing.Optional[str]]
+
+
+def _no_scope_key(request: Request) -> None:
+    return None
+
+
+# Requests carrying these headers may get per-user results.
+_CREDENTIALS_HEADERS = ("authorization", "cookie")
+
+
+class ResponseCacheBackend:
+    # Methods whose implementation is left to the implementer.
+
+    async def get(self, key: str) -> typing.Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(
+        self, key: str, body: bytes, ttl: float, tags: typing.AbstractSet[str]
+    ) -> None:
+        raise NotImplementedError
+
+    async def invalidate(self, tags: typing.Iterable[str]) -> None:
+        raise NotImplementedError
+
+
+class _Entry(typing.NamedTuple):
+    body: bytes
+    expires_at: float
+    tags: typing.FrozenSet[str]
+
+
+class InMemoryResponseCacheBackend(ResponseCacheBackend):
+    def __init__(self, *, max_size: int = 1024) -> None:
+        self._cache: LRUCache[str, _Entry] = LRUCache(
+            max_size=max_size, on_evict=self._untag
+        )
+        self._keys_by_tag: typing.Dict[str, typing.Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def evictions(self) -> int:
+        return self._cache.evictions
+
+    async def get(self, key: str) -> typing.Optional[bytes]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry.body
+
+    async def set(
+        self, key: str, body: bytes, ttl: float, tags: typing.AbstractSet[str]
+    ) -> None:
+        self._remove(key)
+        entry = _Entry(
+            body=body, expires_at=time.monotonic() + ttl, tags=frozenset(tags)
+        )
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        self._cache.set(key, entry)
+
+    async def invalidate(self, tags: typing.Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._keys_by_tag.pop(tag, ()):
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key)
+        if entry is not None:
+            self._untag(key, entry)
+
+    def _untag(self, key: str, entry: _Entry) -> None:
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        backend: ResponseCacheBackend = None,
+        ttl: float = 60.0,
+        scope_key: ScopeKey = None,
+    ) -> None:
+        self.backend = (
+            backend if backend is not None else InMemoryResponseCacheBackend()
+        )
+        self.ttl = ttl
+        self.scope_key = scope_key if scope_key is not None else _no_scope_key
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(
+        self,
+        request: Request,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[dict],
+        operation_name: typing.Optional[str],
+    ) -> typing.Optional[str]:
+        # Return `None` if the response must not be cached.
+        if self.scope_key is _no_scope_key and any(
+            name in request.headers for name in _CREDENTIALS_HEADERS
+        ):
+            # Without a `scope_key`, responses would leak across users.
+            return None
+        parts = [
+            normalize_query(query),
+            variables,
+            operation_name,
+            self.scope_key(request),
+        ]
+        try:
+            serialized = json.dumps(parts, sort_keys=True)
+        except (TypeError, ValueError):
+            # E.g. variables holding uploaded files.
+            return None
+        return get_document_hash(serialized)
+
+    async def get(self, key: str) -> typing.Optional[bytes]:
+        body = await self.backend.get(key)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    async def set(self, key: str, body: bytes, tags: typing.AbstractSet[str]) -> None:
+        await self.backend.set(key, body, ttl=self.ttl, tags=tags)
+
+    async def invalidate(self, *tags: str) -> None:
+        await self.backend.invalidate(tags)
+
+
+class ResponseCacheContext:
+    # Exposed to resolvers as `context["response_cache"]`.
+
+    def __init__(self, cache: ResponseCache) -> None:
+        self.cache = cache
+        self.tags: typing.Set[str] = set()
+
+    def tag(self, *tags: str) -> None:
+        self.tags.update(tags)
+
+    async def invalidate(self, *tags: str) -> None:
+        await self.cache.invalidate(*tags)
@@ -0,0 +1,188 @@
+import collections
+import functools
+import random
+import time
+import typing
+
+from tartiflette import Engine
+
+from ._document import normalize_query
+
+try:
+    import contextvars
+except ImportError:  # pragma: no cover
+    # Python 3.6: resolver-level traces are not available.
+    contextvars = None  # type: ignore
+
+_TRACED = "_tartiflette_asgi_traced"
+
+# Timings of the resolvers of the operation being executed, if traced.
+_Trace = typing.List[typing.Tuple[str, typing.Any, float]]
+_current_trace: typing.Any = (
+    contextvars.ContextVar("tartiflette_asgi_trace", default=None)
+    if contextvars is not None
+    else None
+)
+
+
+class ResolverTiming(typing.NamedTuple):
+    field: str
+    path: str
+    duration: float
+
+
+class SlowOperation(typing.NamedTuple):
+    document: str
+    operation_name: typing.Optional[str]
+    variables: typing.Any
+    duration: float
+    resolvers: typing.List[ResolverTiming]
+    sampled: bool
+
+
+class SlowOperationSink:
+    # Methods whose implementation is left to the implementer.
+
+    async def record(self, operation: SlowOperation) -> None:
+        raise NotImplementedError
+
+
+class InMemorySlowOperationSink(SlowOperationSink):
+    def __init__(self, *, max_size: int = 100) -> None:
+        assert max_size > 0, "`max_size` must be a positive integer"
+        self._records: typing.Deque[SlowOperation] = collections.deque(maxlen=max_size)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def records(self) -> typing.List[SlowOperation]:
+        return list(self._records)
+
+    async def record(self, operation: SlowOperation) -> None:
+        self._records.append(operation)
+
+
+def get_variables_shape(value: typing.Any) -> typing.Any:
+    # Redact values, only keeping their structure and type names.
+    if isinstance(value, dict):
+        return {key: get_variables_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [get_variables_shape(item) for item in value[:1]]
+    if value is None:
+        return None
+    return type(value).__name__
+
+
+def _trace_resolver(field_name: str, resolver: typing.Callable) -> typing.Callable:
+    @functools.wraps(resolver)
+    async def traced(
+        execution_context: typing.Any,
+        parent_type: typing.Any,
+        source: typing.Any,
+        field_nodes: typing.Any,
+        path: typing.Any,
+        *args: typing.Any,
+    ) -> typing.Any:
+        trace: typing.Optional[_Trace] = _current_trace.get()
+        if trace is None:
+            return await resolver(
+                execution_context, parent_type, source, field_nodes, path, *args
+            )
+        started = time.perf_counter()
+        try:
+            return await resolver(
+                execution_context, parent_type, source, field_nodes, path, *args
+            )
+        finally:
+            trace.append((field_name, path, time.perf_counter() - started))
+
+    setattr(traced, _TRACED, True)
+    return traced
+
+
+class _Timer(typing.NamedTuple):
+    started: float
+    sampled: bool
+    trace: typing.Optional[_Trace]
+    token: typing.Any
+
+
+class SlowOperationLog:
+    def __init__(
+        self,
+        *,
+        threshold: float = 1.0,
+        sample_rate: float = 0.0,
+        sink: SlowOperationSink = None,
+        trace_resolvers: bool = False,
+    ) -> None:
+        assert threshold >= 0, "`threshold` must be a positive number"
+        assert 0 <= sample_rate <= 1, "`sample_rate` must be between 0 and 1"
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.sink = sink if sink is not None else InMemorySlowOperationSink()
+        self.trace_resolvers = trace_resolvers
+        self.recorded = 0
+
+    def install(self, engine: Engine) -> None:
+        # Wrap the resolvers of the cooked schema, so that they are timed
+        # while executing traced operations. Untraced operations only pay
+        # for a context variable lookup per resolved field.
+        if _current_trace is None:  # pragma: no cover
+            return
+        schema: typing.Any = engine._schema  # type: ignore
+        for graphql_type in schema.type_definitions.values():
+            fields = getattr(graphql_type, "implemented_fields", None) or {}
+            for name, field in fields.items():
+                if name.startswith("__") or field.resolver is None:
+                    continue
+                if getattr(field.resolver, _TRACED, False):
+                    continue
+                field_name = f"{graphql_type.name}.{name}"
+                field.resolver = _trace_resolver(field_name, field.resolver)
+
+    def start(self) -> _Timer:
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        trace: typing.Optional[_Trace] = None
+        token = None
+        if (sampled or self.trace_resolvers) and _current_trace is not None:
+            trace = []
+            token = _current_trace.set(trace)
+        return _Timer(
+            started=time.perf_counter(), sampled=sampled, trace=trace, token=token
+        )
+
+    async def finish(
+        self,
+        timer: _Timer,
+        query: typing.Union[str, bytes],
+        operation_name: typing.Optional[str],
+        variables: typing.Optional[dict],
+    ) -> None:
+        duration = time.perf_counter() - timer.started
+        if timer.token is not None:
+            _current_trace.reset(timer.token)
+
+        if duration < self.threshold and not timer.sampled:
+            return
+
+        resolvers = [
+            ResolverTiming(
+                field=field,
+                path=".".join(str(key) for key in path.as_list()),
+                duration=resolver_duration,
+            )
+            for field, path, resolver_duration in timer.trace or ()
+        ]
+        self.recorded += 1
+        await self.sink.record(
+            SlowOperation(
+                document=normalize_query(query),
+                operation_name=operation_name,
+                variables=get_variables_shape(variables),
+                duration=duration,
+                resolvers=resolvers,
+                sampled=timer.sampled,
+            )
+        )
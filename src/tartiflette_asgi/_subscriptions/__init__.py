@@ -1,3 +1,3 @@
-from .impl import GraphQLWSProtocol
+from .impl import GraphQLSSEProtocol, GraphQLTransportWSProtocol, GraphQLWSProtocol
 
-__all__ = ["GraphQLWSProtocol"]
+__all__ = ["GraphQLSSEProtocol", "GraphQLTransportWSProtocol", "GraphQLWSProtocol"]
@@ -12,3 +12,26 @@ class GQL:
     ERROR = "error"
     COMPLETE = "complete"
     CONNECTION_KEEP_ALIVE = "ka"
+
+
+class GTWS:
+    # Client -> Server message types.
+    CONNECTION_INIT = "connection_init"
+    SUBSCRIBE = "subscribe"
+
+    # Server -> Client message types.
+    CONNECTION_ACK = "connection_ack"
+    NEXT = "next"
+    ERROR = "error"
+
+    # Bidirectional message types.
+    PING = "ping"
+    PONG = "pong"
+    COMPLETE = "complete"
+
+
+class GTWSCloseCode:
+    INVALID_MESSAGE = 4400
+    UNAUTHORIZED = 4401
+    SUBSCRIBER_ALREADY_EXISTS = 4409
+    TOO_MANY_INITIALISATION_REQUESTS = 4429
@@ -1,57 +1,548 @@
 import asyncio
+import collections
+import time
 import typing
 
+from starlette import status
+from starlette.requests import HTTPConnection
 from starlette.websockets import WebSocket
 from tartiflette import Engine
 
+from .._admission import AdmissionControl, Overloaded
+from .._cost import CostAnalysis, CostLimitExceeded
+from .._datastructures import Subscriptions, WriteBatching
+from .._document import get_document_operation, parse_document
+from .._instrumentation import Instrumentation, Tracer
+from .._json import EncodedJSON, JSONCodec
+from .._msgpack import EncodedMessagePack, MessagePackCodec
+from .._slow_log import SlowOperationLog
+from .._timers import Timer
 from . import protocol
+from .constants import GTWS
+from .tasks import TaskRegistry
 
 
-class GraphQLWSProtocol(protocol.GraphQLWSProtocol):
-    def __init__(self, websocket: WebSocket, engine: Engine, context: dict):
+class _WebSocketProtocol:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        engine: Engine,
+        context: dict,
+        json_codec: JSONCodec = None,
+        subscriptions: Subscriptions = None,
+        msgpack_codec: MessagePackCodec = None,
+        instrumentation: Instrumentation = None,
+        slow_log: SlowOperationLog = None,
+        admission: AdmissionControl = None,
+        cost_analysis: CostAnalysis = None,
+    ):
         super().__init__()
         self.websocket = websocket
         self.engine = engine
         self.context = context
-        self.tasks: typing.Set[asyncio.Task] = set()
+        self.json_codec = json_codec if json_codec is not None else JSONCodec()
+        self.msgpack_codec = msgpack_codec
+        self.subscriptions = subscriptions
+        self.instrumentation = instrumentation
+        self.slow_log = slow_log
+        self.admission = admission
+        self.cost_analysis = cost_analysis
+        self.tasks = TaskRegistry(on_error=self._on_task_error)
+        self._keep_alive_timer: typing.Optional[Timer] = None
+        self._idle_timer: typing.Optional[Timer] = None
+        self._last_active = time.monotonic()
+        self._outbox: typing.Deque[typing.Union[str, bytes]] = collections.deque()
+        self._outbox_full = asyncio.Event()
+        self._outbox_drained = asyncio.Event()
+        self._writer: typing.Optional[asyncio.Task] = None
+        if subscriptions is not None:
+            self.max_operations = subscriptions.max_operations
+            self._get_registry(subscriptions).add(self)
+            self._start_timers(subscriptions)
+
+    def _get_registry(self, subscriptions: Subscriptions) -> typing.Set[typing.Any]:
+        return subscriptions._connections
+
+    def _on_task_error(self, exc: BaseException) -> None:
+        if self.subscriptions is not None:
+            self.subscriptions.task_errors += 1
+
+    # Timers.
+
+    def _start_timers(self, subscriptions: Subscriptions) -> None:
+        timers = subscriptions.timers
+        if timers is None:
+            return
+        if subscriptions.keep_alive_interval is not None:
+            self._keep_alive_timer = timers.call_later(
+                subscriptions.keep_alive_interval, self._on_keep_alive
+            )
+        if subscriptions.idle_timeout is not None:
+            self._idle_timer = timers.call_later(
+                subscriptions.idle_timeout, self._on_idle_check
+            )
+
+    def _stop_timers(self) -> None:
+        for timer in (self._keep_alive_timer, self._idle_timer):
+            if timer is not None:
+                timer.cancel()
+
+    def _on_keep_alive(self) -> None:
+        assert self.subscriptions is not None
+        assert self.subscriptions.timers is not None
+        assert self.subscriptions.keep_alive_interval is not None
+        self.schedule(self.keep_alive())  # type: ignore
+        self._keep_alive_timer = self.subscriptions.timers.call_later(
+            self.subscriptions.keep_alive_interval, self._on_keep_alive
+        )
+
+    def _on_idle_check(self) -> None:
+        assert self.subscriptions is not None
+        assert self.subscriptions.timers is not None
+        assert self.subscriptions.idle_timeout is not None
+
+        now = time.monotonic()
+        acknowledged: bool = self.acknowledged  # type: ignore
+        if acknowledged and self.operations:  # type: ignore
+            self._last_active = now
+
+        idle = now - self._last_active
+        if idle < self.subscriptions.idle_timeout:
+            self._idle_timer = self.subscriptions.timers.call_later(
+                self.subscriptions.idle_timeout - idle, self._on_idle_check
+            )
+            return
+
+        self.subscriptions.idle_closed += 1
+        if acknowledged:
+            self.schedule(self.close(status.WS_1000_NORMAL_CLOSURE, "Idle timeout"))
+        else:
+            self.schedule(self.close(4408, "Connection initialisation timeout"))
+
+    async def _track_activity(
+        self, agen: typing.AsyncGenerator[typing.Any, None]
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        # Record when operations end, so that the idle timeout starts from there.
+        try:
+            async for item in agen:
+                yield item
+        finally:
+            self._last_active = time.monotonic()
+            await agen.aclose()
 
     # Concurrency implementation.
 
     def schedule(self, coro: typing.Coroutine) -> None:
-        loop = asyncio.get_event_loop()
-        self.tasks.add(loop.create_task(coro))
+        self.tasks.spawn(coro)
 
     async def on_disconnect(self, close_code: int) -> None:
-        await super().on_disconnect(close_code)
-        for task in self.tasks:
-            task.cancel()
+        self._stop_timers()
+        if self.subscriptions is not None:
+            self._get_registry(self.subscriptions).discard(self)
+        await super().on_disconnect(close_code)  # type: ignore
+        self.tasks.cancel()
 
     # WebSocket implementation.
 
+    def _encode_payload(self, payload: typing.Any) -> typing.Union[str, bytes]:
+        if self.msgpack_codec is not None:
+            return EncodedMessagePack(self.msgpack_codec.encode(payload))
+        return EncodedJSON(self.json_codec.encode_text(payload))
+
+    def _encode(self, message: dict) -> typing.Union[str, bytes]:
+        # NOTE: GraphQL over WebSocket messages are sent as text frames, or as
+        # binary frames when using MessagePack.
+        payload = message.get("payload")
+        # Already encoded payloads are spliced into the message as-is.
+        if self.msgpack_codec is not None:
+            if isinstance(payload, EncodedMessagePack):
+                message = {k: v for k, v in message.items() if k != "payload"}
+                return self.msgpack_codec.encode_message(message, payload)
+            return self.msgpack_codec.encode(message)
+        if isinstance(payload, EncodedJSON):
+            message = {k: v for k, v in message.items() if k != "payload"}
+            text = self.json_codec.encode_text(message)
+            return f'{text[:-1]},"payload":{payload}}}'
+        return self.json_codec.encode_text(message)
+
+    async def _send(self, data: typing.Union[str, bytes]) -> None:
+        if self.subscriptions is not None:
+            self.subscriptions.messages_sent += 1
+        if isinstance(data, bytes):
+            await self.websocket.send_bytes(data)
+        else:
+            await self.websocket.send_text(data)
+
     async def send_json(self, message: typing.Any) -> None:
-        await self.websocket.send_json(message)
+        data = self._encode(message)
+
+        write_batching = (
+            self.subscriptions.write_batching
+            if self.subscriptions is not None
+            else None
+        )
+        if write_batching is None:
+            await self._send(data)
+            return
+
+        # NOTE: messages are queued, and sent in order by a single writer task.
+        self._outbox.append(data)
+        if self._writer is None:
+            self._writer = self.tasks.spawn(self._write(write_batching))
+        elif len(self._outbox) >= write_batching.max_size:
+            # Wait for the writer to catch up, so that the outbox stays bounded.
+            self._outbox_full.set()
+            await self._outbox_drained.wait()
+
+    async def _write(self, write_batching: WriteBatching) -> None:
+        try:
+            while self._outbox:
+                if len(self._outbox) < write_batching.max_size:
+                    # Gather messages produced within the window.
+                    try:
+                        await asyncio.wait_for(
+                            self._outbox_full.wait(), write_batching.window
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+
+                batch = list(self._outbox)
+                self._outbox.clear()
+                self._outbox_full.clear()
+                drained, self._outbox_drained = self._outbox_drained, asyncio.Event()
+                drained.set()
+
+                write_batching.flushes += 1
+                write_batching.messages += len(batch)
+                for data in batch:
+                    await self._send(data)
+        finally:
+            self._writer = None
+
+    async def close(self, close_code: int, reason: str = None) -> None:
+        if self._writer is not None:
+            # Flush pending messages first.
+            await asyncio.wait([self._writer])
+        await self.websocket.close(close_code, reason)
+
+    # GraphQL engine implementation.
+
+    def _open_stream(
+        self,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[typing.Dict[str, typing.Any]],
+        operation_name: typing.Optional[str],
+        context: dict,
+        shareable: bool = True,
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        def source() -> typing.AsyncGenerator[typing.Dict[str, typing.Any], None]:
+            aiterator = self.engine.subscribe(
+                query=query,
+                variables=variables,
+                operation_name=operation_name,
+                context=context,
+            )
+            # `tartiflette` type hints say it returns an `AsyncIterable` (doesn't
+            # include `aclose`), but it is actually a full-fledged
+            # `AsyncGenerator` which we want to be closing at some point.
+            return typing.cast(
+                typing.AsyncGenerator[typing.Dict[str, typing.Any], None], aiterator
+            )
+
+        if self.subscriptions is None:
+            return source()
+
+        agen: typing.AsyncGenerator[typing.Any, None]
+        shared = self.subscriptions.shared
+        key = None
+        if shared is not None and shareable:
+            key = shared.get_key(self.websocket, query, variables, operation_name)
+        if key is None:
+            agen = source()
+        else:
+            # NOTE: identical subscriptions share the execution of the first
+            # one, including its GraphQL context.
+            assert shared is not None
+            agen = shared.subscribe(
+                (key, self.msgpack_codec is not None),
+                source,
+                encode=self._encode_payload,
+                on_overflow=self._on_overflow,
+            )
+
+        backpressure = self.subscriptions.backpressure
+        if backpressure is not None:
+            agen = backpressure.buffer(agen, on_overflow=self._on_overflow)
+
+        return agen
+
+    def _trace(
+        self,
+        query: typing.Union[str, bytes],
+        agen: typing.AsyncGenerator[typing.Any, None],
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        if self.instrumentation is None:
+            return agen
+        tracer = self.instrumentation.trace(self.websocket)
+        if not tracer.enabled:
+            return agen
+        return self._traced(tracer, query, agen)
+
+    async def _traced(
+        self,
+        tracer: Tracer,
+        query: typing.Union[str, bytes],
+        agen: typing.AsyncGenerator[typing.Any, None],
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        with tracer.phase(Instrumentation.VALIDATION):
+            parse_document(self.engine, query)
+        try:
+            # NOTE: spans the whole lifetime of the operation.
+            with tracer.phase(Instrumentation.EXECUTION):
+                async for item in agen:
+                    yield item
+        finally:
+            await agen.aclose()
+
+    async def _admit(
+        self, operation_type: str, agen: typing.AsyncGenerator[typing.Any, None]
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        assert self.admission is not None
+        try:
+            await self.admission.acquire(operation_type)
+        except Overloaded as exc:
+            await agen.aclose()
+            raise protocol.OperationError([exc.to_dict()])
+        try:
+            async for item in agen:
+                yield item
+        finally:
+            self.admission.release(operation_type)
+            await agen.aclose()
+
+    def _check_cost(
+        self,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[typing.Dict[str, typing.Any]],
+        operation_name: typing.Optional[str],
+    ) -> None:
+        cost_analysis = self.cost_analysis
+        if cost_analysis is None:
+            return
+        cost = cost_analysis.analyze(self.engine, query, operation_name, variables)
+        if cost is None:
+            return
+        try:
+            cost_analysis.check(cost)
+        except CostLimitExceeded as exc:
+            raise protocol.OperationError([exc.to_dict()])
+
+    async def _execute_operation(
+        self,
+        query: typing.Union[str, bytes],
+        variables: typing.Optional[typing.Dict[str, typing.Any]],
+        operation_name: typing.Optional[str],
+        context: dict,
+    ) -> typing.Dict[str, typing.Any]:
+        # Execute a query or mutation.
+        admission = self.admission
+        operation_type = ""
+        if admission is not None:
+            operation_type = admission.get_operation_type(
+                self.engine, query, operation_name
+            )
+            try:
+                await admission.acquire(operation_type)
+            except Overloaded as exc:
+                raise protocol.OperationError([exc.to_dict()])
 
-    async def close(self, close_code: int) -> None:
-        await self.websocket.close(close_code)
+        # NOTE: subscriptions are not logged, as their duration is dominated
+        # by waiting for events.
+        slow_log = self.slow_log
+        timer = slow_log.start() if slow_log is not None else None
+        try:
+            return await self.engine.execute(
+                query,
+                variables=variables,
+                operation_name=operation_name,
+                context=context,
+            )
+        finally:
+            if admission is not None:
+                admission.release(operation_type)
+            if slow_log is not None:
+                assert timer is not None
+                await slow_log.finish(timer, query, operation_name, variables)
 
+    def _make_subscription(
+        self, agen: typing.AsyncGenerator[typing.Any, None]
+    ) -> protocol.Subscription:
+        if self.subscriptions is not None and self.subscriptions.idle_timeout:
+            agen = self._track_activity(agen)
+        return protocol.Subscription(agen)
+
+    def _on_overflow(self) -> None:
+        self.schedule(
+            self.close(status.WS_1008_POLICY_VIOLATION, "Subscriber is too slow")
+        )
+
+
+class GraphQLWSProtocol(_WebSocketProtocol, protocol.GraphQLWSProtocol):
     # GraphQL engine implementation.
 
     def get_subscription(
         self, opid: str, payload: protocol.Payload
     ) -> protocol.Subscription:
+        agen = self._trace(payload["query"], self._execute(payload))
+        return self._make_subscription(agen)
+
+    async def _execute(
+        self, payload: protocol.Payload
+    ) -> typing.AsyncGenerator[typing.Dict[str, typing.Any], None]:
+        query = payload["query"]
+        variables = payload.get("variables")
+        operation_name = payload.get("operationName")
         context = {**payload.get("context", {}), **self.context}
-        aiterator = self.engine.subscribe(
-            query=payload["query"],
-            variables=payload.get("variables"),
-            operation_name=payload.get("operationName"),
-            context=context,
+
+        operation = get_document_operation(self.engine, query, operation_name)
+        self._check_cost(query, variables, operation_name)
+
+        if operation is not None and operation.operation_type != "subscription":
+            yield await self._execute_operation(
+                query, variables, operation_name, context
+            )
+            return
+
+        agen = self._open_stream(
+            query,
+            variables,
+            operation_name,
+            context,
+            # NOTE: the context sent by the client is its own.
+            shareable=not payload.get("context"),
+        )
+        if self.admission is not None:
+            agen = self._admit(AdmissionControl.SUBSCRIPTION, agen)
+        try:
+            async for item in agen:
+                yield item
+        finally:
+            await agen.aclose()
+
+
+class GraphQLTransportWSProtocol(
+    _WebSocketProtocol, protocol.GraphQLTransportWSProtocol
+):
+    # GraphQL engine implementation.
+
+    def get_subscription(
+        self, opid: str, payload: protocol.Payload
+    ) -> protocol.Subscription:
+        agen = self._trace(payload["query"], self._execute(payload))
+        return self._make_subscription(agen)
+
+    async def _execute(
+        self, payload: protocol.Payload
+    ) -> typing.AsyncGenerator[typing.Dict[str, typing.Any], None]:
+        query = payload["query"]
+        variables = payload.get("variables")
+        operation_name = payload.get("operationName")
+        context = dict(self.context)
+
+        operation = get_document_operation(self.engine, query, operation_name)
+        self._check_cost(query, variables, operation_name)
+
+        if operation is not None and operation.operation_type == "subscription":
+            agen = self._open_stream(query, variables, operation_name, context)
+            if self.admission is not None:
+                agen = self._admit(AdmissionControl.SUBSCRIPTION, agen)
+            try:
+                async for item in agen:
+                    yield item
+            finally:
+                await agen.aclose()
+            return
+
+        result = await self._execute_operation(
+            query, variables, operation_name, context
         )
+        if operation is None and result.get("errors"):
+            # The operation could not be executed at all.
+            raise protocol.OperationError(result["errors"])
+        yield result
+
 
-        # `tartiflette` type hints say it returns an `AsyncIterable` (doesn't
-        # include `aclose`), but it is actually a full-fledged `AsyncGenerator`
-        # which we want to be closing at some point.
-        agen = typing.cast(
-            typing.AsyncGenerator[typing.Dict[str, typing.Any], None], aiterator
+class GraphQLSSEProtocol(GraphQLTransportWSProtocol):
+    # Runs a single operation using the `graphql-transport-ws` protocol logic,
+    # but with messages sent as server-sent events over an HTTP response.
+
+    def __init__(
+        self,
+        request: HTTPConnection,
+        engine: Engine,
+        context: dict,
+        json_codec: JSONCodec = None,
+        subscriptions: Subscriptions = None,
+        instrumentation: Instrumentation = None,
+        slow_log: SlowOperationLog = None,
+        admission: AdmissionControl = None,
+        cost_analysis: CostAnalysis = None,
+    ):
+        super().__init__(
+            websocket=request,  # type: ignore
+            engine=engine,
+            context=context,
+            json_codec=json_codec,
+            subscriptions=subscriptions,
+            instrumentation=instrumentation,
+            slow_log=slow_log,
+            admission=admission,
+            cost_analysis=cost_analysis,
         )
+        # NOTE: a single slot, so that operations are paced by the response.
+        self._messages: asyncio.Queue = asyncio.Queue(maxsize=1)
 
-        return protocol.Subscription(agen)
+    def _get_registry(self, subscriptions: Subscriptions) -> typing.Set[typing.Any]:
+        # NOTE: streams are not WebSocket connections, so count them apart.
+        return subscriptions._streams
+
+    async def send_json(self, message: typing.Any) -> None:
+        await self._messages.put(message)
+
+    async def close(self, close_code: int, reason: str = None) -> None:
+        await self._messages.put(None)
+
+    def _format_event(self, event: str, data: typing.Any = None) -> bytes:
+        lines = [f"event: {event}"]
+        if data is None:
+            lines.append("data:")
+        else:
+            text = data if isinstance(data, EncodedJSON) else self._encode_payload(data)
+            lines.extend(f"data: {line}" for line in str(text).splitlines())
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+    async def stream(self, payload: protocol.Payload) -> typing.AsyncIterator[bytes]:
+        await self.on_receive({"type": GTWS.CONNECTION_INIT})
+        await self.on_receive({"type": GTWS.SUBSCRIBE, "id": "sse", "payload": payload})
+
+        try:
+            while True:
+                message = await self._messages.get()
+                if message is None:
+                    return
+
+                optype = message["type"]
+                if optype == GTWS.NEXT:
+                    yield self._format_event("next", message["payload"])
+                elif optype == GTWS.ERROR:
+                    yield self._format_event("next", {"errors": message["payload"]})
+                    yield self._format_event("complete")
+                    return
+                elif optype == GTWS.COMPLETE:
+                    yield self._format_event("complete")
+                    return
+                elif optype == GTWS.PING:
+                    # Keep-alive, as a comment which clients ignore.
+                    yield b": ping\n\n"
+        finally:
+            await self.on_disconnect(status.WS_1000_NORMAL_CLOSURE)
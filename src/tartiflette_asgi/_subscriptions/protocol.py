@@ -1,18 +1,27 @@
-"""Sans-IO base implementation of the GraphQL over WebSocket protocol.
+"""Sans-IO base implementations of the GraphQL over WebSocket protocols.
 
-See: https://github.com/apollographql/subscriptions-transport-ws
+See:
+- `graphql-ws`: https://github.com/apollographql/subscriptions-transport-ws
+- `graphql-transport-ws`:
+  https://github.com/enisdenjo/graphql-ws/blob/master/PROTOCOL.md
 """
+import asyncio
 import json
 import sys
 import typing
 
-from .constants import GQL
+from .constants import GQL, GTWS, GTWSCloseCode
 
 if sys.version_info >= (3, 8):  # pragma: no cover
     from typing import TypedDict
 else:  # pragma: no cover
     from typing_extensions import TypedDict
 
+if sys.version_info >= (3, 7):  # pragma: no cover
+    _current_task = asyncio.current_task
+else:  # pragma: no cover
+    _current_task = asyncio.Task.current_task
+
 
 class Payload(TypedDict):
     context: dict
@@ -22,13 +31,13 @@ class Payload(TypedDict):
 
 
 class Subscription:
-    def __init__(
-        self,
-        agen: typing.AsyncGenerator[typing.Dict[str, typing.Any], None],
-    ) -> None:
+    # NOTE: items are result dicts, or payloads which the implementation
+    # knows how to send as-is (e.g. pre-encoded JSON).
+
+    def __init__(self, agen: typing.AsyncGenerator[typing.Any, None]) -> None:
         self._agen = agen
 
-    async def __aiter__(self) -> typing.AsyncIterator[typing.Dict[str, typing.Any]]:
+    async def __aiter__(self) -> typing.AsyncIterator[typing.Any]:
         async for item in self._agen:
             yield item
 
@@ -36,11 +45,40 @@ class Subscription:
         await self._agen.aclose()
 
 
+class OperationError(Exception):
+    # Raised by subscriptions whose operation could not be executed at all,
+    # e.g. because the document is invalid.
+
+    def __init__(self, errors: typing.List[dict]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+
 class GraphQLWSProtocol:
     name = "graphql-ws"
 
     def __init__(self) -> None:
+        self._acknowledged = False
         self._subscriptions: typing.Dict[str, Subscription] = {}
+        # Tasks running the subscriptions, so that they can be cancelled.
+        self._tasks: typing.Dict[str, asyncio.Future] = {}
+
+    # Maximum number of concurrent operations, if any.
+    max_operations: typing.Optional[int] = None
+
+    @property
+    def operations(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def acknowledged(self) -> bool:
+        return self._acknowledged
+
+    def _is_at_capacity(self) -> bool:
+        return (
+            self.max_operations is not None
+            and len(self._subscriptions) >= self.max_operations
+        )
 
     # Methods whose implementation is left to the implementer.
 
@@ -81,41 +119,63 @@ class GraphQLWSProtocol:
     async def _subscribe(self, opid: str, payload: Payload) -> None:
         subscription = self.get_subscription(opid, payload)
         self._subscriptions[opid] = subscription
+        task = _current_task()
+        assert task is not None
+        self._tasks[opid] = task
 
         try:
             async for item in subscription:
-                if opid not in self._subscriptions:
+                if self._subscriptions.get(opid) is not subscription:
                     break
                 await self._send_message(opid, optype="data", payload=item)
+        except asyncio.CancelledError:
+            raise
+        except OperationError as exc:
+            await self._send_message(opid, GQL.ERROR, exc.errors[0])
+            return
         except Exception as exc:
             await self._send_error("Internal error", opid=opid)
             raise exc
+        finally:
+            if self._subscriptions.get(opid) is subscription:
+                del self._subscriptions[opid]
+            if self._tasks.get(opid) is task:
+                del self._tasks[opid]
+            await subscription.aclose()
 
         await self._send_message(opid, "complete")
-        await self._unsubscribe(opid)
 
-    async def _unsubscribe(self, opid: str) -> None:
+    async def _unsubscribe(self, opid: str) -> bool:
+        # NOTE: the subscription is closed by its own task, as an async
+        # generator cannot be closed while it is being iterated over.
+        # Cancelling the task gets it out of waiting for the next item.
         subscription = self._subscriptions.pop(opid, None)
-        if subscription is None:
-            return
-        await subscription.aclose()
+        task = self._tasks.pop(opid, None)
+        if task is not None:
+            task.cancel()
+        return subscription is not None
 
     # Client message handlers.
 
     async def _on_connection_init(self, opid: str, payload: Payload) -> None:
         try:
+            self._acknowledged = True
             await self._send_message(optype=GQL.CONNECTION_ACK)
         except Exception as exc:
             await self._send_error(str(exc), opid=opid, error_type=GQL.CONNECTION_ERROR)
             await self.close(1011)
 
     async def _on_start(self, opid: str, payload: Payload) -> None:
+        if opid not in self._subscriptions and self._is_at_capacity():
+            await self._send_error("Too many operations", opid=opid)
+            return
         if opid in self._subscriptions:
             await self._unsubscribe(opid)
         await self._subscribe(opid, payload)
 
     async def _on_stop(self, opid: str, payload: Payload) -> None:
-        await self._unsubscribe(opid)
+        if await self._unsubscribe(opid):
+            await self._send_message(opid, "complete")
 
     async def _on_connection_terminate(self, opid: str, payload: Payload) -> None:
         await self.close(1011)
@@ -153,12 +213,209 @@ class GraphQLWSProtocol:
 
     # Public API.
 
+    async def keep_alive(self) -> None:
+        if self._acknowledged:
+            await self._send_message(optype=GQL.CONNECTION_KEEP_ALIVE)
+
     async def on_receive(self, message: typing.Any) -> None:
         # Subscription execution is a long-lived `async for` operation,
         # so we must schedule it in a separate task on the event loop.
         self.schedule(self._main(message))
 
     async def on_disconnect(self, close_code: int) -> None:
-        # NOTE: load keys in list to prevent "size changed during iteration".
-        for opid in list(self._subscriptions):
-            await self._unsubscribe(opid)
+        self._subscriptions.clear()
+        self._tasks.clear()
+
+
+class GraphQLTransportWSProtocol:
+    name = "graphql-transport-ws"
+
+    def __init__(self) -> None:
+        self._initialized = False
+        self._acknowledged = False
+        self._subscriptions: typing.Dict[str, Subscription] = {}
+        # Tasks running the subscriptions, so that they can be cancelled.
+        self._tasks: typing.Dict[str, asyncio.Future] = {}
+
+    # Maximum number of concurrent operations, if any.
+    max_operations: typing.Optional[int] = None
+
+    @property
+    def operations(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def acknowledged(self) -> bool:
+        return self._acknowledged
+
+    def _is_at_capacity(self) -> bool:
+        return (
+            self.max_operations is not None
+            and len(self._subscriptions) >= self.max_operations
+        )
+
+    # Methods whose implementation is left to the implementer.
+
+    def schedule(self, coro: typing.Coroutine) -> None:
+        raise NotImplementedError
+
+    async def send_json(self, message: dict) -> None:
+        raise NotImplementedError
+
+    async def close(self, close_code: int, reason: str = None) -> None:
+        raise NotImplementedError
+
+    def get_subscription(self, opid: str, payload: Payload) -> Subscription:
+        # NOTE: queries and mutations are single-result subscriptions.
+        raise NotImplementedError
+
+    # Helpers.
+
+    async def _send_message(
+        self,
+        optype: str,
+        opid: typing.Optional[str] = None,
+        payload: typing.Optional[typing.Any] = None,
+    ) -> None:
+        message: dict = {"type": optype}
+        if opid is not None:
+            message["id"] = opid
+        if payload is not None:
+            message["payload"] = payload
+        await self.send_json(message)
+
+    async def _subscribe(self, opid: str, payload: Payload) -> None:
+        subscription = self.get_subscription(opid, payload)
+        self._subscriptions[opid] = subscription
+        task = _current_task()
+        assert task is not None
+        self._tasks[opid] = task
+
+        try:
+            async for item in subscription:
+                if self._subscriptions.get(opid) is not subscription:
+                    # Completed by the client.
+                    return
+                await self._send_message(GTWS.NEXT, opid=opid, payload=item)
+        except asyncio.CancelledError:
+            raise
+        except OperationError as exc:
+            if self._subscriptions.pop(opid, None) is subscription:
+                await self._send_message(GTWS.ERROR, opid=opid, payload=exc.errors)
+            return
+        except Exception as exc:
+            if self._subscriptions.pop(opid, None) is subscription:
+                errors = [{"message": "Internal error"}]
+                await self._send_message(GTWS.ERROR, opid=opid, payload=errors)
+            raise exc
+        finally:
+            if self._tasks.get(opid) is task:
+                del self._tasks[opid]
+            await subscription.aclose()
+
+        if self._subscriptions.pop(opid, None) is subscription:
+            await self._send_message(GTWS.COMPLETE, opid=opid)
+
+    # Client message handlers.
+
+    async def _on_connection_init(self, message: dict) -> None:
+        if self._initialized:
+            await self.close(
+                GTWSCloseCode.TOO_MANY_INITIALISATION_REQUESTS,
+                "Too many initialisation requests",
+            )
+            return
+        self._initialized = True
+        self._acknowledged = True
+        await self._send_message(GTWS.CONNECTION_ACK)
+
+    async def _on_ping(self, message: dict) -> None:
+        await self._send_message(GTWS.PONG)
+
+    async def _on_pong(self, message: dict) -> None:
+        pass
+
+    async def _on_subscribe(self, message: dict) -> None:
+        if not self._acknowledged:
+            await self.close(GTWSCloseCode.UNAUTHORIZED, "Unauthorized")
+            return
+
+        opid = message.get("id")
+        payload = message.get("payload")
+        if (
+            not isinstance(opid, str)
+            or not isinstance(payload, dict)
+            or not isinstance(payload.get("query"), str)
+        ):
+            await self.close(GTWSCloseCode.INVALID_MESSAGE, "Invalid message")
+            return
+
+        if opid in self._subscriptions:
+            await self.close(
+                GTWSCloseCode.SUBSCRIBER_ALREADY_EXISTS,
+                f"Subscriber for {opid} already exists",
+            )
+            return
+
+        if self._is_at_capacity():
+            errors = [{"message": "Too many operations"}]
+            await self._send_message(GTWS.ERROR, opid=opid, payload=errors)
+            return
+
+        await self._subscribe(opid, typing.cast(Payload, payload))
+
+    async def _on_complete(self, message: dict) -> None:
+        # NOTE: the subscription is closed by its own task, as an async
+        # generator cannot be closed while it is being iterated over.
+        # Cancelling the task gets it out of waiting for the next item.
+        # No `complete` message is sent back, as per the protocol.
+        opid: str = message.get("id")  # type: ignore
+        self._subscriptions.pop(opid, None)
+        task = self._tasks.pop(opid, None)
+        if task is not None:
+            task.cancel()
+
+    # Main task.
+
+    async def _main(self, message: typing.Any) -> None:
+        if not isinstance(message, dict):
+            await self.close(GTWSCloseCode.INVALID_MESSAGE, "Invalid message")
+            return
+
+        optype = message.get("type")
+        handler: typing.Callable[[dict], typing.Awaitable[None]]
+
+        if optype == GTWS.CONNECTION_INIT:
+            handler = self._on_connection_init
+        elif optype == GTWS.PING:
+            handler = self._on_ping
+        elif optype == GTWS.PONG:
+            handler = self._on_pong
+        elif optype == GTWS.SUBSCRIBE:
+            handler = self._on_subscribe
+        elif optype == GTWS.COMPLETE:
+            handler = self._on_complete
+        else:
+            await self.close(
+                GTWSCloseCode.INVALID_MESSAGE, f"Unsupported message type: {optype}"
+            )
+            return
+
+        await handler(message)
+
+    # Public API.
+
+    async def keep_alive(self) -> None:
+        if self._acknowledged:
+            await self._send_message(GTWS.PING)
+
+    async def on_receive(self, message: typing.Any) -> None:
+        # NOTE: the state which the handlers depend on (e.g. acknowledgement,
+        # or registered subscriptions) is updated before their first `await`,
+        # so messages are processed in order even though handlers run
+        # concurrently.
+        self.schedule(self._main(message))
+
+    async def on_disconnect(self, close_code: int) -> None:
+        self._subscriptions.clear()
+        self._tasks.clear()
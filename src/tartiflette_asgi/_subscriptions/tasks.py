@@ -0,0 +1,55 @@
+import asyncio
+import collections
+import logging
+import typing
+
+logger = logging.getLogger("tartiflette_asgi")
+
+
+class TaskRegistry:
+    # Keeps track of the tasks spawned for a WebSocket connection, so that
+    # they can be cancelled when it is closed.
+
+    def __init__(
+        self,
+        *,
+        on_error: typing.Callable[[BaseException], None] = None,
+        max_errors: int = 16,
+    ) -> None:
+        self.on_error = on_error
+        self.errors: typing.Deque[BaseException] = collections.deque(maxlen=max_errors)
+        self._tasks: typing.Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> typing.Iterator[asyncio.Task]:
+        return iter(self._tasks)
+
+    def spawn(self, coro: typing.Coroutine) -> asyncio.Task:
+        loop = asyncio.get_event_loop()
+        task = loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def _done(self, task: asyncio.Task) -> None:
+        # NOTE: finished tasks are dropped right away, so that long-lived
+        # connections don't accumulate them.
+        self._tasks.discard(task)
+
+        if task.cancelled():
+            return
+
+        exc = task.exception()
+        if exc is None:
+            return
+
+        self.errors.append(exc)
+        logger.error("Error in WebSocket task", exc_info=exc)
+        if self.on_error is not None:
+            self.on_error(exc)
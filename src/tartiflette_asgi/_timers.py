@@ -0,0 +1,82 @@
+import asyncio
+import typing
+
+
+class Timer:
+    def __init__(
+        self, wheel: "TimerWheel", slot: int, rounds: int, callback: typing.Callable
+    ) -> None:
+        self._wheel = wheel
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._remove(self)
+
+
+class TimerWheel:
+    # A hashed timer wheel, i.e. a single task which serves the timers of all
+    # connections, and only looks at timers which are due on each tick.
+
+    def __init__(self, *, resolution: float = 1.0, size: int = 64) -> None:
+        assert resolution > 0, "`resolution` must be positive"
+        assert size > 0, "`size` must be a positive integer"
+        self.resolution = resolution
+        self._slots: typing.List[typing.Set[Timer]] = [set() for _ in range(size)]
+        self._cursor = 0
+        self._count = 0
+        self._task: typing.Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def call_later(self, delay: float, callback: typing.Callable[[], None]) -> Timer:
+        size = len(self._slots)
+        ticks = max(1, -int(-delay // self.resolution))  # Round up.
+        timer = Timer(
+            self,
+            slot=(self._cursor + ticks) % size,
+            rounds=(ticks - 1) // size,
+            callback=callback,
+        )
+        self._slots[timer.slot].add(timer)
+        self._count += 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+        return timer
+
+    def _remove(self, timer: Timer) -> None:
+        slot = self._slots[timer.slot]
+        if timer in slot:
+            slot.remove(timer)
+            self._count -= 1
+
+    def _tick(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+
+        due = []
+        for timer in slot:
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                due.append(timer)
+
+        for timer in due:
+            slot.remove(timer)
+            self._count -= 1
+            timer.cancelled = True
+            timer.callback()
+
+    async def _run(self) -> None:
+        # NOTE: the task stops once there are no timers left, and is started
+        # again by the next call to `call_later()`.
+        while self._count:
+            await asyncio.sleep(self.resolution)
+            self._tick()
@@ -0,0 +1,218 @@
+import inspect
+import re
+import typing
+
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+
+from ._json import JSONCodec
+
+# See: https://github.com/jaydenseric/graphql-multipart-request-spec
+
+_BOUNDARY = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+_FIELD_NAME = re.compile(rb'\bname="([^"]*)"', re.IGNORECASE)
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message, status_code)
+        self.message = message
+        self.status_code = status_code
+
+
+class _FileSizes:
+    # Track the size of each file part of a raw multipart body, so that the
+    # size limit of files is enforced while the body streams in, rather than
+    # once files have been spooled in full by the parser.
+
+    def __init__(self, boundary: bytes, max_file_size: int) -> None:
+        self.delimiter = b"\r\n--" + boundary
+        self.max_file_size = max_file_size
+        # NOTE: the first delimiter is not preceded by a line break.
+        self._buffer = b"\r\n"
+        self._in_headers = False
+        self._field_name: typing.Optional[str] = None
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> typing.Optional[str]:
+        # Returns the name of the field of a file over the size limit, if any.
+        self._buffer += chunk
+        while True:
+            if self._in_headers:
+                index = self._buffer.find(b"\r\n\r\n")
+                if index == -1:
+                    return None
+                headers = self._buffer[:index]
+                self._buffer = self._buffer[index + 4 :]
+                self._in_headers = False
+                self._size = 0
+                self._field_name = None
+                if b"filename" in headers.lower():
+                    match = _FIELD_NAME.search(headers)
+                    name = match.group(1) if match is not None else b""
+                    self._field_name = name.decode("utf-8", "replace")
+                continue
+
+            index = self._buffer.find(self.delimiter)
+            if index == -1:
+                # Keep enough bytes to find a delimiter split across chunks.
+                size = len(self._buffer) - len(self.delimiter) + 1
+            else:
+                size = index
+            if size > 0:
+                self._size += size
+                if self._field_name is not None and self._size > self.max_file_size:
+                    return self._field_name
+                self._buffer = self._buffer[size:]
+            if index == -1:
+                return None
+            self._buffer = self._buffer[len(self.delimiter) :]
+            self._in_headers = True
+
+
+class Uploads:
+    def __init__(
+        self,
+        *,
+        max_file_size: int = 10 * 1024 * 1024,
+        max_total_size: int = 50 * 1024 * 1024,
+        max_files: int = 10,
+    ) -> None:
+        assert max_file_size > 0, "`max_file_size` must be a positive integer"
+        assert max_total_size > 0, "`max_total_size` must be a positive integer"
+        assert max_files > 0, "`max_files` must be a positive integer"
+        try:
+            import python_multipart  # noqa: F401
+        except ImportError:  # pragma: no cover
+            try:
+                import multipart  # type: ignore # noqa: F401
+            except ImportError:
+                raise ImportError(
+                    "File uploads require `python-multipart` to be installed. "
+                    "Hint: run `pip install tartiflette-asgi[uploads]`."
+                )
+        # NOTE: imported here so that only apps which enable uploads require
+        # a Starlette version whose parser limits the number of files.
+        from starlette.formparsers import MultiPartParser
+
+        if "max_files" not in inspect.signature(MultiPartParser).parameters:
+            raise ImportError(  # pragma: no cover
+                "File uploads require Starlette 0.25 or later. "
+                "Hint: run `pip install tartiflette-asgi[uploads]`."
+            )
+        self.max_file_size = max_file_size
+        self.max_total_size = max_total_size
+        self.max_files = max_files
+        self.rejected = 0
+
+    async def parse(
+        self, request: Request, codec: JSONCodec
+    ) -> typing.Tuple[typing.Any, typing.List[UploadFile]]:
+        # Returns the operations, with files substituted into their variables.
+        # NOTE: the caller is responsible for closing the returned files.
+        try:
+            return await self._parse(request, codec)
+        except UploadError:
+            self.rejected += 1
+            raise
+
+    async def _parse(
+        self, request: Request, codec: JSONCodec
+    ) -> typing.Tuple[typing.Any, typing.List[UploadFile]]:
+        from starlette.formparsers import MultiPartException, MultiPartParser
+
+        # NOTE: files are spooled to temporary files by the parser, and the
+        # size of each file and the total size are checked as the body streams
+        # in, so that oversized requests are rejected before they are fully
+        # received. The body is cut short on the first exceeded limit.
+        match = _BOUNDARY.search(request.headers.get("content-type", ""))
+        sizes = (
+            None
+            if match is None
+            else _FileSizes(match.group(1).encode("latin-1"), self.max_file_size)
+        )
+        exceeded: typing.Optional[str] = None
+
+        async def stream() -> typing.AsyncGenerator[bytes, None]:
+            nonlocal exceeded
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > self.max_total_size:
+                    exceeded = "Request body is too large."
+                    return
+                field_name = None if sizes is None else sizes.feed(chunk)
+                if field_name is not None:
+                    exceeded = f"File {field_name!r} is too large."
+                    return
+                yield chunk
+
+        parser = MultiPartParser(request.headers, stream(), max_files=self.max_files)
+        try:
+            form = await parser.parse()
+        except MultiPartException as exc:
+            raise UploadError(exceeded or exc.message, 413 if exceeded else 400)
+        if exceeded is not None:
+            await form.close()
+            raise UploadError(exceeded, 413)
+
+        files: typing.Dict[str, UploadFile] = {}
+        for key, value in form.multi_items():
+            if isinstance(value, UploadFile):
+                files[key] = value
+
+        try:
+            operations = self._load(form.get("operations"), "operations", codec)
+            mapping = self._load(form.get("map"), "map", codec)
+            if not isinstance(operations, (dict, list)):
+                raise UploadError("Invalid `operations` field.")
+            if not isinstance(mapping, dict):
+                raise UploadError("Invalid `map` field.")
+
+            for key, paths in mapping.items():
+                file = files.get(key)
+                if file is None:
+                    raise UploadError(f"File missing for map entry {key!r}.")
+                if not isinstance(paths, list) or not paths:
+                    raise UploadError(f"Invalid paths for map entry {key!r}.")
+                for path in paths:
+                    _set_path(operations, path, file)
+        except UploadError:
+            await form.close()
+            raise
+
+        return operations, list(files.values())
+
+    def _load(self, value: typing.Any, name: str, codec: JSONCodec) -> typing.Any:
+        if not isinstance(value, str):
+            raise UploadError(f"Missing `{name}` field.")
+        try:
+            return codec.decode(value)
+        except ValueError:
+            raise UploadError(f"Unable to decode `{name}`: Invalid JSON.")
+
+
+def _set_path(operations: typing.Any, path: typing.Any, value: typing.Any) -> None:
+    # Paths are object paths such as `variables.file`, `variables.files.0`,
+    # or `0.variables.file` for batched operations.
+    if not isinstance(path, str):
+        raise UploadError("Invalid file path.")
+
+    keys = path.split(".")
+    target = operations
+    for position, key in enumerate(keys, 1):
+        index: typing.Any
+        if isinstance(target, list) and key.isdigit() and int(key) < len(target):
+            index = int(key)
+        elif isinstance(target, dict) and key in target:
+            index = key
+        else:
+            raise UploadError(f"Invalid file path {path!r}.")
+
+        if position < len(keys):
+            target = target[index]
+        elif target[index] is None:
+            # Files must replace `null` placeholders, as per the spec.
+            target[index] = value
+        else:
+            raise UploadError(f"Invalid file path {path!r}.")
@@ -2,8 +2,9 @@ import asyncio
 import typing
 from queue import Empty, Queue
 
+from starlette.datastructures import UploadFile
 from starlette.requests import Request
-from tartiflette import Resolver, Subscription
+from tartiflette import Resolver, Scalar, Subscription
 
 from ._utils import Dog, PubSub
 
@@ -29,6 +30,83 @@ async def resolve_foo(parent: typing.Any, args: dict, context: dict, info: dict)
     return get_foo()
 
 
+@Resolver("Query.contextId")
+async def resolve_context_id(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> str:
+    return str(id(context))
+
+
+@Resolver("Query.sleep")
+@Resolver("Mutation.sleep")
+async def resolve_sleep(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> float:
+    await asyncio.sleep(args["seconds"])
+    return args["seconds"]
+
+
+@Resolver("Query.dog")
+async def resolve_dog(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> typing.Optional[dict]:
+    dogs: typing.Dict[int, Dog] = context.get("dogs", {})
+    if "response_cache" in context:
+        context["response_cache"].tag(f"Dog:{args['id']}")
+    dog = dogs.get(args["id"])
+    return None if dog is None else dog._asdict()
+
+
+@Resolver("Query.dogs")
+async def resolve_dogs(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> typing.List[dict]:
+    dogs: typing.Dict[int, Dog] = context.get("dogs", {})
+    return [dog._asdict() for dog in dogs.values()][: args.get("first")]
+
+
+@Resolver("Mutation.removeDog")
+async def resolve_remove_dog(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> bool:
+    dogs: typing.Dict[int, Dog] = context.get("dogs", {})
+    if "response_cache" in context:
+        await context["response_cache"].invalidate(f"Dog:{args['id']}")
+    return dogs.pop(args["id"], None) is not None
+
+
+@Scalar("Upload")
+class UploadScalar:
+    # Files are substituted into variables by the app, so pass them through.
+    def coerce_input(self, value: typing.Any) -> UploadFile:
+        return value
+
+    def coerce_output(self, value: typing.Any) -> str:
+        raise ValueError("Upload is an input-only scalar")
+
+    def parse_literal(self, ast: typing.Any) -> typing.Any:
+        raise ValueError("Upload must be provided as a variable")
+
+
+@Resolver("Mutation.upload")
+async def resolve_upload(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> str:
+    file: UploadFile = args["file"]
+    content = await file.read()
+    return f"{file.filename}:{content.decode()}"
+
+
+@Resolver("Mutation.uploadMany")
+async def resolve_upload_many(
+    parent: typing.Any, args: dict, context: dict, info: dict
+) -> typing.List[str]:
+    return [
+        await resolve_upload(parent, {"file": file}, context, info)
+        for file in args["files"]
+    ]
+
+
 @Subscription("Subscription.dogAdded")
 async def on_dog_added(
     parent: typing.Any, args: dict, ctx: dict, info: dict
@@ -0,0 +1,280 @@
+import asyncio
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import AdmissionControl, Batching, TartifletteApp
+from tartiflette_asgi._admission import Overloaded
+
+from ._utils import Dog, get_client, pubsub
+
+SLEEP = {"query": "{ sleep(seconds: 0.1) }"}
+
+
+def _wait_for(predicate: typing.Callable[[], bool]) -> None:
+    for _ in range(100):
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("Timed out")  # pragma: no cover
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue() -> None:
+    admission = AdmissionControl(max_queries=1, max_queue=1, queue_timeout=None)
+    await admission.acquire(AdmissionControl.QUERY)
+
+    waiter = asyncio.ensure_future(admission.acquire(AdmissionControl.QUERY))
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    with pytest.raises(Overloaded) as ctx:
+        await admission.acquire(AdmissionControl.QUERY)
+    assert ctx.value.reason == AdmissionControl.QUEUE_FULL
+
+    admission.release(AdmissionControl.QUERY)
+    await waiter
+    assert admission.inflight == 1
+    assert admission.queued == 0
+    admission.release(AdmissionControl.QUERY)
+    assert admission.inflight == 0
+    assert admission.rejections == {AdmissionControl.QUEUE_FULL: 1}
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout() -> None:
+    admission = AdmissionControl(max_queries=1, queue_timeout=0.01)
+    await admission.acquire(AdmissionControl.QUERY)
+
+    with pytest.raises(Overloaded) as ctx:
+        await admission.acquire(AdmissionControl.QUERY)
+    assert ctx.value.reason == AdmissionControl.QUEUE_TIMEOUT
+    assert admission.queued == 0
+
+    admission.release(AdmissionControl.QUERY)
+    assert admission.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag() -> None:
+    admission = AdmissionControl(max_event_loop_lag=0.01, lag_interval=0.05)
+    await admission.acquire(AdmissionControl.QUERY)
+    await asyncio.sleep(0)
+    time.sleep(0.1)  # Block the event loop.
+    await asyncio.sleep(0.01)
+
+    assert admission.lag >= 0.01
+    with pytest.raises(Overloaded) as ctx:
+        await admission.acquire(AdmissionControl.QUERY)
+    assert ctx.value.reason == AdmissionControl.EVENT_LOOP_LAG
+
+    admission.release(AdmissionControl.QUERY)
+    await asyncio.sleep(0.1)
+    assert admission.lag == 0
+
+
+@pytest.mark.asyncio
+async def test_overloaded_response(engine: Engine) -> None:
+    admission = AdmissionControl(max_queries=1, max_queue=0, retry_after=5)
+    app = TartifletteApp(engine=engine, admission=admission)
+
+    async with get_client(app) as client:
+
+        async def hello() -> typing.Any:
+            await asyncio.sleep(0.02)
+            return await client.post("/", json={"query": "{ hello }"})
+
+        slow, fast = await asyncio.gather(client.post("/", json=SLEEP), hello())
+
+    assert slow.status_code == 200
+    assert fast.status_code == 503
+    assert fast.headers["retry-after"] == "5"
+    assert fast.json() == {"error": "Server is overloaded."}
+    assert admission.rejected == 1
+    assert admission.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_incremental_response(engine: Engine) -> None:
+    admission = AdmissionControl(max_queries=1, max_queue=0)
+    app = TartifletteApp(engine=engine, admission=admission)
+    deferred = {"query": "{ hello ... @defer { sleep(seconds: 0.1) } }"}
+    accept = {"accept": "multipart/mixed; deferSpec=20220824"}
+
+    async with get_client(app) as client:
+
+        async def hello() -> typing.Any:
+            await asyncio.sleep(0.02)
+            assert admission.inflight == 1
+            return await client.post("/", json={"query": "{ hello }"})
+
+        slow, fast = await asyncio.gather(
+            client.post("/", json=deferred, headers=accept), hello()
+        )
+        assert slow.status_code == 200
+        assert fast.status_code == 503
+
+        async def defer() -> typing.Any:
+            await asyncio.sleep(0.02)
+            return await client.post("/", json=deferred, headers=accept)
+
+        slow, fast = await asyncio.gather(client.post("/", json=SLEEP), defer())
+        assert slow.status_code == 200
+        assert fast.status_code == 503
+
+    assert admission.rejected == 2
+    assert admission.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_separate_mutation_limit(engine: Engine) -> None:
+    admission = AdmissionControl(max_queries=1, max_mutations=1, max_queue=0)
+    app = TartifletteApp(engine=engine, admission=admission)
+
+    async with get_client(app) as client:
+
+        async def mutate() -> typing.Any:
+            await asyncio.sleep(0.02)
+            return await client.post(
+                "/", json={"query": "mutation { sleep(seconds: 0) }"}
+            )
+
+        query, mutation = await asyncio.gather(client.post("/", json=SLEEP), mutate())
+
+    assert query.status_code == 200
+    assert mutation.status_code == 200
+    assert admission.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(engine: Engine) -> None:
+    admission = AdmissionControl(max_queries=1, max_queue=0)
+    app = TartifletteApp(engine=engine, admission=admission, batching=Batching())
+
+    async with get_client(app) as client:
+        response = await client.post("/", json=[SLEEP, {"query": "{ hello }"}])
+
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first == {"data": {"sleep": 0.1}}
+    assert second == {
+        "data": None,
+        "errors": [
+            {"message": "Server is overloaded.", "extensions": {"code": "OVERLOADED"}}
+        ],
+    }
+
+
+def test_subscription_limit(engine: Engine) -> None:
+    admission = AdmissionControl(max_subscriptions=1)
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=True,
+        context={"pubsub": pubsub},
+        admission=admission,
+    )
+    subscribe = {
+        "type": "subscribe",
+        "payload": {"query": "subscription { dogAdded { name } }"},
+    }
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws"]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"id": "1", **subscribe})
+            ws.send_json({"id": "2", **subscribe})
+            assert ws.receive_json() == {
+                "id": "2",
+                "type": "error",
+                "payload": [
+                    {
+                        "message": "Server is overloaded.",
+                        "extensions": {"code": "OVERLOADED"},
+                    }
+                ],
+            }
+            time.sleep(0.1)
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"id": "1", "type": "complete"}
+
+    assert admission.inflight == 0
+
+
+def test_legacy_subscription_limit(engine: Engine) -> None:
+    admission = AdmissionControl(max_subscriptions=1)
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=True,
+        context={"pubsub": pubsub},
+        admission=admission,
+    )
+    start = {
+        "type": "start",
+        "payload": {"query": "subscription { dogAdded { name } }"},
+    }
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"id": "1", **start})
+            ws.send_json({"id": "2", **start})
+            assert ws.receive_json() == {
+                "id": "2",
+                "type": "error",
+                "payload": {
+                    "message": "Server is overloaded.",
+                    "extensions": {"code": "OVERLOADED"},
+                },
+            }
+            time.sleep(0.1)
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"id": "1", "type": "complete"}
+
+    assert admission.inflight == 0
+
+
+def test_stopped_subscription_frees_slot(engine: Engine) -> None:
+    admission = AdmissionControl(max_subscriptions=1)
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=True,
+        context={"pubsub": pubsub},
+        admission=admission,
+    )
+    subscribe = {
+        "type": "subscribe",
+        "payload": {"query": "subscription { dogAdded { name } }"},
+    }
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws"]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"id": "1", **subscribe})
+            _wait_for(lambda: admission.inflight == 1)
+
+            ws.send_json({"id": "1", "type": "complete"})
+            _wait_for(lambda: admission.inflight == 0)
+
+            ws.send_json({"id": "2", **subscribe})
+            _wait_for(lambda: admission.inflight == 1)
+            pubsub.emit("dog_added", Dog(id=1, name="Rex"))
+            assert ws.receive_json() == {
+                "id": "2",
+                "type": "next",
+                "payload": {"data": {"dogAdded": {"name": "Rex"}}},
+            }
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"id": "2", "type": "complete"}
+
+    assert admission.rejected == 0
+    assert admission.inflight == 0
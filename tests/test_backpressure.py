@@ -0,0 +1,101 @@
+import asyncio
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import Backpressure, Subscriptions, TartifletteApp
+
+from ._utils import Dog, pubsub
+
+
+async def _numbers(count: int) -> typing.AsyncGenerator[int, None]:
+    for i in range(count):
+        yield i
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow, expected, dropped",
+    [
+        (Backpressure.DROP_OLDEST, [8, 9, 10], 8),
+        (Backpressure.CONFLATE, [9, 10], 9),
+    ],
+)
+async def test_overflow(
+    overflow: str, expected: typing.List[int], dropped: int
+) -> None:
+    backpressure = Backpressure(max_size=3, overflow=overflow)
+    overflows: typing.List[None] = []
+
+    agen = backpressure.buffer(_numbers(11), on_overflow=lambda: overflows.append(None))
+    assert [item async for item in agen] == expected
+    assert backpressure.dropped == dropped
+    assert backpressure.depth == 0
+    assert overflows == []
+
+
+@pytest.mark.asyncio
+async def test_overflow_disconnect() -> None:
+    backpressure = Backpressure(max_size=3, overflow=Backpressure.DISCONNECT)
+    overflows: typing.List[None] = []
+
+    agen = backpressure.buffer(_numbers(11), on_overflow=lambda: overflows.append(None))
+    # The subscriber is left waiting until the connection is closed.
+    pending = asyncio.ensure_future(agen.__anext__())
+    await asyncio.sleep(0.01)
+    assert overflows == [None]
+    assert backpressure.disconnects == 1
+    assert backpressure.dropped == 4
+    pending.cancel()
+    await asyncio.wait([pending])
+    assert backpressure.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_forwarded() -> None:
+    async def source() -> typing.AsyncGenerator[int, None]:
+        yield 1
+        raise ValueError("Oops")
+
+    agen = Backpressure().buffer(source(), on_overflow=lambda: None)
+    assert await agen.__anext__() == 1
+    with pytest.raises(ValueError):
+        await agen.__anext__()
+
+
+def test_subscriptions_backpressure(engine: Engine) -> None:
+    backpressure = Backpressure(max_size=10)
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(path="/subscriptions", backpressure=backpressure),
+        context={"pubsub": pubsub},
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json(
+                {
+                    "type": "start",
+                    "id": "dogs",
+                    "payload": {"query": "subscription { dogAdded { id } }"},
+                }
+            )
+            time.sleep(0.1)
+
+            pubsub.emit("dog_added", Dog(id=1, name="Gaspar"))
+            assert ws.receive_json() == {
+                "type": "data",
+                "id": "dogs",
+                "payload": {"data": {"dogAdded": {"id": 1}}},
+            }
+
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"type": "complete", "id": "dogs"}
+
+    assert backpressure.depth == 0
+    assert backpressure.dropped == 0
@@ -0,0 +1,82 @@
+import pytest
+from tartiflette import Engine
+
+from tartiflette_asgi import Batching, TartifletteApp
+
+from ._utils import get_client
+
+
+@pytest.mark.asyncio
+async def test_batch(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, batching=True)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json=[
+                {"query": "{ hello }"},
+                {
+                    "query": "query($name: String) { hello(name: $name) }",
+                    "variables": {"name": "world"},
+                },
+                {"query": "{ foo }"},
+            ],
+        )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"data": {"hello": "Hello stranger"}},
+        {"data": {"hello": "Hello world"}},
+        {"data": {"foo": "default"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_error_isolation(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, batching=True)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json=[{"query": "{ dummy }"}, {"query": "{ hello }"}, {}, "{ hello }"],
+        )
+    assert response.status_code == 200
+    first, second, third, fourth = response.json()
+    assert first["data"] is None
+    assert "dummy" in first["errors"][0]["message"]
+    assert second == {"data": {"hello": "Hello stranger"}}
+    assert third == {
+        "data": None,
+        "errors": [{"message": "No GraphQL query found in the request"}],
+    }
+    assert fourth == {"data": None, "errors": [{"message": "Invalid operation."}]}
+
+
+@pytest.mark.asyncio
+async def test_batch_shared_context(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, batching=True)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/", json=[{"query": "{ contextId }"}, {"query": "{ contextId }"}]
+        )
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first["data"]["contextId"] == second["data"]["contextId"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [0, 3])
+async def test_batch_size(engine: Engine, size: int) -> None:
+    app = TartifletteApp(engine=engine, batching=Batching(max_size=2))
+    async with get_client(app) as client:
+        response = await client.post("/", json=[{"query": "{ hello }"}] * size)
+    assert response.status_code == 400
+    assert response.json() == {
+        "error": "Batches must contain between 1 and 2 operations."
+    }
+
+
+@pytest.mark.asyncio
+async def test_batching_disabled(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    async with get_client(app) as client:
+        response = await client.post("/", json=[{"query": "{ hello }"}])
+    assert response.status_code == 400
+    assert response.json() == {"error": "Batching is not enabled."}
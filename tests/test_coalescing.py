@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+from tartiflette import Engine
+
+from tartiflette_asgi import Coalescing, TartifletteApp
+
+from ._utils import get_client
+
+
+@pytest.mark.asyncio
+async def test_coalesce_identical_queries(engine: Engine) -> None:
+    coalescing = Coalescing()
+    app = TartifletteApp(engine=engine, coalescing=coalescing)
+
+    async with get_client(app) as client:
+        responses = await asyncio.gather(
+            *(client.get("/?query={ sleep(seconds: 0.1) }") for _ in range(5)),
+            client.get("/?query={ sleep(seconds: 0.05) }"),
+        )
+
+    for response in responses[:5]:
+        assert response.status_code == 200
+        assert response.json() == {"data": {"sleep": 0.1}}
+    assert responses[5].json() == {"data": {"sleep": 0.05}}
+
+    assert coalescing.executions == 2
+    assert coalescing.saved == 4
+    assert coalescing.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescing_context_key(engine: Engine) -> None:
+    def context_key(request: Request) -> str:
+        return request.headers.get("authorization", "")
+
+    coalescing = Coalescing(context_key=context_key)
+    app = TartifletteApp(engine=engine, coalescing=coalescing)
+
+    async with get_client(app) as client:
+        responses = await asyncio.gather(
+            *(
+                client.get(
+                    "/?query={ sleep(seconds: 0.1) }",
+                    headers={"authorization": f"Bearer {index % 2}"},
+                )
+                for index in range(4)
+            )
+        )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert coalescing.executions == 2
+    assert coalescing.saved == 2
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_not_coalesced(engine: Engine) -> None:
+    coalescing = Coalescing()
+    app = TartifletteApp(engine=engine, coalescing=coalescing)
+
+    async with get_client(app) as client:
+        responses = await asyncio.gather(
+            *(
+                client.post("/", json={"query": "mutation { sleep(seconds: 0.05) }"})
+                for _ in range(3)
+            )
+        )
+
+    for response in responses:
+        assert response.status_code == 200
+        assert response.json() == {"data": {"sleep": 0.05}}
+    assert coalescing.executions == 0
+    assert coalescing.saved == 0
+
+
+@pytest.mark.asyncio
+async def test_credentials_require_context_key(engine: Engine) -> None:
+    coalescing = Coalescing()
+    app = TartifletteApp(engine=engine, coalescing=coalescing)
+
+    async with get_client(app) as client:
+        responses = await asyncio.gather(
+            *(
+                client.get(
+                    "/?query={ sleep(seconds: 0.05) }",
+                    headers={"authorization": "Bearer 123"},
+                )
+                for _ in range(3)
+            )
+        )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert coalescing.executions == 0
+    assert coalescing.saved == 0
+
+
+def test_unserializable_variables_are_not_coalesced() -> None:
+    coalescing = Coalescing()
+    request = Request({"type": "http", "headers": []})
+    variables = {"file": object()}
+    assert coalescing.get_key(request, "{ hello }", variables, None) is None
@@ -0,0 +1,204 @@
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.types import Receive, Scope, Send
+from tartiflette import Engine
+
+from tartiflette_asgi import Batching, CostAnalysis, Subscriptions, TartifletteApp
+
+from ._utils import get_client
+
+EXPENSIVE = "query($n: Int = 1000) { dogs(first: $n) { name } }"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, variables, depth, cost",
+    [
+        ("{ hello }", None, 1, 1),
+        ("{ __typename hello }", None, 1, 1),
+        ("{ dog(id: 1) { name nickname } }", None, 2, 3),
+        ("{ dogs(first: 10) { name nickname } }", None, 2, 21),
+        (
+            "query($n: Int) { dogs(first: $n) { name nickname } }",
+            {"n": 5},
+            2,
+            11,
+        ),
+        ("query($n: Int) { dogs(first: $n) { name } }", None, 2, 2),
+        ("query($n: Int = 10) { dogs(first: $n) { name } }", None, 2, 11),
+        ("query($n: Int = 10) { dogs(first: $n) { name } }", {"n": 2}, 2, 3),
+        ("query($n: Int = 10) { dogs(first: $n) { name } }", {"n": None}, 2, 2),
+        ("{ dogs { id } }", None, 2, 2),
+        (
+            "{ ...F } fragment F on Query { dogs(first: 2) { ... on Dog { id } } }",
+            None,
+            2,
+            3,
+        ),
+    ],
+)
+async def test_analyze(
+    engine: Engine,
+    query: str,
+    variables: typing.Optional[dict],
+    depth: int,
+    cost: int,
+) -> None:
+    cost_analysis = CostAnalysis()
+    async with get_client(TartifletteApp(engine=engine)):
+        result = cost_analysis.analyze(engine, query, None, variables)
+    assert result is not None
+    assert result.depth == depth
+    assert result.cost == cost
+
+
+@pytest.mark.asyncio
+async def test_analyze_options(engine: Engine) -> None:
+    cost_analysis = CostAnalysis(
+        field_costs={"Query.dogs": 5, "Dog.nickname": 0},
+        list_arguments=["limit"],
+        default_list_size=20,
+    )
+    query = "{ dogs(first: 10) { name nickname } }"
+    async with get_client(TartifletteApp(engine=engine)):
+        result = cost_analysis.analyze(engine, query, None, None)
+        assert result is not None
+        assert result.cost == 5 + 20 * 1
+
+        assert cost_analysis.analyze(engine, "{ unknown }", None, None) is None
+
+
+@pytest.mark.asyncio
+async def test_plans_are_cached(engine: Engine) -> None:
+    cost_analysis = CostAnalysis()
+    query = "query($n: Int) { dogs(first: $n) { id } }"
+    async with get_client(TartifletteApp(engine=engine)):
+        first = cost_analysis.analyze(engine, query, None, {"n": 1})
+        second = cost_analysis.analyze(engine, query, None, {"n": 100})
+    assert first is not None and first.cost == 2
+    assert second is not None and second.cost == 101
+    assert len(cost_analysis._plans) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cost_analysis, code",
+    [
+        (CostAnalysis(max_depth=1), "DEPTH_LIMIT_EXCEEDED"),
+        (CostAnalysis(max_cost=10), "COST_LIMIT_EXCEEDED"),
+    ],
+)
+async def test_rejected(engine: Engine, cost_analysis: CostAnalysis, code: str) -> None:
+    app = TartifletteApp(engine=engine, cost_analysis=cost_analysis)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/", json={"query": "{ dogs(first: 100) { name } }"}
+        )
+        assert response.status_code == 400
+        data = response.json()
+        assert data["data"] is None
+        assert data["errors"][0]["extensions"] == {"code": code}
+
+        response = await client.post("/", json={"query": "{ hello }"})
+        assert response.status_code == 200
+
+    assert cost_analysis.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_variable_defaults_are_used(engine: Engine) -> None:
+    cost_analysis = CostAnalysis(max_cost=50)
+    app = TartifletteApp(engine=engine, cost_analysis=cost_analysis)
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": EXPENSIVE})
+    assert response.status_code == 400
+    assert response.json() == {
+        "data": None,
+        "errors": [
+            {
+                "message": "Query cost 1001 exceeds the maximum of 50.",
+                "extensions": {"code": "COST_LIMIT_EXCEEDED"},
+            }
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "subprotocol, start",
+    [("graphql-ws", "start"), ("graphql-transport-ws", "subscribe")],
+)
+def test_rejected_over_websocket(engine: Engine, subprotocol: str, start: str) -> None:
+    cost_analysis = CostAnalysis(max_cost=50)
+    app = TartifletteApp(engine=engine, cost_analysis=cost_analysis, subscriptions=True)
+    error = {
+        "message": "Query cost 1001 exceeds the maximum of 50.",
+        "extensions": {"code": "COST_LIMIT_EXCEEDED"},
+    }
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"id": "1", "type": start, "payload": {"query": EXPENSIVE}})
+            assert ws.receive_json() == {
+                "id": "1",
+                "type": "error",
+                # NOTE: `graphql-ws` errors are a single error object.
+                "payload": error if subprotocol == "graphql-ws" else [error],
+            }
+
+    assert cost_analysis.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_over_sse(engine: Engine) -> None:
+    cost_analysis = CostAnalysis(max_cost=50)
+    app = TartifletteApp(
+        engine=engine,
+        cost_analysis=cost_analysis,
+        subscriptions=Subscriptions(path="/subscriptions", sse_path="/stream"),
+    )
+    async with get_client(app) as client:
+        response = await client.post("/stream", json={"query": EXPENSIVE})
+    assert response.status_code == 200
+    assert "COST_LIMIT_EXCEEDED" in response.text
+    assert cost_analysis.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_in_batch(engine: Engine) -> None:
+    cost_analysis = CostAnalysis(max_cost=10)
+    app = TartifletteApp(
+        engine=engine, cost_analysis=cost_analysis, batching=Batching()
+    )
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json=[{"query": "{ hello }"}, {"query": "{ dogs(first: 100) { id } }"}],
+        )
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first == {"data": {"hello": "Hello stranger"}}
+    assert second["data"] is None
+    assert second["errors"][0]["extensions"] == {"code": "COST_LIMIT_EXCEEDED"}
+
+
+@pytest.mark.asyncio
+async def test_cost_exposed_on_request_state(engine: Engine) -> None:
+    graphql = TartifletteApp(engine=engine, cost_analysis=True, batching=Batching())
+    costs = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await graphql(scope, receive, send)
+        if scope["type"] == "http":
+            costs.append(scope["state"]["query_cost"])
+
+    async with get_client(app) as client:
+        await client.post("/", json={"query": "{ dogs(first: 3) { id } }"})
+        await client.post("/", json=[{"query": "{ hello }"}, {"query": "{ foo }"}])
+
+    assert costs == [4, 2]
@@ -0,0 +1,77 @@
+import pytest
+from tartiflette import Engine, Resolver
+
+from tartiflette_asgi import DocumentCache, TartifletteApp
+
+from ._utils import get_client
+
+SDL = """
+type Query {
+  hello(name: String): String
+}
+"""
+
+
+@Resolver("Query.hello", schema_name="document_cache")
+async def resolve_hello(parent: None, args: dict, context: dict, info: dict) -> str:
+    return "Hello " + args.get("name", "stranger")
+
+
+@pytest.mark.asyncio
+async def test_document_cache() -> None:
+    engine = Engine(sdl=SDL, schema_name="document_cache")
+    cache = DocumentCache(max_size=1)
+    app = TartifletteApp(engine=engine, document_cache=cache)
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ hello }"})
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+        assert (cache.hits, cache.misses, cache.evictions) == (0, 1, 0)
+
+        response = await client.get("/?query={ hello }")
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+
+        response = await client.post(
+            "/",
+            json={
+                "query": "query($name: String) { hello(name: $name) }",
+                "variables": {"name": "world"},
+            },
+        )
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello world"}}
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 1)
+        assert cache.size == 1
+
+
+@pytest.mark.asyncio
+async def test_document_cache_invalid_query() -> None:
+    engine = Engine(sdl=SDL, schema_name="document_cache_invalid")
+    cache = DocumentCache()
+    app = TartifletteApp(engine=engine, document_cache=cache)
+
+    async with get_client(app) as client:
+        for _ in range(2):
+            response = await client.post("/", json={"query": "{ dummy }"})
+            assert response.status_code == 400
+            assert "dummy" in response.json()["errors"][0]["message"]
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_document_cache_cooked_engine() -> None:
+    engine = Engine(sdl=SDL, schema_name="document_cache_cooked")
+    await engine.cook()
+    cache = DocumentCache()
+    app = TartifletteApp(engine=engine, document_cache=cache)
+
+    async with get_client(app) as client:
+        for _ in range(2):
+            response = await client.post("/", json={"query": "{ hello }"})
+            assert response.status_code == 200
+
+    assert (cache.hits, cache.misses) == (1, 1)
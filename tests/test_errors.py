@@ -0,0 +1,49 @@
+import datetime
+import typing
+
+import pytest
+from tartiflette import Engine, TartifletteError
+
+from tartiflette_asgi import TartifletteApp, format_error
+
+from ._utils import get_client
+
+
+def test_format_error_dict() -> None:
+    error = {
+        "message": "Boom",
+        "path": ["dummy"],
+        "locations": [{"line": 1, "column": 3}],
+        "extensions": {"at": datetime.date(2020, 1, 1)},
+    }
+    assert format_error(error) == error
+
+
+def test_format_error_tartiflette_error() -> None:
+    error = TartifletteError("Boom", path=["dummy"], extensions={"code": "BOOM"})
+    assert format_error(error) == {
+        "message": "Boom",
+        "path": ["dummy"],
+        "locations": [],
+        "extensions": {"code": "BOOM"},
+    }
+
+
+@pytest.mark.parametrize("error", [object(), {"path": ["dummy"]}])
+def test_format_error_unknown(error: typing.Any) -> None:
+    assert format_error(error) == {"message": "Internal Server Error"}
+
+
+@pytest.mark.asyncio
+async def test_custom_error_formatter(engine: Engine) -> None:
+    def error_formatter(error: typing.Any) -> dict:
+        return {**format_error(error), "extensions": {"code": "INVALID"}}
+
+    app = TartifletteApp(engine=engine, error_formatter=error_formatter)
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ dummy }"})
+    assert response.status_code == 400
+    error = response.json()["errors"][0]
+    assert "dummy" in error["message"]
+    assert error["path"] == ["dummy"]
+    assert error["extensions"] == {"code": "INVALID"}
@@ -0,0 +1,176 @@
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from tartiflette import Engine
+
+from tartiflette_asgi import TartifletteApp
+
+from ._utils import Dog, PubSub
+
+SUBPROTOCOL = "graphql-transport-ws"
+
+
+@pytest.fixture(name="pubsub", scope="session")
+def fixture_pubsub() -> PubSub:
+    from ._utils import pubsub
+
+    return pubsub
+
+
+@pytest.fixture(name="client")
+def fixture_client(engine: Engine, pubsub: PubSub) -> typing.Iterator[TestClient]:
+    app = TartifletteApp(engine=engine, subscriptions=True, context={"pubsub": pubsub})
+    with TestClient(app) as client:
+        yield client
+
+
+def _init(ws: typing.Any) -> None:
+    ws.send_json({"type": "connection_init"})
+    assert ws.receive_json() == {"type": "connection_ack"}
+
+
+@pytest.mark.parametrize(
+    "subprotocols, expected",
+    [
+        ([SUBPROTOCOL], SUBPROTOCOL),
+        (["unknown", SUBPROTOCOL, "graphql-ws"], SUBPROTOCOL),
+        (["graphql-ws", SUBPROTOCOL], "graphql-ws"),
+        (None, "graphql-ws"),
+    ],
+)
+def test_negotiate_subprotocol(
+    client: typing.Any, subprotocols: typing.Optional[list], expected: str
+) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=subprotocols) as ws:
+        assert ws.accepted_subprotocol == expected
+
+
+def test_ping_pong(client: typing.Any) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        _init(ws)
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        ws.send_json({"type": "pong"})
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+
+@pytest.mark.parametrize(
+    "query, data",
+    [
+        ('query { hello(name: "Alice") }', {"hello": "Hello Alice"}),
+        ("mutation { sleep(seconds: 0) }", {"sleep": 0}),
+    ],
+)
+def test_single_result_operation(client: typing.Any, query: str, data: dict) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        _init(ws)
+        ws.send_json({"type": "subscribe", "id": "1", "payload": {"query": query}})
+        assert ws.receive_json() == {
+            "type": "next",
+            "id": "1",
+            "payload": {"data": data},
+        }
+        assert ws.receive_json() == {"type": "complete", "id": "1"}
+
+
+def test_invalid_operation(client: typing.Any) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        _init(ws)
+        ws.send_json(
+            {"type": "subscribe", "id": "1", "payload": {"query": "{ unknown }"}}
+        )
+        message = ws.receive_json()
+        assert message["type"] == "error"
+        assert message["id"] == "1"
+        assert [error["message"] for error in message["payload"]] == [
+            "Field unknown doesn't exist on Query"
+        ]
+
+
+def test_subscribe(client: typing.Any, pubsub: PubSub) -> None:
+    def _emit(dog: Dog = None) -> None:
+        time.sleep(0.1)
+        pubsub.emit("dog_added", dog)
+
+    gaspar = Dog(id=1, name="Gaspar", nickname="Rapsag")
+
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        _init(ws)
+        ws.send_json(
+            {
+                "type": "subscribe",
+                "id": "dogs",
+                "payload": {"query": "subscription { dogAdded { id name } }"},
+            }
+        )
+
+        _emit(gaspar)
+        assert ws.receive_json() == {
+            "type": "next",
+            "id": "dogs",
+            "payload": {"data": {"dogAdded": {"id": 1, "name": "Gaspar"}}},
+        }
+
+        _emit(None)
+        assert ws.receive_json() == {"type": "complete", "id": "dogs"}
+
+
+@pytest.mark.parametrize(
+    "messages, code, reason",
+    [
+        (
+            [{"type": "subscribe", "id": "1", "payload": {"query": "{ hello }"}}],
+            4401,
+            "Unauthorized",
+        ),
+        (
+            [{"type": "connection_init"}, {"type": "connection_init"}],
+            4429,
+            "Too many initialisation requests",
+        ),
+        (
+            [{"type": "connection_init"}, {"type": "subscribe", "payload": {}}],
+            4400,
+            "Invalid message",
+        ),
+        (
+            [{"type": "connection_init"}, {"type": "start"}],
+            4400,
+            "Unsupported message type: start",
+        ),
+    ],
+)
+def test_protocol_errors(
+    client: typing.Any, messages: typing.List[dict], code: int, reason: str
+) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        for message in messages:
+            ws.send_json(message)
+        if messages[0]["type"] == "connection_init":
+            assert ws.receive_json() == {"type": "connection_ack"}
+        with pytest.raises(WebSocketDisconnect) as ctx:
+            ws.receive_json()
+
+    assert ctx.value.code == code
+    assert ctx.value.reason == reason
+
+
+def test_duplicate_subscriber(client: typing.Any) -> None:
+    with client.websocket_connect("/subscriptions", subprotocols=[SUBPROTOCOL]) as ws:
+        _init(ws)
+        message = {
+            "type": "subscribe",
+            "id": "dogs",
+            "payload": {"query": "subscription { dogAdded { id } }"},
+        }
+        ws.send_json(message)
+        ws.send_json(message)
+        with pytest.raises(WebSocketDisconnect) as ctx:
+            ws.receive_json()
+
+    assert ctx.value.code == 4409
+    assert ctx.value.reason == "Subscriber for dogs already exists"
@@ -0,0 +1,84 @@
+import typing
+
+import pytest
+from starlette.requests import Request
+from tartiflette import Engine
+
+from tartiflette_asgi import CacheControl, TartifletteApp
+
+from ._utils import get_client
+
+
+@pytest.mark.asyncio
+async def test_etag(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, cache_control=True)
+
+    async with get_client(app) as client:
+        response = await client.get("/?query={ hello }")
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+        assert "cache-control" not in response.headers
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+        for if_none_match in (etag, f'"other", W/{etag}', "*"):
+            response = await client.get(
+                "/?query={ hello }", headers={"If-None-Match": if_none_match}
+            )
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+
+        response = await client.get(
+            '/?query={ hello(name: "world") }', headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_cache_control(engine: Engine) -> None:
+    def policy(
+        request: Request, operation_name: typing.Optional[str]
+    ) -> typing.Optional[str]:
+        return "no-store" if operation_name == "Private" else None
+
+    app = TartifletteApp(
+        engine=engine,
+        cache_control=CacheControl(default="public, max-age=60", policy=policy),
+    )
+
+    async with get_client(app) as client:
+        response = await client.get("/?query={ hello }")
+        assert response.headers["cache-control"] == "public, max-age=60"
+
+        response = await client.get("/?query=query Private { whoami: foo }")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.asyncio
+async def test_cache_control_only_for_successful_get_queries(engine: Engine) -> None:
+    app = TartifletteApp(
+        engine=engine, cache_control=CacheControl(default="max-age=60")
+    )
+
+    async with get_client(app) as client:
+        responses = [
+            await client.get("/?query={ dummy }"),
+            await client.get("/?query=mutation { removeDog(id: 1) }"),
+            await client.post("/", json={"query": "{ hello }"}),
+        ]
+
+    for response in responses:
+        assert "cache-control" not in response.headers
+        assert "etag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_disabled_by_default(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    async with get_client(app) as client:
+        response = await client.get("/?query={ hello }")
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
@@ -0,0 +1,102 @@
+import json
+import typing
+
+import pytest
+from tartiflette import Engine
+
+from tartiflette_asgi import TartifletteApp
+
+from ._utils import get_client
+
+ACCEPT = {"accept": "multipart/mixed; deferSpec=20220824, application/json"}
+
+
+def get_parts(body: bytes) -> typing.List[dict]:
+    assert body.endswith(b"\r\n-----\r\n")
+    chunks = body[: -len(b"\r\n-----\r\n")].split(b"\r\n---\r\n")
+    assert chunks[0] == b""
+    parts = []
+    for chunk in chunks[1:]:
+        headers, _, content = chunk.partition(b"\r\n\r\n")
+        assert headers == b"Content-Type: application/json; charset=utf-8"
+        parts.append(json.loads(content))
+    return parts
+
+
+@pytest.mark.asyncio
+async def test_defer(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    query = """
+    query {
+        hello
+        ... @defer(label: "slow") { sleep(seconds: 0.1) }
+        ... @defer { foo }
+        ... on Query @defer(if: false) { bob: hello(name: "Bob") }
+    }
+    """
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": query}, headers=ACCEPT)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == 'multipart/mixed; boundary="-"'
+    assert get_parts(response.content) == [
+        {"data": {"hello": "Hello stranger", "bob": "Hello Bob"}, "hasNext": True},
+        {"incremental": [{"data": {"foo": "default"}, "path": []}], "hasNext": True},
+        {
+            "incremental": [{"data": {"sleep": 0.1}, "path": [], "label": "slow"}],
+            "hasNext": False,
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_defer_named_fragment_with_variables(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    query = """
+    query Greet($name: String, $defer: Boolean) {
+        ...Greeting @defer(label: "greeting", if: $defer)
+    }
+    fragment Greeting on Query { hello(name: $name) }
+    """
+
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json={"query": query, "variables": {"name": "Alice", "defer": True}},
+            headers=ACCEPT,
+        )
+        assert get_parts(response.content) == [
+            {"data": {}, "hasNext": True},
+            {
+                "incremental": [
+                    {
+                        "data": {"hello": "Hello Alice"},
+                        "path": [],
+                        "label": "greeting",
+                    }
+                ],
+                "hasNext": False,
+            },
+        ]
+
+        response = await client.post(
+            "/",
+            json={"query": query, "variables": {"name": "Alice", "defer": False}},
+            headers=ACCEPT,
+        )
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"data": {"hello": "Hello Alice"}}
+
+
+@pytest.mark.asyncio
+async def test_defer_without_multipart_accept(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    query = "{ hello ... @defer { foo } }"
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": query})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"data": {"hello": "Hello stranger", "foo": "default"}}
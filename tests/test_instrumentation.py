@@ -0,0 +1,150 @@
+import re
+import time
+import typing
+
+import pytest
+from starlette.requests import HTTPConnection
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocket
+from tartiflette import Engine
+
+from tartiflette_asgi import Batching, Instrumentation, TartifletteApp
+
+from ._utils import get_client, pubsub
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.events: typing.List[typing.Tuple[str, str]] = []
+        self.durations: typing.Dict[str, float] = {}
+        self.connections: typing.List[HTTPConnection] = []
+
+    def on_start(self, phase: str, conn: HTTPConnection) -> None:
+        self.events.append(("start", phase))
+        self.connections.append(conn)
+
+    def on_end(self, phase: str, duration: float, conn: HTTPConnection) -> None:
+        self.events.append(("end", phase))
+        self.durations[phase] = duration
+
+
+def test_no_hooks_no_tracing() -> None:
+    instrumentation = Instrumentation()
+    assert not instrumentation.trace(typing.cast(HTTPConnection, None)).enabled
+
+
+@pytest.mark.asyncio
+async def test_http_phases(engine: Engine) -> None:
+    recorder = Recorder()
+    instrumentation = Instrumentation(
+        on_start=recorder.on_start, on_end=recorder.on_end
+    )
+    app = TartifletteApp(engine=engine, instrumentation=instrumentation)
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ hello }"})
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert recorder.events == [
+        ("start", "parsing"),
+        ("end", "parsing"),
+        ("start", "validation"),
+        ("end", "validation"),
+        ("start", "execution"),
+        ("end", "execution"),
+        ("start", "encoding"),
+        ("end", "encoding"),
+    ]
+    assert all(duration >= 0 for duration in recorder.durations.values())
+    assert all(conn.url.path == "/" for conn in recorder.connections)
+
+
+@pytest.mark.asyncio
+async def test_server_timing(engine: Engine) -> None:
+    instrumentation = Instrumentation(server_timing=True)
+    app = TartifletteApp(
+        engine=engine, instrumentation=instrumentation, batching=Batching()
+    )
+    pattern = r"^parsing;dur=[\d.]+, validation;dur=[\d.]+, execution;dur=[\d.]+"
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ hello }"})
+        assert response.status_code == 200
+        server_timing = response.headers["server-timing"]
+        assert re.match(pattern + r", encoding;dur=[\d.]+$", server_timing)
+
+        response = await client.post("/", json=[{"query": "{ hello }"}] * 2)
+        assert response.status_code == 200
+        server_timing = response.headers["server-timing"]
+        assert re.match(pattern + r", encoding;dur=[\d.]+$", server_timing)
+
+        response = await client.get("/", params={"query": "{ hello }"})
+        assert response.status_code == 200
+        server_timing = response.headers["server-timing"]
+        assert re.match(r"^validation;dur=[\d.]+, execution", server_timing)
+
+
+def test_websocket_phases(engine: Engine) -> None:
+    recorder = Recorder()
+    instrumentation = Instrumentation(
+        on_start=recorder.on_start, on_end=recorder.on_end
+    )
+    app = TartifletteApp(
+        engine=engine, subscriptions=True, instrumentation=instrumentation
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws"]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json(
+                {"id": "1", "type": "subscribe", "payload": {"query": "{ hello }"}}
+            )
+            assert ws.receive_json()["type"] == "next"
+            assert ws.receive_json() == {"id": "1", "type": "complete"}
+
+    assert recorder.events == [
+        ("start", "validation"),
+        ("end", "validation"),
+        ("start", "execution"),
+        ("end", "execution"),
+    ]
+    assert all(isinstance(conn, WebSocket) for conn in recorder.connections)
+
+
+def test_legacy_websocket_phases(engine: Engine) -> None:
+    recorder = Recorder()
+    instrumentation = Instrumentation(
+        on_start=recorder.on_start, on_end=recorder.on_end
+    )
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=True,
+        context={"pubsub": pubsub},
+        instrumentation=instrumentation,
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json(
+                {
+                    "id": "1",
+                    "type": "start",
+                    "payload": {"query": "subscription { dogAdded { name } }"},
+                }
+            )
+            time.sleep(0.1)
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"id": "1", "type": "complete"}
+
+    assert recorder.events == [
+        ("start", "validation"),
+        ("end", "validation"),
+        ("start", "execution"),
+        ("end", "execution"),
+    ]
@@ -0,0 +1,75 @@
+import json
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import JSONCodec, TartifletteApp
+
+from ._utils import get_client
+
+
+class RecordingCodec(JSONCodec):
+    def __init__(self) -> None:
+        self.dumped: typing.List[typing.Any] = []
+        self.loaded: typing.List[typing.Union[str, bytes]] = []
+        super().__init__(dumps=self._dumps_to_bytes, loads=self._loads)
+
+    def _dumps_to_bytes(self, obj: typing.Any) -> bytes:
+        self.dumped.append(obj)
+        return json.dumps(obj).encode()
+
+    def _loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        self.loaded.append(data)
+        return json.loads(data)
+
+
+def test_default_codec() -> None:
+    codec = JSONCodec()
+    assert codec.encode({"hello": "wörld"}) == '{"hello":"wörld"}'.encode("utf-8")
+    assert codec.encode_text({"hello": "wörld"}) == '{"hello":"wörld"}'
+    assert codec.decode(b'{"hello": "world"}') == {"hello": "world"}
+    with pytest.raises(ValueError):
+        codec.decode("{test")
+
+
+@pytest.mark.asyncio
+async def test_http_json_codec(engine: Engine) -> None:
+    codec = RecordingCodec()
+    app = TartifletteApp(engine=engine, json_codec=codec)
+
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json={
+                "query": "query($name: String) { hello(name: $name) }",
+                "variables": {"name": "world"},
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"data": {"hello": "Hello world"}}
+
+        response = await client.get("/?query={ hello }&variables={test")
+        assert response.status_code == 400
+        assert response.json() == {"error": "Unable to decode variables: Invalid JSON."}
+
+    assert len(codec.loaded) == 2
+    assert codec.dumped == [
+        {"data": {"hello": "Hello world"}},
+        {"error": "Unable to decode variables: Invalid JSON."},
+    ]
+
+
+def test_websocket_json_codec(engine: Engine) -> None:
+    codec = RecordingCodec()
+    app = TartifletteApp(engine=engine, subscriptions=True, json_codec=codec)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+
+    assert codec.loaded == ['{"type":"connection_init"}']
+    assert codec.dumped == [{"type": "connection_ack"}]
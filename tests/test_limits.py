@@ -0,0 +1,197 @@
+import json
+import typing
+
+import pytest
+from asgi_lifespan import LifespanManager
+from starlette.types import Message
+from tartiflette import Engine
+
+from tartiflette_asgi import Batching, Limits, Subscriptions, TartifletteApp
+
+from ._utils import get_client
+
+
+@pytest.mark.asyncio
+async def test_within_limits(engine: Engine) -> None:
+    limits = Limits(max_query_length=64, max_variables_size=64, max_operations=2)
+    app = TartifletteApp(engine=engine, limits=limits, batching=Batching())
+    query = "query($name: String) { hello(name: $name) }"
+    operation = {"query": query, "variables": {"name": "world"}}
+    async with get_client(app) as client:
+        response = await client.post("/", json=operation)
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello world"}}
+
+        response = await client.post("/", json=[operation, operation])
+        assert response.status_code == 200
+
+        response = await client.get(
+            "/", params={"query": query, "variables": '{"name": "world"}'}
+        )
+        assert response.status_code == 200
+
+    assert limits.rejected == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "limits, request_kwargs, error, limit",
+    [
+        pytest.param(
+            Limits(max_body_size=32),
+            {"json": {"query": "{ hello }", "variables": {"name": "x" * 32}}},
+            "Request body is too large.",
+            "body_size",
+            id="body-size-json",
+        ),
+        pytest.param(
+            Limits(max_body_size=4),
+            {
+                "content": "{ hello }",
+                "headers": {"Content-Type": "application/graphql"},
+            },
+            "Request body is too large.",
+            "body_size",
+            id="body-size-graphql",
+        ),
+        pytest.param(
+            Limits(max_query_length=8),
+            {"json": {"query": "{ hello }"}},
+            "Query is too long.",
+            "query_length",
+            id="query-length",
+        ),
+        pytest.param(
+            Limits(max_variables_size=8),
+            {"json": {"query": "{ hello }", "variables": {"name": "world"}}},
+            "Variables are too large.",
+            "variables_size",
+            id="variables-size",
+        ),
+        pytest.param(
+            Limits(max_variables_size=8),
+            {"json": [{"query": "{ hello }", "variables": {"name": "world"}}]},
+            "Variables are too large.",
+            "variables_size",
+            id="variables-size-batch",
+        ),
+        pytest.param(
+            Limits(max_operations=1),
+            {"json": [{"query": "{ hello }"}, {"query": "{ hello }"}]},
+            "Too many operations.",
+            "operations",
+            id="operations",
+        ),
+        pytest.param(
+            Limits(max_query_length=8),
+            {"json": [{"query": "{ hello }"}]},
+            "Query is too long.",
+            "query_length",
+            id="query-length-batch",
+        ),
+    ],
+)
+async def test_limit_exceeded(
+    engine: Engine,
+    limits: Limits,
+    request_kwargs: dict,
+    error: str,
+    limit: str,
+) -> None:
+    app = TartifletteApp(engine=engine, limits=limits, batching=True)
+    async with get_client(app) as client:
+        response = await client.post("/", **request_kwargs)
+    assert response.status_code == 413
+    assert response.json() == {"error": error}
+    assert limits.rejected == 1
+    assert limits.rejections == {limit: 1}
+
+
+@pytest.mark.asyncio
+async def test_get_limit_exceeded(engine: Engine) -> None:
+    limits = Limits(max_query_length=8, max_variables_size=8)
+    app = TartifletteApp(engine=engine, limits=limits)
+    async with get_client(app) as client:
+        response = await client.get("/", params={"query": "{ hello }"})
+        assert response.status_code == 413
+        assert response.json() == {"error": "Query is too long."}
+
+        response = await client.get(
+            "/", params={"query": "{ a }", "variables": '{"name": "world"}'}
+        )
+        assert response.status_code == 413
+        assert response.json() == {"error": "Variables are too large."}
+
+    assert limits.rejections == {"query_length": 1, "variables_size": 1}
+
+
+@pytest.mark.asyncio
+async def test_sse_limit_exceeded(engine: Engine) -> None:
+    limits = Limits(max_query_length=8, max_variables_size=8)
+    app = TartifletteApp(
+        engine=engine,
+        limits=limits,
+        subscriptions=Subscriptions(path="/subscriptions", sse_path="/stream"),
+    )
+    async with get_client(app) as client:
+        response = await client.get("/stream", params={"query": "{ hello }"})
+        assert response.status_code == 413
+        assert response.json() == {"error": "Query is too long."}
+
+        response = await client.get(
+            "/stream", params={"query": "{ a }", "variables": '{"name": "world"}'}
+        )
+        assert response.status_code == 413
+        assert response.json() == {"error": "Variables are too large."}
+
+        response = await client.post(
+            "/stream", json={"query": "{ a }", "variables": {"name": "world"}}
+        )
+        assert response.status_code == 413
+        assert response.json() == {"error": "Variables are too large."}
+
+    assert limits.rejections == {"query_length": 1, "variables_size": 2}
+
+
+@pytest.mark.asyncio
+async def test_body_rejected_while_streaming(engine: Engine) -> None:
+    limits = Limits(max_body_size=1024)
+    app = TartifletteApp(engine=engine, limits=limits)
+    chunk = json.dumps({"query": "{ hello }"}).encode().ljust(512)
+    received = 0
+    sent: typing.List[Message] = []
+
+    async def receive() -> Message:
+        nonlocal received
+        received += 1
+        return {"type": "http.request", "body": chunk, "more_body": received < 100}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "root_path": "",
+        "query_string": b"",
+        # No `Content-Length`, e.g. a chunked request.
+        "headers": [(b"content-type", b"application/json")],
+    }
+
+    async with LifespanManager(app):
+        await app(scope, receive, send)
+
+    assert sent[0]["status"] == 413
+    assert received == 3
+    assert limits.rejections == {"body_size": 1}
+
+
+@pytest.mark.asyncio
+async def test_content_length_rejected_upfront(engine: Engine) -> None:
+    limits = Limits(max_body_size=8)
+    app = TartifletteApp(engine=engine, limits=limits)
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ hello }"})
+    assert response.status_code == 413
+    assert limits.rejections == {"body_size": 1}
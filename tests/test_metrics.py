@@ -0,0 +1,179 @@
+import asyncio
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import (
+    AdmissionControl,
+    Batching,
+    CostAnalysis,
+    Limits,
+    Metrics,
+    Subscriptions,
+    TartifletteApp,
+)
+
+from ._utils import get_client, pubsub
+
+
+def _samples(text: str) -> typing.Dict[str, str]:
+    return dict(
+        line.rsplit(" ", 1)
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    )
+
+
+def test_histogram_buckets() -> None:
+    metrics = Metrics(duration_buckets=[0.1, 1.0], size_buckets=[10])
+    metrics.observe("A", 0.1, 5, error=False)
+    metrics.observe("A", 0.5, 50, error=True)
+    metrics.observe("A", 2.0, None, error=False)
+
+    samples = _samples(metrics.render())
+    label = 'operation_name="A"'
+    assert samples[f"graphql_requests_total{{{label}}}"] == "3"
+    assert samples[f"graphql_errors_total{{{label}}}"] == "1"
+    assert (
+        samples[f'graphql_request_duration_seconds_bucket{{{label},le="0.1"}}'] == "1"
+    )
+    assert (
+        samples[f'graphql_request_duration_seconds_bucket{{{label},le="1.0"}}'] == "2"
+    )
+    assert (
+        samples[f'graphql_request_duration_seconds_bucket{{{label},le="+Inf"}}'] == "3"
+    )
+    assert samples[f"graphql_request_duration_seconds_sum{{{label}}}"] == "2.6"
+    assert samples[f"graphql_request_duration_seconds_count{{{label}}}"] == "3"
+    assert samples[f'graphql_response_size_bytes_bucket{{{label},le="10"}}'] == "1"
+    assert samples[f"graphql_response_size_bytes_count{{{label}}}"] == "2"
+
+
+def test_operation_names_are_bounded() -> None:
+    metrics = Metrics(max_operation_names=2)
+    for name in ("A", "B", "C", 'D"\n', "A"):
+        metrics.observe(name, 0.0, None, error=False)
+    assert metrics.requests == {"A": 2, "B": 1, "__other__": 2}
+
+
+@pytest.mark.asyncio
+async def test_http_metrics(engine: Engine) -> None:
+    metrics = Metrics(namespace="api")
+    app = TartifletteApp(engine=engine, metrics=metrics, batching=Batching())
+
+    async with get_client(app) as client:
+        hello = {"query": "query Hello { hello }", "operationName": "Hello"}
+        response = await client.post("/", json=hello)
+        assert response.status_code == 200
+        response = await client.post("/", json={"query": "{ unknown }"})
+        assert response.status_code == 400
+        response = await client.post("/", json=[hello, {"query": "{ foo }"}])
+        assert response.status_code == 200
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == (
+            "text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    samples = _samples(response.text)
+    assert samples['api_requests_total{operation_name="Hello"}'] == "2"
+    assert samples['api_requests_total{operation_name=""}'] == "2"
+    assert samples['api_errors_total{operation_name=""}'] == "1"
+    assert samples['api_request_duration_seconds_count{operation_name="Hello"}'] == "2"
+    # Response sizes are not known per operation of a batch.
+    assert samples['api_response_size_bytes_count{operation_name="Hello"}'] == "1"
+    assert "api_websocket_connections" not in samples
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_are_observed(engine: Engine) -> None:
+    metrics = Metrics()
+    app = TartifletteApp(
+        engine=engine,
+        metrics=metrics,
+        persisted_queries=True,
+        limits=Limits(max_query_length=32),
+        cost_analysis=CostAnalysis(max_cost=10),
+        admission=AdmissionControl(max_queries=1, max_queue=0),
+    )
+    not_found = {"persistedQuery": {"version": 1, "sha256Hash": "abc"}}
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"extensions": not_found})
+        assert response.status_code == 400
+        response = await client.post("/", json={"operationName": "Missing"})
+        assert response.status_code == 400
+        response = await client.post("/", json={"query": "{ dogs(first: 20) { id } }"})
+        assert response.status_code == 400
+        response = await client.post("/", json={"query": "{ " + "a " * 32 + "}"})
+        assert response.status_code == 413
+
+        async def hello() -> typing.Any:
+            await asyncio.sleep(0.02)
+            return await client.post(
+                "/", json={"query": "query Hello { hello }", "operationName": "Hello"}
+            )
+
+        _, response = await asyncio.gather(
+            client.post("/", json={"query": "{ sleep(seconds: 0.1) }"}), hello()
+        )
+        assert response.status_code == 503
+
+    assert metrics.requests == {"": 4, "Missing": 1, "Hello": 1}
+    assert metrics.errors == {"": 3, "Missing": 1, "Hello": 1}
+
+
+def test_websocket_metrics(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, subscriptions=True, metrics=True)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+
+            samples = _samples(client.get("/metrics").text)
+            assert samples["graphql_websocket_connections"] == "1"
+            assert samples["graphql_websocket_subscriptions"] == "0"
+            assert samples["graphql_websocket_messages_sent_total"] == "1"
+
+        samples = _samples(client.get("/metrics").text)
+        assert samples["graphql_websocket_connections"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_sse_streams_are_counted_apart(engine: Engine) -> None:
+    app = TartifletteApp(
+        engine=engine,
+        metrics=True,
+        subscriptions=Subscriptions(path="/subscriptions", sse_path="/stream"),
+        context={"pubsub": pubsub},
+    )
+
+    async with get_client(app) as client:
+
+        async def scrape() -> typing.Dict[str, str]:
+            await asyncio.sleep(0.1)
+            samples = _samples((await client.get("/metrics")).text)
+            pubsub.emit("dog_added", None)
+            return samples
+
+        response, samples = await asyncio.gather(
+            client.post("/stream", json={"query": "subscription { dogAdded { id } }"}),
+            scrape(),
+        )
+        assert response.status_code == 200
+        assert samples["graphql_websocket_connections"] == "0"
+        assert samples["graphql_sse_streams"] == "1"
+
+        samples = _samples((await client.get("/metrics")).text)
+        assert samples["graphql_sse_streams"] == "0"
+
+
+def test_no_scrape_route(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, metrics=Metrics(path=None))
+    with TestClient(app) as client:  # type: typing.Any
+        response = client.get("/metrics")
+    assert response.status_code == 404
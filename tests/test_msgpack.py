@@ -0,0 +1,106 @@
+import time
+import typing
+
+import msgpack
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import MessagePackCodec, Subscriptions, TartifletteApp
+
+from ._utils import Dog, pubsub
+
+
+def _send(ws: typing.Any, message: dict) -> None:
+    ws.send_bytes(msgpack.packb(message))
+
+
+def _receive(ws: typing.Any) -> dict:
+    return msgpack.unpackb(ws.receive_bytes())
+
+
+def test_codec() -> None:
+    codec = MessagePackCodec()
+    data = codec.encode({"hello": [1, 2.5, "world"]})
+    assert codec.decode(data) == {"hello": [1, 2.5, "world"]}
+    with pytest.raises(ValueError):
+        codec.decode(b"\xc1")
+
+
+@pytest.mark.parametrize("msgpack_enabled", [True, False])
+def test_negotiate_msgpack(engine: Engine, msgpack_enabled: bool) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", msgpack=msgpack_enabled)
+    app = TartifletteApp(engine=engine, subscriptions=subscriptions)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws+msgpack"]
+        ) as ws:
+            if msgpack_enabled:
+                assert ws.accepted_subprotocol == "graphql-transport-ws+msgpack"
+            else:
+                assert ws.accepted_subprotocol == "graphql-ws"
+
+
+def test_msgpack_operation(engine: Engine) -> None:
+    app = TartifletteApp(
+        engine=engine, subscriptions=Subscriptions(path="/subscriptions", msgpack=True)
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws+msgpack"]
+        ) as ws:
+            _send(ws, {"type": "connection_init"})
+            assert _receive(ws) == {"type": "connection_ack"}
+            _send(
+                ws,
+                {"type": "subscribe", "id": "1", "payload": {"query": "{ hello }"}},
+            )
+            assert _receive(ws) == {
+                "type": "next",
+                "id": "1",
+                "payload": {"data": {"hello": "Hello stranger"}},
+            }
+            assert _receive(ws) == {"type": "complete", "id": "1"}
+
+
+def test_msgpack_shared_subscriptions(engine: Engine) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", msgpack=True, shared=True)
+    app = TartifletteApp(
+        engine=engine, subscriptions=subscriptions, context={"pubsub": pubsub}
+    )
+    start = {
+        "type": "start",
+        "id": "dogs",
+        "payload": {"query": "subscription { dogAdded { id name } }"},
+    }
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-ws+msgpack"]
+        ) as ws1, client.websocket_connect("/subscriptions") as ws2:
+            _send(ws1, {"type": "connection_init"})
+            assert _receive(ws1) == {"type": "connection_ack"}
+            _send(ws1, start)
+            ws2.send_json({"type": "connection_init"})
+            assert ws2.receive_json() == {"type": "connection_ack"}
+            ws2.send_json(start)
+            time.sleep(0.1)
+
+            pubsub.emit("dog_added", Dog(id=1, name="Gaspar"))
+            expected = {
+                "type": "data",
+                "id": "dogs",
+                "payload": {"data": {"dogAdded": {"id": 1, "name": "Gaspar"}}},
+            }
+            assert _receive(ws1) == expected
+            assert ws2.receive_json() == expected
+
+            pubsub.emit("dog_added", None)
+            assert _receive(ws1) == {"type": "complete", "id": "dogs"}
+            assert ws2.receive_json() == {"type": "complete", "id": "dogs"}
+
+    # JSON and MessagePack subscribers don't share the same stream.
+    assert subscriptions.shared is not None
+    assert subscriptions.shared.executions == 2
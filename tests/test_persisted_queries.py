@@ -0,0 +1,144 @@
+import hashlib
+import json
+import typing
+
+import pytest
+from tartiflette import Engine
+
+from tartiflette_asgi import (
+    InMemoryPersistedQueryStore,
+    PersistedQueryStore,
+    TartifletteApp,
+)
+
+from ._utils import get_client
+
+QUERY = "{ hello }"
+SHA256_HASH = hashlib.sha256(QUERY.encode()).hexdigest()
+EXTENSIONS = {"persistedQuery": {"version": 1, "sha256Hash": SHA256_HASH}}
+
+
+@pytest.mark.asyncio
+async def test_post_persisted_query(engine: Engine) -> None:
+    store = InMemoryPersistedQueryStore()
+    app = TartifletteApp(engine=engine, persisted_queries=store)
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"extensions": EXTENSIONS})
+        assert response.status_code == 400
+        assert response.json() == {
+            "errors": [
+                {
+                    "message": "PersistedQueryNotFound",
+                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                }
+            ]
+        }
+
+        response = await client.post(
+            "/", json={"query": QUERY, "extensions": EXTENSIONS}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+
+        response = await client.post("/", json={"extensions": EXTENSIONS})
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+
+    assert await store.get(SHA256_HASH) == QUERY
+
+
+@pytest.mark.asyncio
+async def test_get_persisted_query(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, persisted_queries=True)
+    extensions = json.dumps(EXTENSIONS)
+
+    async with get_client(app) as client:
+        response = await client.get("/", params={"extensions": extensions})
+        assert response.status_code == 400
+        assert response.json()["errors"][0]["message"] == "PersistedQueryNotFound"
+
+        response = await client.get(
+            "/", params={"query": QUERY, "extensions": extensions}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+
+        response = await client.get("/", params={"extensions": extensions})
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+
+
+@pytest.mark.asyncio
+async def test_get_persisted_query_invalid_json(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, persisted_queries=True)
+    async with get_client(app) as client:
+        response = await client.get("/?extensions={test")
+    assert response.status_code == 400
+    assert response.json() == {"error": "Unable to decode extensions: Invalid JSON."}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (
+            {"query": "{ foo }", "extensions": EXTENSIONS},
+            "provided sha does not match query",
+        ),
+        (
+            {"extensions": {"persistedQuery": {"version": 2, "sha256Hash": "abc"}}},
+            "Unsupported persisted query version",
+        ),
+        (
+            {"extensions": {"persistedQuery": {"version": 1}}},
+            "Invalid persisted query hash",
+        ),
+    ],
+)
+async def test_persisted_query_bad_request(
+    engine: Engine, body: dict, message: str
+) -> None:
+    app = TartifletteApp(engine=engine, persisted_queries=True)
+    async with get_client(app) as client:
+        response = await client.post("/", json=body)
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": [{"message": message, "extensions": {"code": "BAD_REQUEST"}}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_persisted_queries_disabled(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    async with get_client(app) as client:
+        response = await client.post("/", json={"extensions": EXTENSIONS})
+        assert response.status_code == 400
+        assert response.json()["errors"][0]["extensions"] == {
+            "code": "PERSISTED_QUERY_NOT_SUPPORTED"
+        }
+
+        response = await client.post(
+            "/", json={"query": QUERY, "extensions": EXTENSIONS}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"data": {"hello": "Hello stranger"}}
+
+
+@pytest.mark.asyncio
+async def test_custom_store(engine: Engine) -> None:
+    class DictStore(PersistedQueryStore):
+        def __init__(self) -> None:
+            self.queries: typing.Dict[str, str] = {SHA256_HASH: QUERY}
+
+        async def get(self, sha256_hash: str) -> typing.Optional[str]:
+            return self.queries.get(sha256_hash)
+
+        async def set(self, sha256_hash: str, query: str) -> None:
+            self.queries[sha256_hash] = query
+
+    app = TartifletteApp(engine=engine, persisted_queries=DictStore())
+    async with get_client(app) as client:
+        response = await client.post("/", json={"extensions": EXTENSIONS})
+    assert response.status_code == 200
+    assert response.json() == {"data": {"hello": "Hello stranger"}}
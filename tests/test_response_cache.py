@@ -0,0 +1,166 @@
+import asyncio
+import typing
+
+import pytest
+from starlette.requests import Request
+from tartiflette import Engine
+
+from tartiflette_asgi import InMemoryResponseCacheBackend, ResponseCache, TartifletteApp
+
+from ._utils import Dog, get_client
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        return f"foo-{self.calls}"
+
+
+@pytest.mark.asyncio
+async def test_response_cache(engine: Engine) -> None:
+    cache = ResponseCache()
+    get_foo = Counter()
+    app = TartifletteApp(
+        engine=engine, context={"get_foo": get_foo}, response_cache=cache
+    )
+
+    async with get_client(app) as client:
+        for query in ("{ foo }", "{foo}", "{\n  foo,\n}  # Comment"):
+            response = await client.post("/", json={"query": query})
+            assert response.status_code == 200
+            assert response.json() == {"data": {"foo": "foo-1"}}
+
+        response = await client.post(
+            "/", json={"query": "query Foo { foo }", "operationName": "Foo"}
+        )
+        assert response.json() == {"data": {"foo": "foo-2"}}
+
+    assert get_foo.calls == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_response_cache_ttl(engine: Engine) -> None:
+    get_foo = Counter()
+    app = TartifletteApp(
+        engine=engine,
+        context={"get_foo": get_foo},
+        response_cache=ResponseCache(ttl=0.05),
+    )
+
+    async with get_client(app) as client:
+        response = await client.get("/?query={ foo }")
+        assert response.json() == {"data": {"foo": "foo-1"}}
+        await asyncio.sleep(0.1)
+        response = await client.get("/?query={ foo }")
+        assert response.json() == {"data": {"foo": "foo-2"}}
+
+
+@pytest.mark.asyncio
+async def test_response_cache_scope_key(engine: Engine) -> None:
+    def scope_key(request: Request) -> typing.Optional[str]:
+        return request.headers.get("authorization")
+
+    get_foo = Counter()
+    app = TartifletteApp(
+        engine=engine,
+        context={"get_foo": get_foo},
+        response_cache=ResponseCache(scope_key=scope_key),
+    )
+
+    async with get_client(app) as client:
+        for authorization in ("Bearer 1", "Bearer 2", "Bearer 1"):
+            await client.get(
+                "/?query={ foo }", headers={"authorization": authorization}
+            )
+
+    assert get_foo.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_errors_and_mutations(engine: Engine) -> None:
+    cache = ResponseCache()
+    app = TartifletteApp(engine=engine, response_cache=cache)
+
+    async with get_client(app) as client:
+        for _ in range(2):
+            response = await client.post("/", json={"query": "{ dummy }"})
+            assert response.status_code == 400
+            response = await client.post(
+                "/", json={"query": "mutation { removeDog(id: 1) }"}
+            )
+            assert response.status_code == 200
+
+    assert cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidation(engine: Engine) -> None:
+    dogs = {1: Dog(id=1, name="Gaspar"), 2: Dog(id=2, name="Merrygold")}
+    cache = ResponseCache(backend=InMemoryResponseCacheBackend(max_size=10))
+    app = TartifletteApp(engine=engine, context={"dogs": dogs}, response_cache=cache)
+
+    query = "query($id: Int!) { dog(id: $id) { name } }"
+
+    async with get_client(app) as client:
+        for id in (1, 2):
+            response = await client.post(
+                "/", json={"query": query, "variables": {"id": id}}
+            )
+            assert response.json()["data"]["dog"] is not None
+
+        # Cached responses are served until their tags are invalidated.
+        dogs.pop(2)
+        response = await client.post("/", json={"query": query, "variables": {"id": 2}})
+        assert response.json() == {"data": {"dog": {"name": "Merrygold"}}}
+        await cache.invalidate("Dog:2")
+        response = await client.post("/", json={"query": query, "variables": {"id": 2}})
+        assert response.json() == {"data": {"dog": None}}
+
+        # Resolvers can invalidate tags via the GraphQL context.
+        response = await client.post(
+            "/", json={"query": "mutation { removeDog(id: 1) }"}
+        )
+        assert response.json() == {"data": {"removeDog": True}}
+        response = await client.post("/", json={"query": query, "variables": {"id": 1}})
+        assert response.json() == {"data": {"dog": None}}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_eviction() -> None:
+    backend = InMemoryResponseCacheBackend(max_size=1)
+    await backend.set("a", b"A", ttl=60, tags={"tag"})
+    await backend.set("b", b"B", ttl=60, tags={"tag"})
+    assert len(backend) == 1
+    assert backend.evictions == 1
+    assert await backend.get("a") is None
+    assert await backend.get("b") == b"B"
+    await backend.invalidate(["tag"])
+    assert await backend.get("b") is None
+    assert len(backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_response_cache_credentials_require_scope_key(engine: Engine) -> None:
+    cache = ResponseCache()
+    get_foo = Counter()
+    app = TartifletteApp(
+        engine=engine, context={"get_foo": get_foo}, response_cache=cache
+    )
+
+    async with get_client(app) as client:
+        for _ in range(2):
+            await client.get("/?query={ foo }", cookies={"session": "secret"})
+
+    assert get_foo.calls == 2
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_response_cache_unserializable_variables() -> None:
+    cache = ResponseCache()
+    request = Request({"type": "http", "headers": []})
+    variables = {"file": object()}
+    assert cache.get_key(request, "{ foo }", variables, None) is None
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import (
+    Backpressure,
+    SharedSubscriptions,
+    Subscriptions,
+    TartifletteApp,
+)
+
+from ._utils import Dog, pubsub
+
+
+@pytest.mark.asyncio
+async def test_shared_source_is_reference_counted() -> None:
+    shared = SharedSubscriptions()
+    events: typing.List[str] = []
+
+    async def source() -> typing.AsyncGenerator[dict, None]:
+        events.append("start")
+        try:
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                yield {"count": i}
+        finally:
+            events.append("stop")
+
+    first = shared.subscribe("key", source, encode=json.dumps)
+    second = shared.subscribe("key", source, encode=json.dumps)
+
+    assert await first.__anext__() == '{"count": 0}'
+    assert await second.__anext__() == '{"count": 1}'
+    assert shared.executions == 1
+    assert shared.saved == 1
+    assert shared.streams == 1
+    assert shared.subscribers == 2
+
+    await first.aclose()
+    assert shared.subscribers == 1
+    assert await second.__anext__() == '{"count": 2}'
+
+    await second.aclose()
+    await asyncio.sleep(0.01)
+    assert shared.streams == 0
+    assert events == ["start", "stop"]
+
+
+@pytest.mark.asyncio
+async def test_shared_source_errors_are_broadcast() -> None:
+    shared = SharedSubscriptions()
+
+    async def source() -> typing.AsyncGenerator[dict, None]:
+        yield {"ok": True}
+        raise ValueError("Oops")
+
+    subscribers = [shared.subscribe("key", source, encode=json.dumps) for _ in range(2)]
+    for subscriber in subscribers:
+        with pytest.raises(ValueError):
+            async for _ in subscriber:
+                pass
+    assert shared.streams == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow, disconnected",
+    [(Backpressure.DROP_OLDEST, False), (Backpressure.DISCONNECT, True)],
+)
+async def test_stalled_subscriber(overflow: str, disconnected: bool) -> None:
+    shared = SharedSubscriptions(max_size=5, overflow=overflow)
+    ready = asyncio.Event()
+    overflows: typing.List[str] = []
+
+    async def source() -> typing.AsyncGenerator[dict, None]:
+        await ready.wait()
+        for i in range(50):
+            await asyncio.sleep(0)
+            yield {"count": i}
+
+    fast = shared.subscribe("key", source, encode=json.dumps)
+    stalled = shared.subscribe(
+        "key", source, encode=json.dumps, on_overflow=lambda: overflows.append("x")
+    )
+
+    async def consume() -> typing.List[str]:
+        return [item async for item in fast]
+
+    consumer = asyncio.ensure_future(consume())
+    # Subscribe, but never read.
+    pending = asyncio.ensure_future(stalled.__anext__())
+    await asyncio.sleep(0)
+    ready.set()
+
+    assert len(await consumer) == 50
+    assert pending.done()
+    # Events pending for the stalled subscriber are bounded.
+    assert shared.backpressure.depth <= 5
+    assert shared.backpressure.dropped > 0
+    assert shared.backpressure.disconnects == len(overflows)
+    assert overflows == (["x"] if disconnected else [])
+    await stalled.aclose()
+    assert shared.backpressure.depth == 0
+
+
+@pytest.mark.parametrize("subprotocol", ["graphql-ws", "graphql-transport-ws"])
+def test_shared_subscriptions(engine: Engine, subprotocol: str) -> None:
+    shared = SharedSubscriptions()
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(path="/subscriptions", shared=shared),
+        context={"pubsub": pubsub},
+    )
+    start = "start" if subprotocol == "graphql-ws" else "subscribe"
+    data = "data" if subprotocol == "graphql-ws" else "next"
+    query = "subscription { dogAdded { id name } }"
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws1, client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws2:
+            for ws in (ws1, ws2):
+                ws.send_json({"type": "connection_init"})
+                assert ws.receive_json() == {"type": "connection_ack"}
+                ws.send_json({"type": start, "id": "dogs", "payload": {"query": query}})
+
+            time.sleep(0.1)
+            assert shared.executions == 1
+            assert shared.subscribers == 2
+
+            pubsub.emit("dog_added", Dog(id=1, name="Gaspar"))
+            for ws in (ws1, ws2):
+                assert ws.receive_json() == {
+                    "type": data,
+                    "id": "dogs",
+                    "payload": {"data": {"dogAdded": {"id": 1, "name": "Gaspar"}}},
+                }
+
+            pubsub.emit("dog_added", None)
+            for ws in (ws1, ws2):
+                assert ws.receive_json() == {"type": "complete", "id": "dogs"}
+
+    assert shared.streams == 0
+
+
+@pytest.mark.parametrize(
+    "subprotocol, start, stop",
+    [
+        ("graphql-ws", "start", "stop"),
+        ("graphql-transport-ws", "subscribe", "complete"),
+    ],
+)
+def test_shared_source_is_closed_when_all_stop(
+    engine: Engine, subprotocol: str, start: str, stop: str
+) -> None:
+    shared = SharedSubscriptions()
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(path="/subscriptions", shared=shared),
+        context={"pubsub": pubsub},
+    )
+    query = "subscription { dogAdded { id name } }"
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws1, client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws2:
+            for ws in (ws1, ws2):
+                ws.send_json({"type": "connection_init"})
+                assert ws.receive_json() == {"type": "connection_ack"}
+                ws.send_json({"type": start, "id": "dogs", "payload": {"query": query}})
+
+            time.sleep(0.1)
+            assert shared.subscribers == 2
+            [stream] = shared._streams.values()
+
+            ws1.send_json({"type": stop, "id": "dogs"})
+            time.sleep(0.1)
+            assert shared.subscribers == 1
+            assert shared.streams == 1
+
+            ws2.send_json({"type": stop, "id": "dogs"})
+            time.sleep(0.1)
+            assert shared.streams == 0
+            assert stream.task is not None and stream.task.done()
+            # The upstream generator was closed.
+            assert stream.agen.ag_frame is None  # type: ignore
+
+
+def test_credentials_require_scope_key(engine: Engine) -> None:
+    shared = SharedSubscriptions()
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(path="/subscriptions", shared=shared),
+        context={"pubsub": pubsub},
+    )
+    query = "subscription { dogAdded { id name } }"
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions",
+            subprotocols=["graphql-transport-ws"],
+            headers={"authorization": "Bearer 123"},
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"type": "subscribe", "id": "1", "payload": {"query": query}})
+            time.sleep(0.1)
+            assert shared.executions == 0
+            assert shared.streams == 0
+
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"type": "complete", "id": "1"}
@@ -0,0 +1,159 @@
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import (
+    Batching,
+    InMemorySlowOperationSink,
+    SlowOperationLog,
+    TartifletteApp,
+)
+
+from ._utils import Dog, get_client
+
+DOGS = {1: Dog(id=1, name="Rex"), 2: Dog(id=2, name="Fido")}
+
+
+@pytest.mark.asyncio
+async def test_slow_operations_are_recorded(engine: Engine) -> None:
+    sink = InMemorySlowOperationSink()
+    slow_log = SlowOperationLog(threshold=0, sink=sink)
+    app = TartifletteApp(engine=engine, slow_log=slow_log)
+
+    query = "query Hello($name: String) {\n  hello(name: $name)\n}"
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json={
+                "query": query,
+                "variables": {"name": "secret"},
+                "operationName": "Hello",
+            },
+        )
+
+    assert response.status_code == 200
+    assert slow_log.recorded == 1
+    [record] = sink.records
+    assert record.document == "query Hello($name:String){hello(name:$name)}"
+    assert record.operation_name == "Hello"
+    assert record.variables == {"name": "str"}
+    assert record.duration >= 0
+    assert record.resolvers == []
+    assert not record.sampled
+
+
+@pytest.mark.asyncio
+async def test_fast_operations_are_not_recorded(engine: Engine) -> None:
+    slow_log = SlowOperationLog(threshold=60)
+    app = TartifletteApp(engine=engine, slow_log=slow_log)
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ hello }"})
+
+    assert response.status_code == 200
+    assert slow_log.recorded == 0
+    assert len(typing.cast(InMemorySlowOperationSink, slow_log.sink)) == 0
+
+
+@pytest.mark.asyncio
+async def test_sampled_operations_are_traced(engine: Engine) -> None:
+    sink = InMemorySlowOperationSink(max_size=2)
+    slow_log = SlowOperationLog(threshold=60, sample_rate=1, sink=sink)
+    app = TartifletteApp(engine=engine, slow_log=slow_log, batching=Batching())
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ dogs(first: 2) { name } }"})
+        assert response.status_code == 200
+        response = await client.post("/", json=[{"query": "{ hello }"}] * 2)
+        assert response.status_code == 200
+
+    # Records are kept in a ring buffer.
+    assert slow_log.recorded == 3
+    assert len(sink) == 2
+    record = sink.records[0]
+    assert record.sampled
+    assert [timing.field for timing in record.resolvers] == ["Query.hello"]
+    assert record.resolvers[0].path == "hello"
+
+
+@pytest.mark.asyncio
+async def test_resolver_paths(engine: Engine) -> None:
+    sink = InMemorySlowOperationSink()
+    slow_log = SlowOperationLog(threshold=0, sink=sink, trace_resolvers=True)
+    app = TartifletteApp(engine=engine, context={"dogs": DOGS}, slow_log=slow_log)
+
+    async with get_client(app) as client:
+        response = await client.post("/", json={"query": "{ dogs(first: 2) { name } }"})
+
+    assert response.status_code == 200
+    [record] = sink.records
+    paths = {timing.path: timing.field for timing in record.resolvers}
+    assert paths == {
+        "dogs": "Query.dogs",
+        "dogs.0.name": "Dog.name",
+        "dogs.1.name": "Dog.name",
+    }
+    assert all(timing.duration >= 0 for timing in record.resolvers)
+
+
+def test_variables_shape() -> None:
+    from tartiflette_asgi._slow_log import get_variables_shape
+
+    variables = {"id": 1, "input": {"tags": ["a", "b"], "note": None}, "ok": True}
+    assert get_variables_shape(variables) == {
+        "id": "int",
+        "input": {"tags": ["str"], "note": None},
+        "ok": "bool",
+    }
+
+
+@pytest.mark.parametrize(
+    "subprotocol, start, data",
+    [("graphql-ws", "start", "data"), ("graphql-transport-ws", "subscribe", "next")],
+)
+def test_websocket_operations(
+    engine: Engine, subprotocol: str, start: str, data: str
+) -> None:
+    sink = InMemorySlowOperationSink()
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=True,
+        slow_log=SlowOperationLog(threshold=0, sink=sink),
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json({"id": "1", "type": start, "payload": {"query": "{ hello }"}})
+            assert ws.receive_json()["type"] == data
+            assert ws.receive_json() == {"id": "1", "type": "complete"}
+
+    [record] = sink.records
+    assert record.document == "{hello}"
+
+
+@pytest.mark.asyncio
+async def test_incremental_operations(engine: Engine) -> None:
+    sink = InMemorySlowOperationSink()
+    slow_log = SlowOperationLog(threshold=0.05, sink=sink, trace_resolvers=True)
+    app = TartifletteApp(engine=engine, slow_log=slow_log)
+
+    query = "{ hello ... @defer { sleep(seconds: 0.1) } }"
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            json={"query": query},
+            headers={"accept": "multipart/mixed; deferSpec=20220824"},
+        )
+
+    assert response.status_code == 200
+    [record] = sink.records
+    assert record.document == "{hello...@defer{sleep(seconds:0.1)}}"
+    assert record.duration >= 0.1
+    fields = sorted(timing.field for timing in record.resolvers)
+    assert fields == ["Query.hello", "Query.sleep"]
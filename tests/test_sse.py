@@ -0,0 +1,87 @@
+import asyncio
+import typing
+
+import pytest
+from tartiflette import Engine
+
+from tartiflette_asgi import Subscriptions, TartifletteApp
+
+from ._utils import Dog, get_client, pubsub
+
+
+@pytest.fixture(name="app")
+def fixture_app(engine: Engine) -> TartifletteApp:
+    return TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(path="/subscriptions", sse_path="/stream"),
+        context={"pubsub": pubsub},
+    )
+
+
+def get_events(body: str) -> typing.List[typing.Tuple[str, str]]:
+    events = []
+    for chunk in body.split("\n\n")[:-1]:
+        fields = dict(line.split(":", 1) for line in chunk.splitlines())
+        events.append((fields["event"].strip(), fields["data"].strip()))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_query(app: TartifletteApp) -> None:
+    async with get_client(app) as client:
+        response = await client.get("/stream", params={"query": "{ hello }"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert get_events(response.text) == [
+        ("next", '{"data":{"hello":"Hello stranger"}}'),
+        ("complete", ""),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscription(app: TartifletteApp) -> None:
+    loop = asyncio.get_event_loop()
+    loop.call_later(0.1, pubsub.emit, "dog_added", Dog(id=1, name="Gaspar"))
+    loop.call_later(0.2, pubsub.emit, "dog_added", None)
+
+    async with get_client(app) as client:
+        response = await client.post(
+            "/stream", json={"query": "subscription { dogAdded { id name } }"}
+        )
+
+    assert response.status_code == 200
+    assert get_events(response.text) == [
+        ("next", '{"data":{"dogAdded":{"id":1,"name":"Gaspar"}}}'),
+        ("complete", ""),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_operation(app: TartifletteApp) -> None:
+    async with get_client(app) as client:
+        response = await client.post("/stream", json={"query": "{ unknown }"})
+
+    assert response.status_code == 200
+    events = get_events(response.text)
+    assert [event for event, _ in events] == ["next", "complete"]
+    assert '"Field unknown doesn\'t exist on Query"' in events[0][1]
+
+
+@pytest.mark.asyncio
+async def test_missing_query(app: TartifletteApp) -> None:
+    async with get_client(app) as client:
+        response = await client.post("/stream", json={})
+
+    assert response.status_code == 400
+    assert response.text == "No GraphQL query found in the request"
+
+
+@pytest.mark.asyncio
+async def test_sse_disabled(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, subscriptions=True)
+    async with get_client(app) as client:
+        response = await client.get("/stream", params={"query": "{ hello }"})
+
+    assert response.status_code == 404
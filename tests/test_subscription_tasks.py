@@ -0,0 +1,144 @@
+import asyncio
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import Subscriptions, TartifletteApp
+from tartiflette_asgi._subscriptions.tasks import TaskRegistry
+
+from ._utils import pubsub
+
+
+def _wait_for(predicate: typing.Callable[[], bool]) -> None:
+    for _ in range(100):
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("Timed out")  # pragma: no cover
+
+
+@pytest.mark.asyncio
+async def test_task_registry() -> None:
+    errors: typing.List[BaseException] = []
+    registry = TaskRegistry(on_error=errors.append)
+
+    async def fail() -> None:
+        raise ValueError("Oops")
+
+    async def sleep() -> None:
+        await asyncio.sleep(10)
+
+    tasks = [registry.spawn(asyncio.sleep(0)), registry.spawn(fail())]
+    sleeper = registry.spawn(sleep())
+    assert len(registry) == 3
+
+    await asyncio.wait(tasks)
+    await asyncio.sleep(0)
+    assert list(registry) == [sleeper]
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+    assert list(registry.errors) == errors
+
+    registry.cancel()
+    await asyncio.wait([sleeper])
+    assert len(registry) == 0
+    assert len(errors) == 1
+
+
+def test_finished_tasks_are_dropped(engine: Engine) -> None:
+    subscriptions = Subscriptions(path="/subscriptions")
+    app = TartifletteApp(engine=engine, subscriptions=subscriptions)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            assert subscriptions.connections == 1
+            for _ in range(10):
+                ws.send_json({"type": "connection_init"})
+                assert ws.receive_json() == {"type": "connection_ack"}
+                ws.send_json({"type": "stop", "id": "unknown"})
+            _wait_for(lambda: subscriptions.tasks == 0)
+
+    _wait_for(lambda: subscriptions.connections == 0)
+    assert subscriptions.task_errors == 0
+
+
+@pytest.mark.parametrize(
+    "subprotocol, start, error",
+    [
+        (
+            "graphql-ws",
+            "start",
+            {"type": "error", "id": "2", "payload": {"message": "Too many operations"}},
+        ),
+        (
+            "graphql-transport-ws",
+            "subscribe",
+            {
+                "type": "error",
+                "id": "2",
+                "payload": [{"message": "Too many operations"}],
+            },
+        ),
+    ],
+)
+def test_max_operations(
+    engine: Engine, subprotocol: str, start: str, error: dict
+) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", max_operations=1)
+    app = TartifletteApp(
+        engine=engine, subscriptions=subscriptions, context={"pubsub": pubsub}
+    )
+    query = "subscription { dogAdded { id } }"
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            for opid in ("1", "2"):
+                ws.send_json({"type": start, "id": opid, "payload": {"query": query}})
+            assert ws.receive_json() == error
+            assert subscriptions.operations == 1
+            assert subscriptions.tasks == 1
+
+
+@pytest.mark.parametrize(
+    "subprotocol, start, stop, complete",
+    [
+        ("graphql-ws", "start", "stop", {"type": "complete", "id": "1"}),
+        ("graphql-transport-ws", "subscribe", "complete", None),
+    ],
+)
+def test_stopped_subscriptions_are_cancelled(
+    engine: Engine,
+    subprotocol: str,
+    start: str,
+    stop: str,
+    complete: typing.Optional[dict],
+) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", max_operations=1)
+    app = TartifletteApp(
+        engine=engine, subscriptions=subscriptions, context={"pubsub": pubsub}
+    )
+    # NOTE: no events are emitted, so the subscription never yields.
+    query = "subscription { dogAdded { id } }"
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            for _ in range(20):
+                ws.send_json({"type": start, "id": "1", "payload": {"query": query}})
+                _wait_for(lambda: subscriptions.operations == 1)
+                ws.send_json({"type": stop, "id": "1"})
+                if complete is not None:
+                    assert ws.receive_json() == complete
+                _wait_for(lambda: subscriptions.tasks == 0)
+                assert subscriptions.operations == 0
+
+    assert subscriptions.task_errors == 0
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import typing
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from tartiflette import Engine
+
+from tartiflette_asgi import Subscriptions, TartifletteApp
+from tartiflette_asgi._timers import TimerWheel
+
+from ._utils import pubsub
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel() -> None:
+    wheel = TimerWheel(resolution=0.01, size=4)
+    fired: typing.List[str] = []
+
+    wheel.call_later(0.1, lambda: fired.append("late"))
+    wheel.call_later(0.02, lambda: fired.append("early"))
+    cancelled = wheel.call_later(0.03, lambda: fired.append("cancelled"))
+    assert len(wheel) == 3
+
+    cancelled.cancel()
+    assert len(wheel) == 2
+
+    await asyncio.sleep(0.05)
+    assert fired == ["early"]
+
+    await asyncio.sleep(0.1)
+    assert fired == ["early", "late"]
+    assert len(wheel) == 0
+
+
+@pytest.mark.parametrize(
+    "subprotocol, keep_alive",
+    [("graphql-ws", {"type": "ka"}), ("graphql-transport-ws", {"type": "ping"})],
+)
+def test_keep_alive(engine: Engine, subprotocol: str, keep_alive: dict) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", keep_alive_interval=0.05)
+    app = TartifletteApp(engine=engine, subscriptions=subscriptions)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            assert ws.receive_json() == keep_alive
+            assert ws.receive_json() == keep_alive
+
+
+@pytest.mark.parametrize("subprotocol", ["graphql-ws", "graphql-transport-ws"])
+def test_close_uninitialized_connection(engine: Engine, subprotocol: str) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", idle_timeout=0.05)
+    app = TartifletteApp(engine=engine, subscriptions=subscriptions)
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=[subprotocol]
+        ) as ws:
+            with pytest.raises(WebSocketDisconnect) as ctx:
+                ws.receive_json()
+
+    assert ctx.value.code == 4408
+    assert ctx.value.reason == "Connection initialisation timeout"
+    assert subscriptions.idle_closed == 1
+
+
+def test_close_idle_connection(engine: Engine) -> None:
+    subscriptions = Subscriptions(path="/subscriptions", idle_timeout=0.1)
+    app = TartifletteApp(
+        engine=engine, subscriptions=subscriptions, context={"pubsub": pubsub}
+    )
+
+    with TestClient(app) as client:  # type: typing.Any
+        with client.websocket_connect("/subscriptions") as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+            ws.send_json(
+                {
+                    "type": "start",
+                    "id": "dogs",
+                    "payload": {"query": "subscription { dogAdded { id } }"},
+                }
+            )
+
+            # Connections with running operations are not idle.
+            time.sleep(0.3)
+            assert subscriptions.idle_closed == 0
+
+            pubsub.emit("dog_added", None)
+            assert ws.receive_json() == {"type": "complete", "id": "dogs"}
+
+            with pytest.raises(WebSocketDisconnect) as ctx:
+                ws.receive_json()
+
+    assert ctx.value.code == 1000
+    assert ctx.value.reason == "Idle timeout"
+    assert subscriptions.idle_closed == 1
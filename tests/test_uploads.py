@@ -0,0 +1,240 @@
+import inspect
+import json
+import typing
+
+import pytest
+from starlette.formparsers import MultiPartParser
+from starlette.requests import Request
+from tartiflette import Engine
+
+from tartiflette_asgi import Batching, TartifletteApp, Uploads
+from tartiflette_asgi._json import JSONCodec
+from tartiflette_asgi._uploads import UploadError
+
+from ._utils import get_client
+
+# NOTE: uploads require a Starlette version whose parser limits the number of files.
+pytestmark = pytest.mark.skipif(
+    "max_files" not in inspect.signature(MultiPartParser).parameters,
+    reason="Starlette is too old",
+)
+
+UPLOAD = "mutation($file: Upload!) { upload(file: $file) }"
+UPLOAD_MANY = "mutation($files: [Upload!]!) { uploadMany(files: $files) }"
+
+
+def _form(operations: object, mapping: dict) -> dict:
+    return {"operations": json.dumps(operations), "map": json.dumps(mapping)}
+
+
+@pytest.mark.asyncio
+async def test_uploads_disabled(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form({"query": UPLOAD, "variables": {"file": None}}, {"0": []}),
+            files={"0": ("a.txt", b"hello")},
+        )
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_upload(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, uploads=True)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form(
+                {"query": UPLOAD, "variables": {"file": None}},
+                {"0": ["variables.file"]},
+            ),
+            files={"0": ("a.txt", b"hello")},
+        )
+    assert response.status_code == 200
+    assert response.json() == {"data": {"upload": "a.txt:hello"}}
+
+
+@pytest.mark.asyncio
+async def test_upload_many(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, uploads=True)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form(
+                {"query": UPLOAD_MANY, "variables": {"files": [None, None]}},
+                {"0": ["variables.files.0"], "1": ["variables.files.1"]},
+            ),
+            files={"0": ("a.txt", b"hello"), "1": ("b.txt", b"world")},
+        )
+    assert response.status_code == 200
+    assert response.json() == {"data": {"uploadMany": ["a.txt:hello", "b.txt:world"]}}
+
+
+@pytest.mark.asyncio
+async def test_upload_batch(engine: Engine) -> None:
+    app = TartifletteApp(engine=engine, uploads=True, batching=Batching())
+    operations = [
+        {"query": UPLOAD, "variables": {"file": None}},
+        {"query": UPLOAD, "variables": {"file": None}},
+    ]
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form(operations, {"0": ["0.variables.file", "1.variables.file"]}),
+            files={"0": ("a.txt", b"hello")},
+        )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"data": {"upload": "a.txt:hello"}},
+        # The file was already read by the first operation.
+        {"data": {"upload": "a.txt:"}},
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "uploads, files",
+    [
+        (Uploads(max_file_size=4), {"0": ("a.txt", b"hello")}),
+        (Uploads(max_total_size=64), {"0": ("a.txt", b"hello" * 100)}),
+    ],
+)
+async def test_upload_too_large(engine: Engine, uploads: Uploads, files: dict) -> None:
+    app = TartifletteApp(engine=engine, uploads=uploads)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form(
+                {"query": UPLOAD, "variables": {"file": None}},
+                {"0": ["variables.file"]},
+            ),
+            files=files,
+        )
+    assert response.status_code == 413
+    assert uploads.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_file_size_is_checked_while_streaming() -> None:
+    uploads = Uploads(max_file_size=1024)
+    boundary = "boundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="0"; filename="a.txt"\r\n'
+        "\r\n" + "x" * 100 * 1024 + f"\r\n--{boundary}--\r\n"
+    ).encode()
+    chunks = [body[index : index + 512] for index in range(0, len(body), 512)]
+    received = 0
+
+    async def receive() -> dict:
+        nonlocal received
+        received += 1
+        return {
+            "type": "http.request",
+            "body": chunks[received - 1],
+            "more_body": received < len(chunks),
+        }
+
+    scope: typing.Any = {
+        "type": "http",
+        "method": "POST",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={boundary}".encode())
+        ],
+    }
+
+    with pytest.raises(UploadError) as ctx:
+        await uploads.parse(Request(scope, receive), JSONCodec())
+
+    assert ctx.value.status_code == 413
+    assert ctx.value.message == "File '0' is too large."
+    # The rest of the body was not read.
+    assert received < len(chunks) / 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size, too_large", [(1024, False), (1025, True)])
+async def test_file_size_limit_across_chunks(size: int, too_large: bool) -> None:
+    uploads = Uploads(max_file_size=1024)
+    boundary = "boundary"
+    operations = json.dumps({"query": UPLOAD, "variables": {"file": None}})
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="operations"\r\n'
+        f"\r\n{operations}\r\n--{boundary}\r\n"
+        'Content-Disposition: form-data; name="map"\r\n'
+        f'\r\n{{"0": ["variables.file"]}}\r\n--{boundary}\r\n'
+        'Content-Disposition: form-data; name="0"; filename="a.txt"\r\n'
+        "\r\n" + "x" * size + f"\r\n--{boundary}--\r\n"
+    ).encode()
+    # Delimiters are split across chunks.
+    chunks = [body[index : index + 7] for index in range(0, len(body), 7)]
+
+    async def receive() -> dict:
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope: typing.Any = {
+        "type": "http",
+        "method": "POST",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={boundary}".encode())
+        ],
+    }
+
+    if too_large:
+        with pytest.raises(UploadError) as ctx:
+            await uploads.parse(Request(scope, receive), JSONCodec())
+        assert ctx.value.status_code == 413
+        assert ctx.value.message == "File '0' is too large."
+    else:
+        operations, files = await uploads.parse(Request(scope, receive), JSONCodec())
+        assert operations["variables"]["file"] is files[0]
+        assert await files[0].read() == b"x" * size
+        await files[0].close()
+
+
+@pytest.mark.asyncio
+async def test_upload_too_many_files(engine: Engine) -> None:
+    uploads = Uploads(max_files=1)
+    app = TartifletteApp(engine=engine, uploads=uploads)
+    async with get_client(app) as client:
+        response = await client.post(
+            "/",
+            data=_form(
+                {"query": UPLOAD_MANY, "variables": {"files": [None, None]}},
+                {"0": ["variables.files.0"], "1": ["variables.files.1"]},
+            ),
+            files={"0": ("a.txt", b"hello"), "1": ("b.txt", b"world")},
+        )
+    assert response.status_code == 400
+    assert uploads.rejected == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        ({"map": "{}"}, "Missing `operations` field."),
+        (
+            {"operations": "{", "map": "{}"},
+            "Unable to decode `operations`: Invalid JSON.",
+        ),
+        ({"operations": "{}", "map": "[]"}, "Invalid `map` field."),
+        (
+            _form({"query": UPLOAD, "variables": {}}, {"0": ["variables.file"]}),
+            "Invalid file path 'variables.file'.",
+        ),
+        (
+            _form({"query": UPLOAD, "variables": {"file": None}}, {"1": ["x"]}),
+            "File missing for map entry '1'.",
+        ),
+    ],
+)
+async def test_invalid_upload_request(engine: Engine, data: dict, error: str) -> None:
+    app = TartifletteApp(engine=engine, uploads=True)
+    async with get_client(app) as client:
+        response = await client.post("/", data=data, files={"0": ("a.txt", b"hello")})
+    assert response.status_code == 400
+    assert response.json() == {"error": error}
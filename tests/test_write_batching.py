@@ -0,0 +1,43 @@
+from starlette.testclient import TestClient
+from tartiflette import Engine
+
+from tartiflette_asgi import Subscriptions, TartifletteApp, WriteBatching
+
+
+def test_write_batching(engine: Engine) -> None:
+    write_batching = WriteBatching(window=0.05, max_size=4)
+    app = TartifletteApp(
+        engine=engine,
+        subscriptions=Subscriptions(
+            path="/subscriptions", write_batching=write_batching
+        ),
+    )
+
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            "/subscriptions", subprotocols=["graphql-transport-ws"]
+        ) as ws:
+            ws.send_json({"type": "connection_init"})
+            assert ws.receive_json() == {"type": "connection_ack"}
+
+            for i in range(5):
+                query = f'{{ hello(name: "{i}") }}'
+                ws.send_json(
+                    {"type": "subscribe", "id": str(i), "payload": {"query": query}}
+                )
+
+            messages = [ws.receive_json() for _ in range(10)]
+
+    # Messages of each operation are sent in order.
+    for i in range(5):
+        assert [message for message in messages if message["id"] == str(i)] == [
+            {
+                "type": "next",
+                "id": str(i),
+                "payload": {"data": {"hello": f"Hello {i}"}},
+            },
+            {"type": "complete", "id": str(i)},
+        ]
+
+    assert write_batching.messages == 11
+    assert write_batching.flushes < write_batching.messages